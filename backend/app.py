@@ -5,39 +5,42 @@ A comprehensive REST API for exploring the Western Hermetic Tradition
 Includes Tarot, Qabalah, Astrology, and Ritual practices
 """
 
-from flask import Flask, jsonify, request, g
-import sqlite3
+from flask import Blueprint, Flask, Response, jsonify, request, stream_with_context
+import base64
+import json
 import os
 import random
 
+from database import POOL_EXTENSION, init_connection_pool, get_db, release_db
+from snapshot import init_snapshot, get_snapshot
+from generations import init_database_watch
+from response_cache import init_response_cache, cached_response
+from compression import init_compression, available_encodings
+from metrics import WARM_UP_ENVIRON, init_metrics
+from tracing import init_tracing
+from serialization import FastJSONProvider
+from search import rank_cards
+from correspondences import resolve_card_correspondences, snapshot_card_correspondences
+from spreads import SPREADS, spread_layout, parse_draw_args, draw_numbers
+from draw_stats import simulate_draws, run_simulation
+from export import parse_export_types, iter_records, iter_snapshot_records, iter_ndjson, iter_gzip
+
 # Import blueprints
-from routes.qabalah import qabalah_bp
+from routes.qabalah import qabalah_bp, init_tree_graph, init_gematria_index, get_sephiroth_by_numbers, get_paths_by_numbers
 from routes.astrology import astrology_bp
-from routes.rituals import rituals_bp
+from routes.rituals import rituals_bp, get_rituals_by_ids
 
-app = Flask(__name__)
+# Tarot, spread and data endpoints; registered on each app by create_app()
+api_bp = Blueprint('api', __name__)
 
 # Database configuration
-# Database is stored in the parent directory
-DATABASE = os.path.join(os.path.dirname(__file__), '..', 'esoteric_knowledge.db')
-app.config['DATABASE'] = DATABASE
-
+# Database is stored in the parent directory (override with EMERALD_DATABASE)
+DATABASE = os.environ.get('EMERALD_DATABASE') or os.path.join(os.path.dirname(__file__), '..', 'esoteric_knowledge.db')
 
-def get_db():
-    """Get database connection, create if doesn't exist in g"""
-    db = getattr(g, '_database', None)
-    if db is None:
-        db = g._database = sqlite3.connect(DATABASE)
-        db.row_factory = sqlite3.Row  # Enable column access by name
-    return db
 
-
-@app.teardown_appcontext
-def close_connection(exception):
-    """Close database connection at end of request"""
-    db = getattr(g, '_database', None)
-    if db is not None:
-        db.close()
+def env_flag(name):
+    """True when an environment variable is set to 1/true/yes"""
+    return os.environ.get(name, '').lower() in ('1', 'true', 'yes')
 
 
 def dict_from_row(row):
@@ -47,10 +50,184 @@ def dict_from_row(row):
     return dict(zip(row.keys(), row))
 
 
-# Register blueprints
-app.register_blueprint(qabalah_bp)
-app.register_blueprint(astrology_bp)
-app.register_blueprint(rituals_bp)
+# Card columns that can be requested with /cards?fields=
+CARD_COLUMNS = (
+    'number', 'name', 'arcana', 'suit', 'element', 'astrology', 'astrological_decan',
+    'hebrew_letter', 'tree_of_life_path', 'sephiroth', 'musical_note', 'color_primary',
+    'color_secondary', 'gemstone', 'herb', 'upright_meaning', 'reversed_meaning',
+    'description', 'key_symbols'
+)
+CARD_FIELDS = CARD_COLUMNS + ('keywords', 'system_descriptions')
+
+# Largest page /cards?limit= will return
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(card_number):
+    """Opaque pagination cursor pointing after the given card number"""
+    payload = json.dumps({'after': card_number}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Card number a pagination cursor points after; raises ValueError if invalid"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded.encode()))['after']
+    except (ValueError, TypeError, KeyError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(after, int) or isinstance(after, bool):
+        raise ValueError('Invalid cursor')
+    return after
+
+
+def parse_card_listing_args(args):
+    """
+    Read the fields/limit/cursor parameters of /cards
+
+    Returns (fields, limit, after) where fields is None for the full card,
+    limit is None for no pagination and after is the card number to resume
+    after. Raises ValueError with a client-facing message on bad input.
+    """
+    fields = None
+    if args.get('fields'):
+        fields = [f.strip() for f in args['fields'].split(',') if f.strip()]
+        unknown = [f for f in fields if f not in CARD_FIELDS]
+        if unknown:
+            raise ValueError(
+                f'Unknown fields: {", ".join(unknown)}. Valid fields: {", ".join(CARD_FIELDS)}'
+            )
+
+    limit = None
+    if args.get('limit') is not None:
+        try:
+            limit = int(args['limit'])
+        except ValueError:
+            limit = 0
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+
+    after = decode_cursor(args['cursor']) if args.get('cursor') else None
+
+    return fields, limit, after
+
+
+def parse_card_numbers(value):
+    """Parse the ?numbers=1,5,17 filter of /cards; raises ValueError on bad input"""
+    try:
+        numbers = [int(n) for n in value.split(',') if n.strip()]
+    except ValueError:
+        raise ValueError('numbers must be a comma-separated list of card numbers')
+    if len(numbers) > MAX_PAGE_SIZE:
+        raise ValueError(f'At most {MAX_PAGE_SIZE} card numbers can be requested at once')
+    return numbers
+
+
+def hydrate_cards(card_rows, include_systems=True, include_keywords=True):
+    """
+    Attach keywords and system descriptions to a list of card rows
+
+    Runs one query for all keywords and (optionally) one query for all system
+    descriptions, regardless of how many cards are passed in.
+
+    Args:
+        card_rows: sqlite3.Row objects from the cards table (must include id)
+        include_systems: Whether to include system-specific descriptions
+        include_keywords: Whether to include keywords
+    """
+    cards = [dict_from_row(row) for row in card_rows]
+    if not cards:
+        return []
+
+    card_ids = [card['id'] for card in cards]
+    snapshot = get_snapshot()
+
+    if snapshot is not None:
+        keywords_by_card = {
+            card_id: list(snapshot.sorted_keywords_by_card.get(card_id, ()))
+            for card_id in card_ids
+        }
+        system_rows = []
+        if include_systems:
+            for card_id in card_ids:
+                system_rows.extend(snapshot.system_descriptions_by_card.get(card_id, ()))
+    else:
+        db = get_db()
+        placeholders = ', '.join('?' for _ in card_ids)
+
+        # Get keywords for every card in one pass
+        keywords_by_card = {card_id: [] for card_id in card_ids}
+        if include_keywords:
+            keyword_rows = db.execute(f"""
+                SELECT card_id, keyword FROM keywords
+                WHERE card_id IN ({placeholders})
+                ORDER BY card_id, keyword
+            """, card_ids).fetchall()
+            for row in keyword_rows:
+                keywords_by_card[row['card_id']].append(row['keyword'])
+
+        # Get system descriptions for every card in one pass if requested
+        system_rows = []
+        if include_systems:
+            system_rows = db.execute(f"""
+                SELECT card_id, system_name, description, upright_meaning, reversed_meaning,
+                       key_imagery, divinatory_meaning, esoteric_meaning
+                FROM system_descriptions
+                WHERE card_id IN ({placeholders})
+            """, card_ids).fetchall()
+
+    systems_by_card = {card_id: {} for card_id in card_ids}
+    for row in system_rows:
+        systems_by_card[row['card_id']][row['system_name']] = {
+            'description': row['description'],
+            'upright_meaning': row['upright_meaning'],
+            'reversed_meaning': row['reversed_meaning'],
+            'key_imagery': row['key_imagery'],
+            'divinatory_meaning': row['divinatory_meaning'],
+            'esoteric_meaning': row['esoteric_meaning']
+        }
+
+    for card in cards:
+        card_id = card['id']
+        if include_keywords:
+            card['keywords'] = keywords_by_card[card_id]
+        if include_systems:
+            card['system_descriptions'] = systems_by_card[card_id]
+
+        # Remove internal id from response
+        del card['id']
+        card.pop('created_at', None)
+        card.pop('updated_at', None)
+
+    return cards
+
+
+def get_cards_with_details(card_ids, include_systems=True):
+    """
+    Get complete cards for a set of internal IDs in a constant number of queries
+
+    Args:
+        card_ids: Internal database IDs; results follow this order
+        include_systems: Whether to include system-specific descriptions
+    """
+    if not card_ids:
+        return []
+
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        rows_by_id = snapshot.cards_by_id
+    else:
+        db = get_db()
+        placeholders = ', '.join('?' for _ in card_ids)
+        card_rows = db.execute(f"""
+            SELECT c.* FROM cards c WHERE c.id IN ({placeholders})
+        """, list(card_ids)).fetchall()
+        rows_by_id = {row['id']: row for row in card_rows}
+
+    # Preserve the caller's ordering (e.g. ORDER BY number from a filter query)
+    ordered_rows = [rows_by_id[card_id] for card_id in card_ids if card_id in rows_by_id]
+
+    return hydrate_cards(ordered_rows, include_systems=include_systems)
 
 
 def get_card_with_details(card_id=None, card_number=None, card_name=None, include_systems=True):
@@ -63,6 +240,22 @@ def get_card_with_details(card_id=None, card_number=None, card_name=None, includ
         card_name: Card name
         include_systems: Whether to include system-specific descriptions
     """
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        if card_id is not None:
+            card_row = snapshot.cards_by_id.get(card_id)
+        elif card_number is not None:
+            card_row = snapshot.cards_by_number.get(card_number)
+        elif card_name is not None:
+            card_row = snapshot.cards_by_name.get(card_name.lower())
+        else:
+            card_row = None
+
+        if not card_row:
+            return None
+
+        return hydrate_cards([card_row], include_systems=include_systems)[0]
+
     db = get_db()
 
     # Build WHERE clause
@@ -87,46 +280,74 @@ def get_card_with_details(card_id=None, card_number=None, card_name=None, includ
     if not card_row:
         return None
 
-    card = dict_from_row(card_row)
-    card_id = card['id']
-
-    # Get keywords
-    keywords = db.execute(
-        "SELECT keyword FROM keywords WHERE card_id = ? ORDER BY keyword",
-        (card_id,)
-    ).fetchall()
-    card['keywords'] = [k['keyword'] for k in keywords]
-
-    # Get system descriptions if requested
-    if include_systems:
-        systems_query = """
-            SELECT system_name, description, upright_meaning, reversed_meaning,
-                   key_imagery, divinatory_meaning, esoteric_meaning
-            FROM system_descriptions
-            WHERE card_id = ?
-        """
-        system_rows = db.execute(systems_query, (card_id,)).fetchall()
-        card['system_descriptions'] = {
-            row['system_name']: {
-                'description': row['description'],
-                'upright_meaning': row['upright_meaning'],
-                'reversed_meaning': row['reversed_meaning'],
-                'key_imagery': row['key_imagery'],
-                'divinatory_meaning': row['divinatory_meaning'],
-                'esoteric_meaning': row['esoteric_meaning']
-            }
-            for row in system_rows
-        }
+    return hydrate_cards([card_row], include_systems=include_systems)[0]
+
+
+def get_cards_by_numbers(numbers, include_systems=True):
+    """
+    Get complete cards for a set of card numbers in a constant number of queries
 
-    # Remove internal id from response
-    del card['id']
-    del card['created_at']
-    del card['updated_at']
+    Returns {number: card}; numbers that do not exist are left out.
+    """
+    numbers = sorted(set(numbers))
+    if not numbers:
+        return {}
 
-    return card
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        card_rows = [snapshot.cards_by_number[n] for n in numbers if n in snapshot.cards_by_number]
+    else:
+        db = get_db()
+        placeholders = ', '.join('?' for _ in numbers)
+        card_rows = db.execute(f"""
+            SELECT c.* FROM cards c WHERE c.number IN ({placeholders}) ORDER BY c.number
+        """, numbers).fetchall()
 
+    cards = hydrate_cards(card_rows, include_systems=include_systems)
+    return {card['number']: card for card in cards}
 
-@app.route('/', methods=['GET'])
+
+# Bulk resolvers used by /batch, keyed by reference type
+BATCH_RESOLVERS = {
+    'card': get_cards_by_numbers,
+    'path': get_paths_by_numbers,
+    'sephirah': get_sephiroth_by_numbers,
+    'ritual': get_rituals_by_ids
+}
+
+
+# Most references a single /batch request may resolve
+MAX_BATCH_SIZE = 100
+
+
+def parse_batch_refs(refs):
+    """
+    Parse /batch references like "card:17", "path:11", "sephirah:1", "ritual:3"
+
+    Returns {type: {ref: key}}. Raises ValueError with a client-facing message
+    on malformed input.
+    """
+    if not isinstance(refs, list) or not refs:
+        raise ValueError('refs must be a non-empty list of references')
+    if len(refs) > MAX_BATCH_SIZE:
+        raise ValueError(f'At most {MAX_BATCH_SIZE} references can be requested at once')
+
+    parsed = {ref_type: {} for ref_type in BATCH_RESOLVERS}
+    for ref in refs:
+        ref_type, _, key = ref.partition(':') if isinstance(ref, str) else ('', '', '')
+        if ref_type not in BATCH_RESOLVERS:
+            raise ValueError(
+                f'Invalid reference {ref!r}. Use <type>:<number> with type one of: '
+                f'{", ".join(BATCH_RESOLVERS)}'
+            )
+        try:
+            parsed[ref_type][ref] = int(key)
+        except ValueError:
+            raise ValueError(f'Invalid reference {ref!r}: expected an integer after the colon')
+    return parsed
+
+
+@api_bp.route('/', methods=['GET'])
 def home():
     """Home endpoint with API documentation"""
     return jsonify({
@@ -144,6 +365,7 @@ def home():
         'endpoints': {
             'tarot': {
                 '/cards': 'Get all tarot cards',
+                '/cards?numbers=1,5,17': 'Get several cards by number in one request',
                 '/cards/<number>': 'Get card by number (0-77)',
                 '/cards/name/<name>': 'Get card by name',
                 '/cards/random': 'Get random card',
@@ -151,6 +373,12 @@ def home():
                 '/cards/<number>/correspondences': 'Get card with full qabalah & astrology links',
                 '/systems': 'List tarot systems'
             },
+            'spreads': {
+                '/spreads': 'List spread layouts',
+                '/spreads/<spread>': 'Get a spread layout (single, three-card, celtic-cross, tree-of-life)',
+                '/spreads/<spread>/draw?seed=<n>&reversals=<0-1>': 'Draw a reproducible reading',
+                '/spreads/<spread>/stats?iterations=<n>&stream=true': 'Monte Carlo draw statistics for a spread'
+            },
             'qabalah': {
                 '/api/qabalah/sephiroth': 'Get all 10 Sephiroth',
                 '/api/qabalah/sephiroth/<number>': 'Get Sephirah by number (1-10)',
@@ -158,7 +386,14 @@ def home():
                 '/api/qabalah/paths': 'Get all 22 Paths',
                 '/api/qabalah/paths/<number>': 'Get Path by number (11-32)',
                 '/api/qabalah/paths/<number>/card': 'Get Path with full tarot card data',
-                '/api/qabalah/tree': 'Get complete Tree of Life structure'
+                '/api/qabalah/tree': 'Get complete Tree of Life structure',
+                '/api/qabalah/graph': 'Get the Tree as an adjacency list',
+                '/api/qabalah/graph/shortest?from=<sephirah>&to=<sephirah>': 'Get shortest routes between two Sephiroth',
+                '/api/qabalah/graph/routes?from=<sephirah>&to=<sephirah>&max_length=<k>': 'Get all routes up to k paths long',
+                '/api/qabalah/traversals/<name>': 'Get the Lightning Flash or Path of the Serpent',
+                '/api/qabalah/gematria?q=<word>': 'Value a Hebrew or English word and list entities with the same value',
+                '/api/qabalah/gematria/value/<n>': 'Get every entity whose gematria equals n',
+                '/api/qabalah/gematria/methods': 'List gematria methods'
             },
             'astrology': {
                 '/api/astrology/planets': 'Get all planets',
@@ -167,7 +402,11 @@ def home():
                 '/api/astrology/signs/<name>': 'Get sign by name',
                 '/api/astrology/elements': 'Get elemental correspondences',
                 '/api/astrology/modalities': 'Get modality information',
-                '/api/astrology/correspondences': 'Get all astrological correspondences'
+                '/api/astrology/correspondences': 'Get all astrological correspondences',
+                '/api/astrology/planetary-hours?lat=<lat>&lon=<lon>&date=<date>': 'Compute planetary hours for a place and date (or start/end range)',
+                '/api/astrology/lunar-mansions': 'Get all 28 lunar mansions',
+                '/api/astrology/lunar-mansions/current?time=<iso>': 'Get the mansion the Moon occupies',
+                '/api/astrology/lunar-mansions/ingresses?start=<iso>&days=<n>': 'Get every mansion ingress in a range'
             },
             'rituals': {
                 '/api/rituals': 'Get all rituals',
@@ -177,6 +416,11 @@ def home():
                 '/api/rituals/daily': 'Get daily practice rituals',
                 '/api/rituals/search?q=<query>': 'Search rituals',
                 '/api/rituals/practice-guide': 'Get practice progression guide'
+            },
+            'data': {
+                '/batch': 'POST {"refs": ["card:17", "path:11", "sephirah:1", "ritual:3"]} to resolve many entities at once',
+                '/export': 'Stream every entity as newline-delimited JSON (?types=cards,rituals)',
+                '/metrics': 'Request latency, response size and SQL metrics (Prometheus text format)'
             }
         },
         'examples': [
@@ -191,17 +435,22 @@ def home():
     })
 
 
-@app.route('/systems', methods=['GET'])
+@api_bp.route('/systems', methods=['GET'])
+@cached_response
 def get_systems():
     """Get list of available tarot systems"""
-    db = get_db()
-    systems = db.execute("""
-        SELECT DISTINCT system_name,
-               COUNT(*) as card_count
-        FROM system_descriptions
-        GROUP BY system_name
-        ORDER BY system_name
-    """).fetchall()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        systems = snapshot.system_counts()
+    else:
+        db = get_db()
+        systems = db.execute("""
+            SELECT DISTINCT system_name,
+                   COUNT(*) as card_count
+            FROM system_descriptions
+            GROUP BY system_name
+            ORDER BY system_name
+        """).fetchall()
 
     return jsonify({
         'systems': [
@@ -220,58 +469,119 @@ def get_systems():
     })
 
 
-@app.route('/cards', methods=['GET'])
+@api_bp.route('/cards', methods=['GET'])
+@cached_response(uncached_args=('numbers', 'cursor', 'fields'))
 def get_all_cards():
-    """Get all tarot cards with optional filtering"""
-    db = get_db()
+    """
+    Get all tarot cards with optional filtering
 
+    Supports pagination (?limit=&cursor=), field projection
+    (?fields=number,name,suit,keywords; unrequested columns are never read)
+    and multi-get by number (?numbers=1,5,17).
+    """
     # Get filter parameters
     arcana = request.args.get('arcana')
     suit = request.args.get('suit')
     element = request.args.get('element')
     include_systems = request.args.get('systems', 'true').lower() == 'true'
 
-    # Build WHERE clause
-    where_conditions = []
-    params = []
+    try:
+        fields, limit, after = parse_card_listing_args(request.args)
+        numbers = parse_card_numbers(request.args['numbers']) if 'numbers' in request.args else None
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
 
-    if arcana:
-        where_conditions.append("c.arcana = ?")
-        params.append(arcana)
+    # Columns to read; id and number are always needed for lookups and paging
+    if fields is not None:
+        columns = ['id', 'number'] + [f for f in CARD_COLUMNS if f in fields and f != 'number']
+        include_keywords = 'keywords' in fields
+        include_systems = include_systems and 'system_descriptions' in fields
+    else:
+        columns = None
+        include_keywords = True
+
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        card_rows = snapshot.filter_cards(arcana=arcana, suit=suit, element=element)
+        if numbers is not None:
+            wanted = set(numbers)
+            card_rows = [c for c in card_rows if c['number'] in wanted]
+        if after is not None:
+            card_rows = [c for c in card_rows if c['number'] > after]
+        if limit is not None:
+            card_rows = card_rows[:limit + 1]
+        if columns is not None:
+            card_rows = [c.project(columns) for c in card_rows]
+    else:
+        db = get_db()
+
+        # Build WHERE clause
+        where_conditions = []
+        params = []
+
+        if arcana:
+            where_conditions.append("c.arcana = ?")
+            params.append(arcana)
+
+        if suit:
+            where_conditions.append("LOWER(c.suit) = LOWER(?)")
+            params.append(suit)
+
+        if element:
+            where_conditions.append("LOWER(c.element) = LOWER(?)")
+            params.append(element)
+
+        if numbers is not None:
+            where_conditions.append(f"c.number IN ({', '.join('?' for _ in numbers)})")
+            params.extend(numbers)
+
+        if after is not None:
+            where_conditions.append("c.number > ?")
+            params.append(after)
+
+        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        select_list = ", ".join(f"c.{column}" for column in columns) if columns else "c.*"
+
+        # Fetch one extra row to know whether another page exists
+        limit_clause = ""
+        if limit is not None:
+            limit_clause = "LIMIT ?"
+            params.append(limit + 1)
+
+        # Get cards
+        query = f"""
+            SELECT {select_list}
+            FROM cards c
+            {where_clause}
+            ORDER BY c.number
+            {limit_clause}
+        """
+        card_rows = db.execute(query, params).fetchall()
 
-    if suit:
-        where_conditions.append("LOWER(c.suit) = LOWER(?)")
-        params.append(suit)
+    has_more = limit is not None and len(card_rows) > limit
+    if has_more:
+        card_rows = card_rows[:limit]
 
-    if element:
-        where_conditions.append("LOWER(c.element) = LOWER(?)")
-        params.append(element)
+    # Attach keywords and system descriptions in bulk
+    cards = hydrate_cards(card_rows, include_systems=include_systems, include_keywords=include_keywords)
 
-    where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+    if fields is not None and 'number' not in fields:
+        for card in cards:
+            del card['number']
 
-    # Get cards
-    query = f"""
-        SELECT c.id, c.number
-        FROM cards c
-        {where_clause}
-        ORDER BY c.number
-    """
-    card_rows = db.execute(query, params).fetchall()
-
-    # Get full details for each card
-    cards = []
-    for row in card_rows:
-        card = get_card_with_details(card_id=row['id'], include_systems=include_systems)
-        if card:
-            cards.append(card)
-
-    return jsonify({
+    response = {
         'count': len(cards),
         'cards': cards
-    })
+    }
+    if limit is not None:
+        response['next_cursor'] = encode_cursor(card_rows[-1]['number']) if has_more else None
+
+    return jsonify(response)
 
 
-@app.route('/cards/<int:number>', methods=['GET'])
+@api_bp.route('/cards/<int:number>', methods=['GET'])
 def get_card_by_number(number):
     """Get a specific card by its number (0-77)"""
     include_systems = request.args.get('systems', 'true').lower() == 'true'
@@ -286,7 +596,7 @@ def get_card_by_number(number):
     return jsonify(card)
 
 
-@app.route('/cards/name/<card_name>', methods=['GET'])
+@api_bp.route('/cards/name/<card_name>', methods=['GET'])
 def get_card_by_name(card_name):
     """Get a specific card by its name (case-insensitive)"""
     include_systems = request.args.get('systems', 'true').lower() == 'true'
@@ -302,11 +612,9 @@ def get_card_by_name(card_name):
     return jsonify(card)
 
 
-@app.route('/cards/<int:number>/system/<system_name>', methods=['GET'])
+@api_bp.route('/cards/<int:number>/system/<system_name>', methods=['GET'])
 def get_card_system_description(number, system_name):
     """Get a specific card's description from a specific tarot system"""
-    db = get_db()
-
     # Validate system name
     valid_systems = ['RWS', 'Thoth', 'Golden Dawn', 'Marseille']
     if system_name not in valid_systems:
@@ -314,27 +622,34 @@ def get_card_system_description(number, system_name):
             'error': f'Invalid system name. Valid systems: {", ".join(valid_systems)}'
         }), 400
 
-    # Get card and system description
-    query = """
-        SELECT c.number, c.name, sd.*
-        FROM cards c
-        LEFT JOIN system_descriptions sd ON c.id = sd.card_id AND sd.system_name = ?
-        WHERE c.number = ?
-    """
-    row = db.execute(query, (system_name, number)).fetchone()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        card = snapshot.cards_by_number.get(number)
+        row = snapshot.system_description(card['id'], system_name) if card else None
+    else:
+        db = get_db()
+
+        # Get card and system description
+        query = """
+            SELECT c.number, c.name, sd.*
+            FROM cards c
+            LEFT JOIN system_descriptions sd ON c.id = sd.card_id AND sd.system_name = ?
+            WHERE c.number = ?
+        """
+        card = row = db.execute(query, (system_name, number)).fetchone()
 
-    if not row:
+    if not card:
         return jsonify({
             'error': f'Card number {number} not found'
         }), 404
 
     result = {
-        'number': row['number'],
-        'name': row['name'],
+        'number': card['number'],
+        'name': card['name'],
         'system': system_name
     }
 
-    if row['description']:
+    if row and row['description']:
         result.update({
             'description': row['description'],
             'upright_meaning': row['upright_meaning'],
@@ -349,7 +664,7 @@ def get_card_system_description(number, system_name):
     return jsonify(result)
 
 
-@app.route('/cards/random', methods=['GET'])
+@api_bp.route('/cards/random', methods=['GET'])
 def get_random_card():
     """Get a random tarot card"""
     include_systems = request.args.get('systems', 'true').lower() == 'true'
@@ -361,10 +676,89 @@ def get_random_card():
     return jsonify(card)
 
 
-@app.route('/cards/search', methods=['GET'])
+# Readings simulated by /spreads/<spread>/stats unless ?iterations= is given, and the
+# caps: a single response must come back within a few seconds, while a stream
+# reports progress as it goes and may run longer
+DEFAULT_SIMULATION_ITERATIONS = 100000
+MAX_SIMULATION_ITERATIONS = 1000000
+MAX_STREAMED_SIMULATION_ITERATIONS = 5000000
+
+
+@api_bp.route('/spreads/<spread_id>/stats', methods=['GET'])
+def get_spread_statistics(spread_id):
+    """
+    Simulate many shuffles of a spread and return draw statistics
+
+    Returns card-by-position frequency counts, suit/element distributions
+    per position, reversal counts and card pair co-occurrence counts.
+    ?stream=true sends NDJSON progress records after every batch, followed
+    by a final {"type": "result"} record.
+    """
+    layout = spread_layout(spread_id)
+    if layout is None:
+        return jsonify({
+            'error': f'Spread "{spread_id}" not found',
+            'available_spreads': list(SPREADS)
+        }), 404
+
+    try:
+        seed, reversal_probability = parse_draw_args(request.args)
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+
+    stream = request.args.get('stream', 'false').lower() == 'true'
+    try:
+        iterations = int(request.args.get('iterations', DEFAULT_SIMULATION_ITERATIONS))
+    except ValueError:
+        iterations = 0
+    limit = MAX_STREAMED_SIMULATION_ITERATIONS if stream else MAX_SIMULATION_ITERATIONS
+    if iterations < 1 or iterations > limit:
+        message = f'iterations must be between 1 and {limit}'
+        if not stream:
+            message += f' (up to {MAX_STREAMED_SIMULATION_ITERATIONS} with stream=true)'
+        return jsonify({
+            'error': message
+        }), 400
+
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        deck = snapshot.cards
+    else:
+        deck = get_db().execute("""
+            SELECT number, suit, element FROM cards ORDER BY number
+        """).fetchall()
+
+    summary = {
+        'spread': layout['id'],
+        'name': layout['name'],
+        'positions': [position['name'] for position in layout['positions']],
+        'seed': seed,
+        'reversal_probability': reversal_probability
+    }
+
+    if not stream:
+        stats = run_simulation(deck, layout['card_count'], iterations, seed, reversal_probability)
+        return jsonify(dict(summary, **stats.to_dict()))
+
+    def generate():
+        stats = None
+        for stats in simulate_draws(deck, layout['card_count'], iterations, seed, reversal_probability):
+            yield {
+                'type': 'progress',
+                'completed': stats.iterations,
+                'total': iterations
+            }
+        yield dict(summary, type='result', **stats.to_dict())
+
+    # chunk_size=0: send every progress line as soon as it is encoded
+    return Response(stream_with_context(iter_ndjson(generate(), chunk_size=0)), mimetype='application/x-ndjson')
+
+
+@api_bp.route('/cards/search', methods=['GET'])
 def search_cards():
     """Search cards by keyword in name, keywords, meanings, or correspondences"""
-    db = get_db()
     query = request.args.get('q', '').lower()
     include_systems = request.args.get('systems', 'true').lower() == 'true'
 
@@ -373,6 +767,35 @@ def search_cards():
             'error': 'Please provide a search query using ?q=<query>'
         }), 400
 
+    # Rank matches with the FTS5 index (BM25, prefix matching, snippets)
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        with snapshot.search_db() as search_db:
+            ranked = rank_cards(search_db, query)
+    else:
+        ranked = rank_cards(get_db(), query)
+
+    if ranked is not None:
+        results = get_cards_with_details([card_id for card_id, _ in ranked], include_systems=include_systems)
+        for card, (_, snippet) in zip(results, ranked):
+            card['snippet'] = snippet
+        return jsonify({
+            'query': query,
+            'count': len(results),
+            'results': results
+        })
+
+    # Fall back to substring matching on databases built without the index
+    if snapshot is not None:
+        results = hydrate_cards(snapshot.search_cards(query), include_systems=include_systems)
+        return jsonify({
+            'query': query,
+            'count': len(results),
+            'results': results
+        })
+
+    db = get_db()
+
     # Search in multiple fields
     search_query = """
         SELECT DISTINCT c.id
@@ -396,12 +819,8 @@ def search_cards():
 
     card_rows = db.execute(search_query, params).fetchall()
 
-    # Get full details for each card
-    results = []
-    for row in card_rows:
-        card = get_card_with_details(card_id=row['id'], include_systems=include_systems)
-        if card:
-            results.append(card)
+    # Get full details for all matching cards in bulk
+    results = get_cards_with_details([row['id'] for row in card_rows], include_systems=include_systems)
 
     return jsonify({
         'query': query,
@@ -410,110 +829,161 @@ def search_cards():
     })
 
 
-@app.route('/cards/<int:number>/correspondences', methods=['GET'])
+@api_bp.route('/cards/<int:number>/correspondences', methods=['GET'])
 def get_card_correspondences(number):
     """Get a tarot card with full qabalah and astrological correspondences"""
-    db = get_db()
-
-    # Get the card
-    card = get_card_with_details(card_number=number, include_systems=False)
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        card = get_card_with_details(card_number=number, include_systems=False)
+        result = snapshot_card_correspondences(snapshot, card) if card else None
+    else:
+        result = resolve_card_correspondences(get_db(), number)
 
-    if not card:
+    if not result:
         return jsonify({
             'error': f'Card number {number} not found'
         }), 404
 
-    result = {'card': card}
-
-    # For Major Arcana, get the Path correspondence
-    if card['arcana'] == 'Major Arcana':
-        # Get path that corresponds to this card
-        path_query = """
-            SELECT p.*, s1.name as from_sephirah_name, s2.name as to_sephirah_name
-            FROM paths p
-            LEFT JOIN cards c ON p.tarot_card_id = c.id
-            LEFT JOIN sephiroth s1 ON p.connects_from = s1.number
-            LEFT JOIN sephiroth s2 ON p.connects_to = s2.number
-            WHERE c.number = ?
-        """
-        path = db.execute(path_query, (number,)).fetchone()
-
-        if path:
-            path_dict = dict_from_row(path)
-            # Remove internal IDs
-            if 'id' in path_dict:
-                del path_dict['id']
-            if 'tarot_card_id' in path_dict:
-                del path_dict['tarot_card_id']
-            result['qabalah_path'] = path_dict
-
-            # Get the connected sephiroth details
-            seph_from = db.execute("""
-                SELECT * FROM sephiroth WHERE number = ?
-            """, (path['connects_from'],)).fetchone()
-
-            seph_to = db.execute("""
-                SELECT * FROM sephiroth WHERE number = ?
-            """, (path['connects_to'],)).fetchone()
-
-            result['connected_sephiroth'] = {
-                'from': dict_from_row(seph_from),
-                'to': dict_from_row(seph_to)
-            }
+    return jsonify(result)
 
-    # Get astrological correspondences
-    astrology_data = {}
-
-    # Check for planetary association
-    if card.get('astrology'):
-        # Try to find matching planet
-        planet = db.execute("""
-            SELECT * FROM planets
-            WHERE LOWER(name) = LOWER(?)
-        """, (card['astrology'],)).fetchone()
-
-        if planet:
-            astrology_data['planet'] = dict_from_row(planet)
-
-    # For cards with zodiac associations, find the sign
-    if card.get('astrology'):
-        sign = db.execute("""
-            SELECT * FROM zodiac_signs
-            WHERE LOWER(name) = LOWER(?)
-        """, (card['astrology'],)).fetchone()
-
-        if sign:
-            sign_dict = dict_from_row(sign)
-            astrology_data['zodiac_sign'] = sign_dict
-
-            # Get ruling planet of the sign
-            if sign['ruling_planet']:
-                ruling_planet = db.execute("""
-                    SELECT * FROM planets WHERE name = ?
-                """, (sign['ruling_planet'],)).fetchone()
-
-                if ruling_planet:
-                    astrology_data['ruling_planet'] = dict_from_row(ruling_planet)
-
-    if astrology_data:
-        result['astrology'] = astrology_data
-
-    # Add element correspondences
-    if card.get('element'):
-        # Get all signs of this element
-        element_signs = db.execute("""
-            SELECT name, symbol, modality FROM zodiac_signs
-            WHERE LOWER(element) = LOWER(?)
-            ORDER BY house_number
-        """, (card['element'],)).fetchall()
-
-        if element_signs:
-            result['elemental_zodiac'] = [dict_from_row(s) for s in element_signs]
 
-    return jsonify(result)
+@api_bp.route('/spreads', methods=['GET'])
+@cached_response
+def get_spreads():
+    """List the available spread layouts"""
+    spreads = [spread_layout(spread_id) for spread_id in SPREADS]
+    return jsonify({
+        'count': len(spreads),
+        'spreads': spreads
+    })
+
+
+@api_bp.route('/spreads/<spread_id>', methods=['GET'])
+def get_spread(spread_id):
+    """Get a spread layout and its positions"""
+    layout = spread_layout(spread_id)
+    if layout is None:
+        return jsonify({
+            'error': f'Spread "{spread_id}" not found',
+            'available_spreads': list(SPREADS)
+        }), 404
+    return jsonify(layout)
+
+
+@api_bp.route('/spreads/<spread_id>/draw', methods=['GET'])
+def draw_spread(spread_id):
+    """
+    Draw a reading for a spread
+
+    The deck is shuffled once (?seed= makes the draw reproducible; the seed
+    used is always returned), each position gets a distinct card, and
+    ?reversals= sets the chance of each card being reversed. All drawn
+    cards are loaded in one batch.
+    """
+    layout = spread_layout(spread_id)
+    if layout is None:
+        return jsonify({
+            'error': f'Spread "{spread_id}" not found',
+            'available_spreads': list(SPREADS)
+        }), 404
+
+    include_systems = request.args.get('systems', 'true').lower() == 'true'
+    try:
+        seed, reversal_probability = parse_draw_args(request.args)
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+
+    draws = draw_numbers(layout['card_count'], seed, reversal_probability)
+    cards = get_cards_by_numbers([number for number, _ in draws], include_systems=include_systems)
+
+    return jsonify({
+        'spread': layout['id'],
+        'name': layout['name'],
+        'seed': seed,
+        'reversal_probability': reversal_probability,
+        'cards': [
+            dict(position, card=cards[number], reversed=is_reversed)
+            for position, (number, is_reversed) in zip(layout['positions'], draws)
+        ]
+    })
+
 
+@api_bp.route('/batch', methods=['POST'])
+def batch_get():
+    """
+    Resolve a mixed list of entity references in one request
+
+    Body: {"refs": ["card:17", "path:11", "sephirah:1", "ritual:3"],
+    "systems": true}. Each reference type is fetched with a single bulk
+    query; results are keyed by the reference as given.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({
+            'error': 'Request body must be a JSON object with a "refs" list'
+        }), 400
+
+    try:
+        refs_by_type = parse_batch_refs(body.get('refs'))
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+
+    include_systems = body.get('systems', True) is not False
+
+    results = {}
+    for ref_type, refs in refs_by_type.items():
+        if not refs:
+            continue
+        if ref_type == 'card':
+            resolved = get_cards_by_numbers(refs.values(), include_systems=include_systems)
+        else:
+            resolved = BATCH_RESOLVERS[ref_type](refs.values())
+        for ref, key in refs.items():
+            if key in resolved:
+                results[ref] = resolved[key]
+
+    not_found = [ref for ref in dict.fromkeys(body['refs']) if ref not in results]
 
-@app.errorhandler(404)
+    return jsonify({
+        'count': len(results),
+        'results': results,
+        'not_found': not_found
+    })
+
+
+@api_bp.route('/export', methods=['GET'])
+def export_corpus():
+    """
+    Stream the corpus as newline-delimited JSON
+
+    One {"type": ..., "data": ...} record per line, read lazily from the
+    database. Gzip-compressed when the client sends Accept-Encoding: gzip.
+    """
+    try:
+        types = parse_export_types(request.args.get('types', ''))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        records = iter_snapshot_records(snapshot, types)
+    else:
+        records = iter_records(get_db(), types)
+
+    body = iter_ndjson(records)
+    headers = {'Vary': 'Accept-Encoding'}
+    if 'gzip' in request.accept_encodings:
+        body = iter_gzip(body)
+        headers['Content-Encoding'] = 'gzip'
+
+    return Response(stream_with_context(body), mimetype='application/x-ndjson', headers=headers)
+
+
+@api_bp.app_errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
     return jsonify({
@@ -522,7 +992,7 @@ def not_found(error):
     }), 404
 
 
-@app.errorhandler(500)
+@api_bp.app_errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
     return jsonify({
@@ -531,6 +1001,92 @@ def internal_error(error):
     }), 500
 
 
+def create_app(config=None):
+    """
+    Build a configured API application
+
+    Args:
+        config: Optional mapping of config overrides, e.g. DATABASE,
+            SNAPSHOT_MODE, SQL_TRACE, METRICS, RESPONSE_CACHE
+
+    The corpus snapshot, Tree of Life graph and gematria index are all
+    built here, so a server that preloads the app shares them with every
+    worker it forks.
+    """
+    app = Flask(__name__)
+    app.config['DATABASE'] = DATABASE
+
+    # orjson encoding that takes rows directly, plus Accept: application/msgpack
+    app.json = FastJSONProvider(app)
+
+    # Snapshot mode: serve every route from an in-memory copy of the corpus
+    app.config['SNAPSHOT_MODE'] = env_flag('EMERALD_SNAPSHOT_MODE')
+
+    # SQL tracing: Server-Timing headers and ?_trace=1 statement listings (for tuning, off by default)
+    app.config['SQL_TRACE'] = env_flag('EMERALD_SQL_TRACE')
+
+    app.config.update(config or {})
+
+    # Shared pool of read-only connections, one per worker thread; each
+    # request releases the pool it used when its app context ends
+    init_connection_pool(app)
+    app.teardown_appcontext(release_db)
+
+    # Register blueprints
+    app.register_blueprint(api_bp)
+    app.register_blueprint(qabalah_bp)
+    app.register_blueprint(astrology_bp)
+    app.register_blueprint(rituals_bp)
+
+    # Load the corpus snapshot once at startup (no-op unless SNAPSHOT_MODE is set)
+    init_snapshot(app)
+
+    # Precompute the Tree of Life graph (adjacency and all routes between Sephiroth)
+    init_tree_graph(app)
+
+    # Index every Sephirah, divine name, archangel, path letter and card by gematria value
+    init_gematria_index(app)
+
+    # Switch to a republished database without a restart (disable with DATABASE_WATCH=False)
+    init_database_watch(app, reloaders=(init_snapshot, init_tree_graph, init_gematria_index))
+
+    # Cache pre-serialized JSON for collection endpoints (disable with RESPONSE_CACHE=False)
+    init_response_cache(app)
+
+    # Per-route latency, response size and SQL histograms at /metrics (disable with METRICS=False)
+    init_metrics(app)
+
+    # Negotiated gzip/brotli with precompressed bodies (disable with COMPRESSION=False).
+    # after_request hooks run in reverse order: tracing, then compression, then metrics
+    init_compression(app)
+
+    # Per-request SQL traces when SQL_TRACE is enabled
+    init_tracing(app)
+
+    return app
+
+
+def warm_up(app):
+    """
+    Fill the response and compression caches before serving, then release
+    database connections
+
+    Requests every @cached_response route that takes no URL arguments once
+    per supported encoding (these requests are left out of /metrics). The
+    pooled connections opened meanwhile are closed so a forking server
+    never hands a live SQLite connection to its workers.
+    """
+    client = app.test_client()
+    for rule in app.url_map.iter_rules():
+        view = app.view_functions[rule.endpoint]
+        if getattr(view, 'cached_response', False) and 'GET' in rule.methods and not rule.arguments:
+            for encoding in ('identity',) + available_encodings():
+                client.get(rule.rule, headers={'Accept-Encoding': encoding},
+                           environ_base={WARM_UP_ENVIRON: True})
+
+    app.extensions[POOL_EXTENSION].close_all()
+
+
 if __name__ == '__main__':
     # Check if database exists
     if not os.path.exists(DATABASE):
@@ -538,7 +1094,9 @@ if __name__ == '__main__':
         print("Please run 'python3 migrate_to_sqlite.py' first to create the database.")
         exit(1)
 
-    # Run the Flask development server
+    app = create_app()
+
+    # Run the Flask development server (use gunicorn.conf.py or serve.py in production)
     print("="*60)
     print("Esoteric Knowledge API v3.0")
     print("="*60)
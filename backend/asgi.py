@@ -0,0 +1,161 @@
+"""
+ASGI entry point
+Serves the API from an event loop, with views run on a bounded thread pool
+
+Usage (from backend/):
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --no-access-log
+
+Connections, keep-alive and slow clients are handled by the event loop, so
+an idle or slow connection costs a coroutine rather than a thread, and one
+process can hold thousands of them. Each request's handler coroutine reads
+the body and then runs the unchanged Flask view, including its SQLite
+access, on a ThreadPoolExecutor of EMERALD_THREADS workers (default four per
+CPU). That bounds both concurrent database work and open connections,
+because the pool opens one SQLite connection per thread. Responses with a
+Content-Length are buffered in the worker and written from the loop. Streamed
+responses (e.g. /export) are forwarded chunk by chunk. Routes, status codes,
+headers and bodies are exactly those of the WSGI app.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import io
+import os
+import sys
+
+from runtime import available_cpus
+from wsgi import app as wsgi_app
+
+
+# Largest request body accepted (POST /batch and /api/qabalah/gematria bodies are small)
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+
+def build_environ(scope, body):
+    """PEP 3333 environ for an ASGI HTTP scope and its request body"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE' or name == 'CONTENT_LENGTH':
+            key = name
+        else:
+            key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class AsgiApp:
+    """ASGI application running a WSGI app's requests on a bounded thread pool"""
+
+    def __init__(self, wsgi, max_workers):
+        self.wsgi = wsgi
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='emerald-view')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.handle(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def handle(self, scope, receive, send):
+        """Read the body, run the view off the loop and send its response"""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                await send_response(send, 413, [(b'content-type', b'application/json')],
+                                    b'{"error": "Request body too large"}\n')
+                return
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                break
+
+        environ = build_environ(scope, b''.join(chunks))
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, self.run_wsgi, environ, send, loop)
+        if result is not None:
+            await send_response(send, *result)
+
+    def run_wsgi(self, environ, send, loop):
+        """
+        Call the WSGI app in a pool thread
+
+        Returns (status, headers, body) when the response has a
+        Content-Length (the loop sends it); otherwise streams the body from
+        this thread and returns None.
+        """
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = [int(status.split(' ', 1)[0]),
+                          [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]]
+            return lambda data: None
+
+        iterable = self.wsgi(environ, start_response)
+        try:
+            chunks = iter(iterable)
+            first = b''
+            if not started:
+                # The app may delay start_response until its first chunk
+                first = next(chunks, b'')
+
+            if any(name == b'content-length' for name, _ in started[1]):
+                return started[0], started[1], first + b''.join(chunks)
+
+            def forward(message):
+                asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+            forward({'type': 'http.response.start', 'status': started[0], 'headers': started[1]})
+            if first:
+                forward({'type': 'http.response.body', 'body': first, 'more_body': True})
+            for chunk in chunks:
+                if chunk:
+                    forward({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            forward({'type': 'http.response.body', 'body': b''})
+            return None
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+
+
+async def send_response(send, status, headers, body):
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+app = AsgiApp(wsgi_app, max_workers=int(os.environ.get('EMERALD_THREADS', 4 * available_cpus())))
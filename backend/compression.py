@@ -0,0 +1,151 @@
+"""
+Response Compression
+Negotiated gzip/brotli compression with a cache of precompressed bodies
+
+An after_request hook compresses text responses of at least MIN_SIZE bytes
+for clients that send Accept-Encoding. Brotli is preferred when the Brotli
+package is installed and the client accepts it; gzip is always available.
+Compressed bodies are kept in an LRU keyed by the body's content hash and
+the encoding, so a payload that repeats (every cached collection, and any
+identical detail response) is compressed once per process. Responses with
+an ETag (served from the response cache, so stable until the database
+changes) are compressed at maximum quality; others use fast levels, since
+they may never repeat. The ETag of a compressed response is made weak, as
+nginx does, so If-None-Match keeps producing 304s for either representation.
+This hook also answers If-None-Match for responses with an ETag, after the
+ETag has been settled, so a 304 matches the 200 it stands in for.
+"""
+
+from collections import OrderedDict
+import gzip
+import hashlib
+import threading
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip covers every client
+    brotli = None
+
+
+COMPRESSION_EXTENSION = 'compression_cache'
+
+# Bodies smaller than this gain little and cost a cache entry
+MIN_SIZE = 1024
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/msgpack', 'application/x-ndjson', 'text/plain', 'text/html'
+}
+
+# (gzip level, brotli quality) for stable responses and for the rest
+BEST_LEVELS = (9, 11)
+FAST_LEVELS = (6, 5)
+
+# Total compressed bytes kept (override with app.config['COMPRESSION_CACHE_BYTES'])
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def available_encodings():
+    """Encodings this process can produce, most preferred first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(body, encoding, levels=FAST_LEVELS):
+    gzip_level, brotli_quality = levels
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionCache:
+    """LRU of compressed bodies keyed by (content hash, encoding), bounded in bytes"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, body, encoding, levels=FAST_LEVELS):
+        key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                return compressed
+
+        # Compress outside the lock; two threads racing on a new body just
+        # both compress it once
+        compressed = compress(body, encoding, levels)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = compressed
+                self.size += len(compressed)
+                while self.size > self.max_bytes and self._entries:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.size -= len(evicted)
+        return compressed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+def get_compression_cache():
+    """Return the active compression cache, or None when compression is disabled"""
+    return current_app.extensions.get(COMPRESSION_EXTENSION)
+
+
+def negotiate(accept_encodings):
+    """The best encoding both sides support, or None"""
+    for encoding in available_encodings():
+        if accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def init_compression(app):
+    """Compress responses for app unless COMPRESSION is False"""
+    if not app.config.get('COMPRESSION', True):
+        return None
+
+    cache = app.extensions[COMPRESSION_EXTENSION] = CompressionCache(
+        app.config.get('COMPRESSION_CACHE_BYTES', DEFAULT_CACHE_BYTES)
+    )
+
+    def encode_response(response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return
+
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate(request.accept_encodings)
+        if encoding is None:
+            return
+
+        body = response.get_data()
+        if len(body) < MIN_SIZE:
+            return
+
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        # The body of a response about to become a 304 is never sent
+        if etag and request.if_none_match.contains_weak(etag):
+            return
+        response.set_data(cache.get_or_compress(body, encoding, BEST_LEVELS if etag else FAST_LEVELS))
+        response.headers['Content-Encoding'] = encoding
+
+    @app.after_request
+    def compress_response(response):
+        encode_response(response)
+        # The response cache leaves If-None-Match to this hook, so a 304
+        # carries the same ETag and Vary as the 200 it stands in for
+        if response.status_code == 200 and 'ETag' in response.headers:
+            return response.make_conditional(request)
+        return response
+
+    return cache
@@ -0,0 +1,200 @@
+"""
+Card Correspondences
+Resolve a tarot card's full cross-system graph (path, sephiroth, planet,
+zodiac sign, ruling planet, elemental signs) for /cards/<number>/correspondences
+"""
+
+import json
+import sqlite3
+
+
+# One LEFT JOIN per related entity through the card_correspondences edges
+# built by the migration; NULL "@section" marker columns split the result row
+# back into the card and each related table's SELECT *.
+CORRESPONDENCE_QUERY = """
+    SELECT c.*,
+           (SELECT json_group_array(keyword) FROM (
+                SELECT keyword FROM keywords WHERE card_id = c.id ORDER BY keyword
+           )) AS keywords,
+           (SELECT json_group_array(json_object('name', name, 'symbol', symbol, 'modality', modality)) FROM (
+                SELECT z.name, z.symbol, z.modality
+                FROM card_correspondences e
+                JOIN zodiac_signs z ON z.id = e.target_id
+                WHERE e.card_id = c.id AND e.relation = 'elemental_sign'
+                ORDER BY z.house_number
+           )) AS elemental_zodiac,
+           NULL AS "@qabalah_path", p.*,
+           s1.name AS from_sephirah_name, s2.name AS to_sephirah_name,
+           NULL AS "@from", s1.*,
+           NULL AS "@to", s2.*,
+           NULL AS "@planet", pl.*,
+           NULL AS "@zodiac_sign", z.*,
+           NULL AS "@ruling_planet", rp.*
+    FROM cards c
+    LEFT JOIN card_correspondences ep ON ep.card_id = c.id AND ep.relation = 'path'
+    LEFT JOIN paths p ON p.id = ep.target_id
+    LEFT JOIN card_correspondences es1 ON es1.card_id = c.id AND es1.relation = 'sephirah_from'
+    LEFT JOIN sephiroth s1 ON s1.id = es1.target_id
+    LEFT JOIN card_correspondences es2 ON es2.card_id = c.id AND es2.relation = 'sephirah_to'
+    LEFT JOIN sephiroth s2 ON s2.id = es2.target_id
+    LEFT JOIN card_correspondences epl ON epl.card_id = c.id AND epl.relation = 'planet'
+    LEFT JOIN planets pl ON pl.id = epl.target_id
+    LEFT JOIN card_correspondences ez ON ez.card_id = c.id AND ez.relation = 'zodiac_sign'
+    LEFT JOIN zodiac_signs z ON z.id = ez.target_id
+    LEFT JOIN card_correspondences erp ON erp.card_id = c.id AND erp.relation = 'ruling_planet'
+    LEFT JOIN planets rp ON rp.id = erp.target_id
+    WHERE c.number = ?
+    LIMIT 1
+"""
+
+# Same payload resolved by matching names, for databases built before the
+# card_correspondences table existed
+LEGACY_CORRESPONDENCE_QUERY = """
+    SELECT c.*,
+           (SELECT json_group_array(keyword) FROM (
+                SELECT keyword FROM keywords WHERE card_id = c.id ORDER BY keyword
+           )) AS keywords,
+           (SELECT json_group_array(json_object('name', name, 'symbol', symbol, 'modality', modality)) FROM (
+                SELECT name, symbol, modality FROM zodiac_signs
+                WHERE LOWER(element) = LOWER(c.element)
+                ORDER BY house_number
+           )) AS elemental_zodiac,
+           NULL AS "@qabalah_path", p.*,
+           s1.name AS from_sephirah_name, s2.name AS to_sephirah_name,
+           NULL AS "@from", s1.*,
+           NULL AS "@to", s2.*,
+           NULL AS "@planet", pl.*,
+           NULL AS "@zodiac_sign", z.*,
+           NULL AS "@ruling_planet", rp.*
+    FROM cards c
+    LEFT JOIN paths p ON p.tarot_card_id = c.id AND c.arcana = 'Major Arcana'
+    LEFT JOIN sephiroth s1 ON s1.number = p.connects_from
+    LEFT JOIN sephiroth s2 ON s2.number = p.connects_to
+    LEFT JOIN planets pl ON LOWER(pl.name) = LOWER(c.astrology)
+    LEFT JOIN zodiac_signs z ON LOWER(z.name) = LOWER(c.astrology)
+    LEFT JOIN planets rp ON rp.name = z.ruling_planet
+    WHERE c.number = ?
+    LIMIT 1
+"""
+
+
+def dict_from_row(row):
+    """Convert sqlite3.Row (or snapshot row) to dictionary"""
+    if row is None:
+        return None
+    return dict(zip(row.keys(), row))
+
+
+def split_sections(cursor, row):
+    """Split a joined row into {'card': {...}, '<section>': {...} or None}"""
+    sections = {'card': {}}
+    current = sections['card']
+    for column, value in zip((d[0] for d in cursor.description), row):
+        if column.startswith('@'):
+            current = sections[column[1:]] = {}
+        else:
+            current[column] = value
+
+    # A LEFT JOIN that matched nothing leaves every column NULL
+    for name, section in sections.items():
+        if section.get('id') is None:
+            sections[name] = None
+    return sections
+
+
+def resolve_card_correspondences(db, number):
+    """
+    Build the correspondence payload for a card in a single query
+
+    Returns None if the card does not exist.
+    """
+    try:
+        cursor = db.execute(CORRESPONDENCE_QUERY, (number,))
+    except sqlite3.OperationalError:
+        cursor = db.execute(LEGACY_CORRESPONDENCE_QUERY, (number,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+
+    sections = split_sections(cursor, row)
+
+    card = sections['card']
+    elemental_zodiac = json.loads(card.pop('elemental_zodiac') or '[]')
+    card['keywords'] = json.loads(card['keywords'] or '[]')
+    for key in ('id', 'created_at', 'updated_at'):
+        del card[key]
+
+    result = {'card': card}
+
+    path = sections['qabalah_path']
+    if path:
+        del path['id']
+        del path['tarot_card_id']
+        result['qabalah_path'] = path
+        result['connected_sephiroth'] = {
+            'from': sections['from'],
+            'to': sections['to']
+        }
+
+    astrology_data = {}
+    if sections['planet']:
+        astrology_data['planet'] = sections['planet']
+    if sections['zodiac_sign']:
+        astrology_data['zodiac_sign'] = sections['zodiac_sign']
+        if sections['ruling_planet']:
+            astrology_data['ruling_planet'] = sections['ruling_planet']
+    if astrology_data:
+        result['astrology'] = astrology_data
+
+    if card.get('element') and elemental_zodiac:
+        result['elemental_zodiac'] = elemental_zodiac
+
+    return result
+
+
+def snapshot_card_correspondences(snapshot, card):
+    """Build the same correspondence payload from the corpus snapshot"""
+    result = {'card': card}
+
+    if card['arcana'] == 'Major Arcana':
+        path = snapshot.paths_by_card_number.get(card['number'])
+
+        if path:
+            path_dict = dict_from_row(path)
+            for key in ('id', 'tarot_card_id', 'card_number', 'card_name'):
+                del path_dict[key]
+            result['qabalah_path'] = path_dict
+
+            result['connected_sephiroth'] = {
+                'from': dict_from_row(snapshot.sephiroth_by_number.get(path['connects_from'])),
+                'to': dict_from_row(snapshot.sephiroth_by_number.get(path['connects_to']))
+            }
+
+    astrology_data = {}
+
+    if card.get('astrology'):
+        astrology = card['astrology'].lower()
+
+        planet = snapshot.planets_by_name.get(astrology)
+        if planet:
+            astrology_data['planet'] = dict_from_row(planet)
+
+        sign = snapshot.signs_by_name.get(astrology)
+        if sign:
+            astrology_data['zodiac_sign'] = dict_from_row(sign)
+
+            ruling_planet = snapshot.planets_by_exact_name.get(sign['ruling_planet'])
+            if ruling_planet:
+                astrology_data['ruling_planet'] = dict_from_row(ruling_planet)
+
+    if astrology_data:
+        result['astrology'] = astrology_data
+
+    if card.get('element'):
+        element_signs = snapshot.signs_by_element.get(card['element'].lower(), ())
+        if element_signs:
+            result['elemental_zodiac'] = [
+                dict_from_row(s.project(('name', 'symbol', 'modality'))) for s in element_signs
+            ]
+
+    return result
@@ -0,0 +1,258 @@
+"""
+Database Connections
+Shared, per-thread pool of read-only SQLite connections
+
+The corpus is never written at runtime, so instead of connecting and closing
+on every request each worker thread opens one connection the first time it
+needs it and keeps it for the life of the thread. Connections are opened with
+mode=ro&immutable=1, which lets SQLite skip file locking and change detection,
+and are tuned with read-oriented pragmas. Because a connection lives across
+requests, sqlite3's per-connection prepared statement cache is reused too.
+When a rebuilt database is published (see generations.py) the app swaps in
+a new pool on the new file. Each request keeps using the pool it started
+with, and the retired pool closes its connections once the last such
+request has finished.
+
+When a request has a QueryLog (see metrics.py), get_db() hands out the
+pooled connection wrapped in an ObservedConnection that times every
+statement, including the time spent fetching its rows.
+"""
+
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+from flask import current_app, g
+
+
+POOL_EXTENSION = 'connection_pool'
+
+# Attribute of flask.g holding the current request's QueryLog, if any
+QUERY_LOG_ATTR = 'query_log'
+
+# Attribute of flask.g holding the pool the current request is using
+POOL_ATTR = 'connection_pool'
+
+# Applied to every pooled connection (override with app.config['SQLITE_PRAGMAS'])
+DEFAULT_PRAGMAS = {
+    'query_only': 'ON',
+    'mmap_size': 268435456,  # 256 MB: map the whole file instead of read() calls
+    'cache_size': -16384,  # 16 MB page cache (negative = KiB)
+    'temp_store': 'MEMORY'
+}
+
+# Prepared statements kept per connection by the sqlite3 module
+CACHED_STATEMENTS = 256
+
+
+def database_signature(db_path):
+    """Identify a database file by inode, size and mtime (None if missing)"""
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class ConnectionPool:
+    """One read-only connection per thread for a single database file"""
+
+    def __init__(self, db_path, pragmas=None, cached_statements=CACHED_STATEMENTS):
+        self.db_path = db_path
+        self.uri = Path(db_path).resolve().as_uri() + '?mode=ro&immutable=1'
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections = []
+        self._users = 0
+        self._retired = False
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """Open and tune a new read-only connection"""
+        conn = sqlite3.connect(
+            self.uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def connection(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self.connect()
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def acquire(self):
+        """Register a request using this pool; pair with release()"""
+        with self._lock:
+            self._users += 1
+
+    def release(self):
+        """Unregister a request, closing the pool if it was the last user of a retired pool"""
+        with self._lock:
+            self._users -= 1
+            idle = self._retired and self._users == 0
+        if idle:
+            self.close_all()
+
+    def retire(self):
+        """Close every connection once no request is using the pool any more"""
+        with self._lock:
+            self._retired = True
+            idle = self._users == 0
+        if idle:
+            self.close_all()
+
+    def close_all(self):
+        """Close every connection handed out by this pool"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+class QueryLog:
+    """
+    Statement count and total SQL time for one request
+
+    With statements set to a list (tracing), every statement is also kept
+    with its parameters, duration and the number of rows fetched.
+    """
+
+    __slots__ = ('count', 'seconds', 'statements')
+
+    def __init__(self, trace=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = [] if trace else None
+
+    def begin(self, sql, params):
+        """Note a statement being executed; returns a handle for add()"""
+        self.count += 1
+        if self.statements is None:
+            return None
+        entry = {
+            'sql': ' '.join(sql.split()),
+            'params': list(params.values()) if isinstance(params, dict) else list(params),
+            'duration_ms': 0.0,
+            'rows': 0
+        }
+        self.statements.append(entry)
+        return entry
+
+    def add(self, entry, seconds, rows=0):
+        """Charge time (and fetched rows) to a statement"""
+        self.seconds += seconds
+        if entry is not None:
+            entry['duration_ms'] += seconds * 1000
+            entry['rows'] += rows
+
+
+def request_query_log(trace=False):
+    """This request's QueryLog, created on first use; trace=True keeps every statement"""
+    log = g.get(QUERY_LOG_ATTR)
+    if log is None:
+        log = QueryLog()
+        setattr(g, QUERY_LOG_ATTR, log)
+    if trace and log.statements is None:
+        log.statements = []
+    return log
+
+
+class ObservedCursor:
+    """Cursor proxy that charges fetch time and rows to its statement"""
+
+    def __init__(self, cursor, log, entry):
+        self._cursor = cursor
+        self._log = log
+        self._entry = entry
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._log.add(self._entry, time.perf_counter() - start, int(row is not None))
+        return row
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._log.add(self._entry, time.perf_counter() - start, len(rows))
+        return rows
+
+    def fetchmany(self, *args):
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(*args)
+        self._log.add(self._entry, time.perf_counter() - start, len(rows))
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+
+class ObservedConnection:
+    """Connection proxy that records every statement in a QueryLog"""
+
+    def __init__(self, conn, log):
+        self._conn = conn
+        self._log = log
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def execute(self, sql, *args):
+        entry = self._log.begin(sql, args[0] if args else ())
+        start = time.perf_counter()
+        cursor = self._conn.execute(sql, *args)
+        self._log.add(entry, time.perf_counter() - start)
+        return ObservedCursor(cursor, self._log, entry)
+
+
+def init_connection_pool(app):
+    """Create the shared connection pool for app.config['DATABASE']"""
+    pool = ConnectionPool(
+        app.config['DATABASE'],
+        pragmas=app.config.get('SQLITE_PRAGMAS'),
+        cached_statements=app.config.get('SQLITE_CACHED_STATEMENTS', CACHED_STATEMENTS)
+    )
+    app.extensions[POOL_EXTENSION] = pool
+    return pool
+
+
+def get_db():
+    """Get this thread's pooled database connection for the current app"""
+    pool = g.get(POOL_ATTR)
+    if pool is None:
+        pool = current_app.extensions.get(POOL_EXTENSION)
+        if pool is None:
+            pool = init_connection_pool(current_app)
+        pool.acquire()
+        setattr(g, POOL_ATTR, pool)
+    log = g.get(QUERY_LOG_ATTR)
+    if log is not None:
+        return ObservedConnection(pool.connection(), log)
+    return pool.connection()
+
+
+def release_db(exception=None):
+    """Teardown handler: release the pool the app context used, if any"""
+    pool = g.pop(POOL_ATTR, None)
+    if pool is not None:
+        pool.release()
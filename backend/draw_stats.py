@@ -0,0 +1,126 @@
+"""
+Draw Statistics
+Monte Carlo simulation of spread draws with NumPy batched permutations
+
+Each batch shuffles many decks at once (one row per simulated reading),
+takes the first card_count cards of every row and folds the whole batch
+into running counts with bincount, so millions of readings take seconds.
+Counts cover card-by-position frequencies, suit and element distributions
+per position, reversals per position, and how often every pair of cards
+appears together in the same reading.
+"""
+
+import numpy as np
+
+
+# Readings simulated per batch; bounds peak memory at roughly
+# BATCH_SIZE * deck size bytes for the shuffled decks
+BATCH_SIZE = 50000
+
+# Label used for cards without a suit (the Major Arcana)
+NO_SUIT = 'Major Arcana'
+
+
+class DrawStatistics:
+    """Running counts for simulated draws of one spread"""
+
+    def __init__(self, deck, card_count):
+        """
+        Args:
+            deck: Card rows in deck order with number, suit and element
+            card_count: Cards drawn per reading (spread positions)
+        """
+        self.card_count = card_count
+        self.card_numbers = np.array([card['number'] for card in deck])
+
+        suits = [card['suit'] or NO_SUIT for card in deck]
+        elements = [card['element'] or 'None' for card in deck]
+        self.suit_labels = sorted(set(suits))
+        self.element_labels = sorted(set(elements))
+        self.suit_codes = np.array([self.suit_labels.index(s) for s in suits])
+        self.element_codes = np.array([self.element_labels.index(e) for e in elements])
+
+        deck_size = len(deck)
+        self.iterations = 0
+        self.position_card = np.zeros((card_count, deck_size), dtype=np.int64)
+        self.position_suit = np.zeros((card_count, len(self.suit_labels)), dtype=np.int64)
+        self.position_element = np.zeros((card_count, len(self.element_labels)), dtype=np.int64)
+        self.position_reversed = np.zeros(card_count, dtype=np.int64)
+        self.pairs = np.zeros((deck_size, deck_size), dtype=np.int64)
+
+    def add_batch(self, draws, reversed_mask):
+        """
+        Fold a batch of readings into the counts
+
+        Args:
+            draws: (readings, card_count) array of deck indexes
+            reversed_mask: (readings, card_count) boolean array
+        """
+        deck_size = len(self.card_numbers)
+        positions = np.arange(self.card_count)
+
+        def count_by_position(codes, width):
+            flat = (codes + positions * width).ravel()
+            return np.bincount(flat, minlength=self.card_count * width).reshape(self.card_count, width)
+
+        self.iterations += len(draws)
+        self.position_card += count_by_position(draws, deck_size)
+        self.position_suit += count_by_position(self.suit_codes[draws], len(self.suit_labels))
+        self.position_element += count_by_position(self.element_codes[draws], len(self.element_labels))
+        self.position_reversed += reversed_mask.sum(axis=0)
+
+        # Cards never repeat within a reading, so each position pair adds
+        # exactly one unordered pair per reading
+        for i in range(self.card_count):
+            for j in range(i + 1, self.card_count):
+                flat = draws[:, i] * deck_size + draws[:, j]
+                self.pairs += np.bincount(flat, minlength=deck_size * deck_size).reshape(deck_size, deck_size)
+
+    def to_dict(self):
+        """JSON-ready summary; card matrices are indexed by deck order (card_numbers)"""
+        pairs = self.pairs + self.pairs.T
+
+        return {
+            'iterations': self.iterations,
+            'card_numbers': self.card_numbers.tolist(),
+            'position_card_counts': self.position_card.tolist(),
+            'suit_labels': self.suit_labels,
+            'position_suit_counts': self.position_suit.tolist(),
+            'element_labels': self.element_labels,
+            'position_element_counts': self.position_element.tolist(),
+            'position_reversed_counts': self.position_reversed.tolist(),
+            'pair_counts': pairs.tolist()
+        }
+
+
+def simulate_draws(deck, card_count, iterations, seed, reversal_probability=0.0,
+                   batch_size=BATCH_SIZE):
+    """
+    Simulate iterations readings of card_count cards, batch by batch
+
+    Yields the same DrawStatistics after every batch so callers can report
+    progress; stats.iterations is the number of readings completed.
+    """
+    rng = np.random.default_rng(seed)
+    stats = DrawStatistics(deck, card_count)
+    deck_indexes = np.arange(len(deck), dtype=np.uint8 if len(deck) <= 256 else np.int64)
+
+    remaining = iterations
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        decks = rng.permuted(np.broadcast_to(deck_indexes, (size, len(deck))), axis=1)
+        draws = decks[:, :card_count].astype(np.int64)
+        reversed_mask = rng.random((size, card_count)) < reversal_probability
+        stats.add_batch(draws, reversed_mask)
+        remaining -= size
+        yield stats
+
+
+def run_simulation(deck, card_count, iterations, seed, reversal_probability=0.0,
+                   batch_size=BATCH_SIZE):
+    """Run simulate_draws to completion and return the final DrawStatistics"""
+    stats = None
+    for stats in simulate_draws(deck, card_count, iterations, seed,
+                                reversal_probability, batch_size):
+        pass
+    return stats
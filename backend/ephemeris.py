@@ -0,0 +1,257 @@
+"""
+Ephemeris
+Vectorized sunrise/sunset, planetary hour and lunar mansion calculations
+
+Solar positions use the NOAA solar calculator equations (accurate to about a
+minute between latitudes +/-72 degrees) and the Moon's longitude uses the
+largest periodic terms of Meeus' lunar theory (a few hundredths of a
+degree). Everything is evaluated with NumPy over whole arrays of days or
+timestamps, so a month or a year costs the same handful of array operations
+as a single date. Times are Unix timestamps (UTC seconds).
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+
+SECONDS_PER_DAY = 86400
+
+# Julian day of the Unix epoch (1970-01-01 00:00 UTC) and of J2000.0
+JULIAN_UNIX_EPOCH = 2440587.5
+JULIAN_J2000 = 2451545.0
+
+# Sun's altitude at rise/set: refraction plus the solar disc's radius
+SUNRISE_ZENITH = 90.833
+
+# Chaldean order, slowest to fastest; each planetary hour passes to the next
+CHALDEAN_ORDER = ('Saturn', 'Jupiter', 'Mars', 'Sun', 'Venus', 'Mercury', 'Moon')
+
+# Ruler of each weekday (and of its first hour), starting with Sunday
+DAY_RULERS = ('Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn')
+
+# Longest run of days a single range request may compute
+MAX_RANGE_DAYS = 366
+
+# Dates and times the endpoints accept: a day inside datetime's range at
+# each end, so the following day's sunrise still formats in any time zone
+FIRST_DATE = date(1, 1, 2)
+LAST_DATE = date(9999, 12, 29)
+EARLIEST_TIMESTAMP = datetime(1, 1, 2, tzinfo=timezone.utc).timestamp()
+LATEST_TIMESTAMP = datetime(9999, 12, 30, tzinfo=timezone.utc).timestamp()
+
+# (coefficient in 1e-6 degrees, D, M, M', F) multiples for the Moon's longitude
+# (Meeus, Astronomical Algorithms, table 47.A, terms above 0.004 degrees)
+MOON_LONGITUDE_TERMS = (
+    (6288774, 0, 0, 1, 0),
+    (1274027, 2, 0, -1, 0),
+    (658314, 2, 0, 0, 0),
+    (213618, 0, 0, 2, 0),
+    (-185116, 0, 1, 0, 0),
+    (-114332, 0, 0, 0, 2),
+    (58793, 2, 0, -2, 0),
+    (57066, 2, -1, -1, 0),
+    (53322, 2, 0, 1, 0),
+    (45758, 2, -1, 0, 0),
+    (-40923, 0, 1, -1, 0),
+    (-34720, 1, 0, 0, 0),
+    (-30383, 0, 1, 1, 0),
+    (15327, 2, 0, 0, -2),
+    (-12528, 0, 0, 1, 2),
+    (10980, 0, 0, 1, -2),
+    (10675, 4, 0, -1, 0),
+    (10034, 0, 0, 3, 0),
+    (8548, 4, 0, -2, 0),
+    (-7888, 2, 1, -1, 0),
+    (-6766, 2, 1, 0, 0),
+    (-5163, 1, 0, -1, 0),
+    (4987, 1, 1, 0, 0),
+    (4036, 2, -1, 1, 0)
+)
+_MOON_TERMS = np.array(MOON_LONGITUDE_TERMS, dtype=float)
+
+# Sampling step used to bracket mansion ingresses; the Moon moves about
+# half a degree an hour, far less than a mansion's 12.86 degrees
+INGRESS_STEP_SECONDS = 3600
+
+
+def epoch_days(start, count=1):
+    """Array of count consecutive days (days since 1970-01-01) from a date"""
+    first = (start - date(1970, 1, 1)).days
+    return np.arange(first, first + count)
+
+
+def weekday_index(days):
+    """0 = Sunday ... 6 = Saturday for days since the Unix epoch (a Thursday)"""
+    return (np.asarray(days) + 4) % 7
+
+
+def sun_times(days, latitude, longitude):
+    """
+    Sunrise and sunset for each day at a location
+
+    Args:
+        days: Array of days since 1970-01-01 (the local calendar date)
+        latitude: Degrees north
+        longitude: Degrees east
+
+    Returns (sunrise, sunset) arrays of Unix timestamps. Days on which the
+    Sun never rises or never sets (polar day/night) are NaN.
+    """
+    days = np.asarray(days, dtype=float)
+
+    # Evaluate the Sun's position at local solar noon of each day
+    julian_day = days + JULIAN_UNIX_EPOCH + 0.5 - longitude / 360.0
+    t = (julian_day - JULIAN_J2000) / 36525.0
+
+    mean_longitude = np.mod(280.46646 + t * (36000.76983 + t * 0.0003032), 360.0)
+    mean_anomaly = np.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    eccentricity = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+
+    center = (np.sin(mean_anomaly) * (1.914602 - t * (0.004817 + 0.000014 * t))
+              + np.sin(2 * mean_anomaly) * (0.019993 - 0.000101 * t)
+              + np.sin(3 * mean_anomaly) * 0.000289)
+    omega = np.radians(125.04 - 1934.136 * t)
+    apparent_longitude = np.radians(mean_longitude + center - 0.00569 - 0.00478 * np.sin(omega))
+
+    mean_obliquity = 23.0 + (26.0 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60.0) / 60.0
+    obliquity = np.radians(mean_obliquity + 0.00256 * np.cos(omega))
+    declination = np.arcsin(np.sin(obliquity) * np.sin(apparent_longitude))
+
+    # Equation of time in minutes
+    y = np.tan(obliquity / 2) ** 2
+    l0 = np.radians(mean_longitude)
+    equation_of_time = 4 * np.degrees(
+        y * np.sin(2 * l0)
+        - 2 * eccentricity * np.sin(mean_anomaly)
+        + 4 * eccentricity * y * np.sin(mean_anomaly) * np.cos(2 * l0)
+        - 0.5 * y * y * np.sin(4 * l0)
+        - 1.25 * eccentricity * eccentricity * np.sin(2 * mean_anomaly)
+    )
+
+    lat = np.radians(latitude)
+    cos_hour_angle = (np.cos(np.radians(SUNRISE_ZENITH)) / (np.cos(lat) * np.cos(declination))
+                      - np.tan(lat) * np.tan(declination))
+    with np.errstate(invalid='ignore'):
+        hour_angle = np.degrees(np.arccos(cos_hour_angle))  # NaN during polar day/night
+
+    # Minutes after 00:00 UTC
+    solar_noon = 720.0 - 4.0 * longitude - equation_of_time
+    midnight = days * SECONDS_PER_DAY
+    sunrise = midnight + (solar_noon - 4.0 * hour_angle) * 60.0
+    sunset = midnight + (solar_noon + 4.0 * hour_angle) * 60.0
+    return sunrise, sunset
+
+
+def planetary_hours(days, latitude, longitude):
+    """
+    The 24 unequal planetary hours of each day at a location
+
+    Day hours divide sunrise-sunset into twelve, night hours divide sunset
+    to the next sunrise. The first hour belongs to the day's ruler and the
+    rest follow the Chaldean order.
+
+    Returns a dict of arrays:
+        sunrise, sunset, next_sunrise: (days,) Unix timestamps
+        starts, ends: (days, 24) Unix timestamps
+        rulers: (days, 24) indexes into CHALDEAN_ORDER
+        day_rulers: (days,) indexes into DAY_RULERS
+    """
+    days = np.asarray(days)
+
+    # One extra day supplies the sunrise that ends the last night
+    sunrise, sunset = sun_times(np.append(days, days[-1] + 1), latitude, longitude)
+    next_sunrise = sunrise[1:]
+    sunrise, sunset = sunrise[:-1], sunset[:-1]
+
+    twelfths = np.arange(12)
+    day_length = (sunset - sunrise)[:, None] / 12
+    night_length = (next_sunrise - sunset)[:, None] / 12
+    starts = np.hstack([sunrise[:, None] + twelfths * day_length,
+                        sunset[:, None] + twelfths * night_length])
+    ends = np.hstack([starts[:, 1:], next_sunrise[:, None]])
+
+    day_rulers = weekday_index(days)
+    first_hour = np.array([CHALDEAN_ORDER.index(p) for p in DAY_RULERS])[day_rulers]
+    rulers = (first_hour[:, None] + np.arange(24)) % len(CHALDEAN_ORDER)
+
+    return {
+        'sunrise': sunrise,
+        'sunset': sunset,
+        'next_sunrise': next_sunrise,
+        'starts': starts,
+        'ends': ends,
+        'rulers': rulers,
+        'day_rulers': day_rulers
+    }
+
+
+def moon_longitude(timestamps):
+    """
+    The Moon's tropical ecliptic longitude in degrees [0, 360)
+
+    Args:
+        timestamps: Unix timestamp or array of timestamps
+    """
+    t = (np.asarray(timestamps, dtype=float) / SECONDS_PER_DAY + JULIAN_UNIX_EPOCH - JULIAN_J2000) / 36525.0
+
+    mean_longitude = 218.3164477 + 481267.88123421 * t
+    elongation = np.radians(297.8501921 + 445267.1114034 * t)
+    sun_anomaly = np.radians(357.5291092 + 35999.0502909 * t)
+    moon_anomaly = np.radians(134.9633964 + 477198.8675055 * t)
+    latitude_argument = np.radians(93.2720950 + 483202.0175233 * t)
+
+    arguments = np.stack([elongation, sun_anomaly, moon_anomaly, latitude_argument], axis=-1)
+    periodic = np.sin(arguments @ _MOON_TERMS[:, 1:].T) @ _MOON_TERMS[:, 0] / 1e6
+
+    return np.mod(mean_longitude + periodic, 360.0)
+
+
+def mansion_index(longitudes, degrees_start):
+    """Index into degrees_start (sorted mansion start degrees) of the mansion holding each longitude"""
+    return np.searchsorted(degrees_start, longitudes, side='right') - 1
+
+
+def mansion_ingresses(start, end, degrees_start):
+    """
+    Every time the Moon enters a new mansion between two timestamps
+
+    The Moon's longitude is sampled on an hourly grid in one vectorized pass,
+    each change of mansion is located by interpolation and then refined with
+    one Newton step, giving times accurate to well under a minute.
+
+    Returns (timestamps, indexes) arrays; indexes point into degrees_start.
+    """
+    degrees_start = np.asarray(degrees_start, dtype=float)
+    grid = np.arange(start, end + INGRESS_STEP_SECONDS, INGRESS_STEP_SECONDS, dtype=float)
+    longitudes = moon_longitude(grid)
+    indexes = mansion_index(longitudes, degrees_start)
+
+    changes = np.nonzero(indexes[1:] != indexes[:-1])[0]
+    entered = indexes[changes + 1]
+    boundary = degrees_start[entered]
+
+    rate = np.mod(longitudes[changes + 1] - longitudes[changes], 360.0) / INGRESS_STEP_SECONDS
+    times = grid[changes] + np.mod(boundary - longitudes[changes], 360.0) / rate
+
+    # One Newton step against the true longitude at the interpolated time
+    error = np.mod(boundary - moon_longitude(times) + 180.0, 360.0) - 180.0
+    times = times + error / rate
+
+    inside = (times >= start) & (times < end)
+    return times[inside], entered[inside]
+
+
+def format_timestamp(timestamp, tz=None):
+    """ISO 8601 string for a Unix timestamp (None for NaN), in tz or UTC"""
+    if timestamp != timestamp:
+        return None
+    moment = datetime.fromtimestamp(round(float(timestamp)), timezone.utc)
+    if tz is not None:
+        return moment.astimezone(tz).isoformat()
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def day_date(day):
+    """ISO date string for a day number since the Unix epoch"""
+    return (date(1970, 1, 1) + timedelta(days=int(day))).isoformat()
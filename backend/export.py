@@ -0,0 +1,175 @@
+"""
+Corpus Export
+Stream every entity in the database as newline-delimited JSON (NDJSON)
+
+Each line is {"type": "<entity type>", "data": {...}} where data has the same
+shape the REST endpoints return. Records are produced lazily from database
+cursors (or the corpus snapshot) so memory use stays constant no matter how
+large the corpus grows. Used by GET /export and scripts/export_corpus.py.
+"""
+
+import json
+import zlib
+
+
+# Entity types in export order
+EXPORT_TYPES = ('cards', 'sephiroth', 'paths', 'planets', 'zodiac_signs', 'rituals')
+
+EXPORT_QUERIES = {
+    'cards': """
+        SELECT c.*,
+               (SELECT json_group_array(keyword) FROM (
+                    SELECT keyword FROM keywords WHERE card_id = c.id ORDER BY keyword
+               )) AS keywords,
+               (SELECT json_group_object(system_name, json_object(
+                    'description', description,
+                    'upright_meaning', upright_meaning,
+                    'reversed_meaning', reversed_meaning,
+                    'key_imagery', key_imagery,
+                    'divinatory_meaning', divinatory_meaning,
+                    'esoteric_meaning', esoteric_meaning
+               )) FROM system_descriptions WHERE card_id = c.id) AS system_descriptions
+        FROM cards c
+        ORDER BY c.number
+    """,
+    'sephiroth': """
+        SELECT * FROM sephiroth ORDER BY number
+    """,
+    'paths': """
+        SELECT p.*, c.number as card_number, c.name as card_name,
+               s1.name as from_sephirah_name, s2.name as to_sephirah_name
+        FROM paths p
+        LEFT JOIN cards c ON p.tarot_card_id = c.id
+        LEFT JOIN sephiroth s1 ON p.connects_from = s1.number
+        LEFT JOIN sephiroth s2 ON p.connects_to = s2.number
+        ORDER BY p.number
+    """,
+    'planets': """
+        SELECT p.*, s.name as sephiroth_name
+        FROM planets p
+        LEFT JOIN sephiroth s ON p.sephiroth_number = s.number
+        ORDER BY p.id
+    """,
+    'zodiac_signs': """
+        SELECT z.*, p.symbol as ruling_planet_symbol, p.day_of_week as ruling_day
+        FROM zodiac_signs z
+        LEFT JOIN planets p ON z.ruling_planet = p.name
+        ORDER BY z.house_number
+    """,
+    'rituals': """
+        SELECT * FROM rituals ORDER BY id
+    """
+}
+
+# Columns stored as JSON text that the API returns parsed
+JSON_COLUMNS = {
+    'cards': ('keywords', 'system_descriptions'),
+    'planets': ('rules_signs',),
+    'zodiac_signs': ('keywords',),
+    'rituals': ('requires_tools',)
+}
+
+# Internal columns the API never exposes
+HIDDEN_COLUMNS = {
+    'cards': ('id', 'created_at', 'updated_at')
+}
+
+# Bytes of NDJSON buffered before a chunk is handed to the server
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_export_types(value):
+    """Validate a comma-separated ?types= value; raises ValueError if unknown"""
+    if not value:
+        return EXPORT_TYPES
+    types = [t.strip() for t in value.split(',') if t.strip()]
+    unknown = [t for t in types if t not in EXPORT_TYPES]
+    if unknown:
+        raise ValueError(
+            f'Unknown export types: {", ".join(unknown)}. Valid types: {", ".join(EXPORT_TYPES)}'
+        )
+    return tuple(t for t in EXPORT_TYPES if t in types)
+
+
+def _record(entity_type, keys, values):
+    data = dict(zip(keys, values))
+    for column in HIDDEN_COLUMNS.get(entity_type, ()):
+        data.pop(column, None)
+    for column in JSON_COLUMNS.get(entity_type, ()):
+        if data.get(column):
+            try:
+                data[column] = json.loads(data[column])
+            except ValueError:
+                pass
+    if entity_type == 'cards':
+        data['keywords'] = data.get('keywords') or []
+        data['system_descriptions'] = data.get('system_descriptions') or {}
+    return {'type': entity_type, 'data': data}
+
+
+def iter_records(db, types=EXPORT_TYPES):
+    """Yield export records for each requested type straight from SQLite cursors"""
+    for entity_type in types:
+        cursor = db.execute(EXPORT_QUERIES[entity_type])
+        keys = [d[0] for d in cursor.description]
+        for row in cursor:
+            yield _record(entity_type, keys, row)
+
+
+def iter_snapshot_records(snapshot, types=EXPORT_TYPES):
+    """Yield the same export records from a CorpusSnapshot"""
+    sources = {
+        'cards': lambda: snapshot.cards,
+        'sephiroth': lambda: snapshot.sephiroth,
+        'paths': lambda: snapshot.paths,
+        'planets': lambda: (snapshot.planet_with_sephirah(p) for p in snapshot.planets),
+        'zodiac_signs': lambda: (snapshot.sign_with_ruler(s) for s in snapshot.signs),
+        'rituals': lambda: snapshot.rituals
+    }
+    for entity_type in types:
+        for row in sources[entity_type]():
+            keys, values = row.keys(), list(row)
+            if entity_type == 'cards':
+                systems = {
+                    sd['system_name']: {
+                        'description': sd['description'],
+                        'upright_meaning': sd['upright_meaning'],
+                        'reversed_meaning': sd['reversed_meaning'],
+                        'key_imagery': sd['key_imagery'],
+                        'divinatory_meaning': sd['divinatory_meaning'],
+                        'esoteric_meaning': sd['esoteric_meaning']
+                    }
+                    for sd in snapshot.system_descriptions_by_card.get(row['id'], ())
+                }
+                keys = keys + ['keywords', 'system_descriptions']
+                values = values + [
+                    json.dumps(snapshot.sorted_keywords_by_card.get(row['id'], ())),
+                    json.dumps(systems)
+                ]
+            yield _record(entity_type, keys, values)
+
+
+def iter_ndjson(records, chunk_size=CHUNK_SIZE):
+    """Encode records as NDJSON, yielding UTF-8 chunks of roughly chunk_size bytes"""
+    buffer = []
+    size = 0
+    for record in records:
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_gzip(chunks, level=6):
+    """Gzip-compress a stream of byte chunks incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
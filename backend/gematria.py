@@ -0,0 +1,198 @@
+"""
+Gematria
+Numerical values of Hebrew and English words, and a reverse value index
+
+Hebrew words are valued by the standard (mispar hechrachi), ordinal
+(mispar siduri) and reduced (mispar katan) methods; Latin-script words by
+English ordinal, reduced (Pythagorean), standard (Hebrew-style place values)
+and the English Qabalah (ALW) cipher. The GematriaIndex maps every value
+of every method to the sephiroth, divine names, archangels, path letters
+and cards that share it, so "what else equals 418" is a dictionary lookup.
+"""
+
+import re
+
+
+# (letter, name, standard value), in alphabet order; the ordinal value is the position
+HEBREW_LETTERS = (
+    ('א', 'Aleph', 1), ('ב', 'Beth', 2), ('ג', 'Gimel', 3), ('ד', 'Daleth', 4),
+    ('ה', 'Heh', 5), ('ו', 'Vau', 6), ('ז', 'Zain', 7), ('ח', 'Cheth', 8),
+    ('ט', 'Teth', 9), ('י', 'Yod', 10), ('כ', 'Kaph', 20), ('ל', 'Lamed', 30),
+    ('מ', 'Mem', 40), ('נ', 'Nun', 50), ('ס', 'Samekh', 60), ('ע', 'Ayin', 70),
+    ('פ', 'Peh', 80), ('צ', 'Tzaddi', 90), ('ק', 'Qoph', 100), ('ר', 'Resh', 200),
+    ('ש', 'Shin', 300), ('ת', 'Tau', 400)
+)
+
+# Final forms count as their ordinary letter
+HEBREW_FINALS = {'ך': 'כ', 'ם': 'מ', 'ן': 'נ', 'ף': 'פ', 'ץ': 'צ'}
+
+# Letter names spelled in full (used for the "letter name" entities, e.g. Cheth = 418)
+HEBREW_LETTER_SPELLINGS = {
+    'Aleph': 'אלף', 'Beth': 'בית', 'Gimel': 'גמל', 'Daleth': 'דלת', 'Heh': 'הה',
+    'Vau': 'וו', 'Zain': 'זין', 'Cheth': 'חית', 'Teth': 'טית', 'Yod': 'יוד',
+    'Kaph': 'כף', 'Lamed': 'למד', 'Mem': 'מם', 'Nun': 'נון', 'Samekh': 'סמך',
+    'Ayin': 'עין', 'Peh': 'פה', 'Tzaddi': 'צדי', 'Qoph': 'קוף', 'Resh': 'ריש',
+    'Shin': 'שין', 'Tau': 'תו'
+}
+
+# Alternative transliterations found in the corpus and in common use
+LETTER_ALIASES = {
+    'alef': 'Aleph', 'bet': 'Beth', 'dalet': 'Daleth', 'he': 'Heh', 'hé': 'Heh',
+    'vav': 'Vau', 'waw': 'Vau', 'zayin': 'Zain', 'heth': 'Cheth', 'chet': 'Cheth',
+    'tet': 'Teth', 'yud': 'Yod', 'kaf': 'Kaph', 'lamedh': 'Lamed', 'samech': 'Samekh',
+    'pe': 'Peh', 'tzadi': 'Tzaddi', 'tzade': 'Tzaddi', 'qof': 'Qoph', 'kuf': 'Qoph',
+    'tav': 'Tau', 'taw': 'Tau'
+}
+
+# Hebrew spellings of the divine names and archangels as stored in the sephiroth table
+HEBREW_NAMES = {
+    'Eheieh (I Am)': 'אהיה',
+    'Jehovah (Yah)': 'יה',
+    'Jehovah Elohim': 'יהוה אלהים',
+    'El': 'אל',
+    'Elohim Gibor': 'אלהים גבור',
+    'Jehovah Aloah va Daath': 'יהוה אלוה ודעת',
+    'Jehovah Tzabaoth': 'יהוה צבאות',
+    'Elohim Tzabaoth': 'אלהים צבאות',
+    'Shaddai El Chai': 'שדי אל חי',
+    'Adonai ha-Aretz': 'אדני הארץ',
+    'Metatron': 'מטטרון',
+    'Raziel': 'רזיאל',
+    'Tzaphkiel': 'צפקיאל',
+    'Tzadkiel': 'צדקיאל',
+    'Samael': 'סמאל',
+    'Kamael': 'כמאל',
+    'Michael': 'מיכאל',
+    'Haniel': 'האניאל',
+    'Raphael': 'רפאל',
+    'Gabriel': 'גבריאל',
+    'Sandalphon': 'סנדלפון'
+}
+
+_HEBREW_STANDARD = {letter: value for letter, _, value in HEBREW_LETTERS}
+_HEBREW_ORDINAL = {letter: index for index, (letter, _, _) in enumerate(HEBREW_LETTERS, start=1)}
+_LETTERS_BY_NAME = {name.lower(): letter for letter, name, _ in HEBREW_LETTERS}
+
+
+def _reduce(value):
+    """Drop trailing zeros: 400 -> 4, 90 -> 9 (mispar katan per letter)"""
+    while value >= 10 and value % 10 == 0:
+        value //= 10
+    return value
+
+
+_HEBREW_REDUCED = {letter: _reduce(value) for letter, value in _HEBREW_STANDARD.items()}
+
+# English ciphers: letter -> value for A..Z
+_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_ENGLISH_ORDINAL = {c: i for i, c in enumerate(_ALPHABET, start=1)}
+_ENGLISH_REDUCED = {c: (i - 1) % 9 + 1 for c, i in _ENGLISH_ORDINAL.items()}
+_ENGLISH_STANDARD = {c: (i % 9 + 1) * 10 ** (i // 9) for i, c in enumerate(_ALPHABET)}
+_ENGLISH_QABALAH = {c: i for i, c in enumerate('ALWHSDOZKVGRCNYJUFQBMXITEP', start=1)}
+
+# method -> (script, letter values, description)
+METHODS = {
+    'standard': ('hebrew', _HEBREW_STANDARD, 'Mispar hechrachi: Aleph 1 ... Tau 400'),
+    'ordinal': ('hebrew', _HEBREW_ORDINAL, 'Mispar siduri: each letter\'s position, Aleph 1 ... Tau 22'),
+    'reduced': ('hebrew', _HEBREW_REDUCED, 'Mispar katan: standard values without zeros, Tau 4'),
+    'english_ordinal': ('latin', _ENGLISH_ORDINAL, 'A 1 ... Z 26'),
+    'english_reduced': ('latin', _ENGLISH_REDUCED, 'Pythagorean: A 1 ... I 9, J 1 ... R 9, S 1 ... Z 8'),
+    'english_standard': ('latin', _ENGLISH_STANDARD, 'Hebrew-style place values: A 1 ... I 9, J 10 ... R 90, S 100 ... Z 800'),
+    'english_qabalah': ('latin', _ENGLISH_QABALAH, 'English Qabalah (ALW cipher): A 1, L 2, W 3 ... P 26')
+}
+
+LATIN_METHODS = tuple(method for method, spec in METHODS.items() if spec[0] == 'latin')
+
+_NON_HEBREW = re.compile(r'[^א-ת]')
+
+
+def hebrew_letters(text):
+    """Only the Hebrew letters of text (vowel points removed, finals normalized)"""
+    return [HEBREW_FINALS.get(c, c) for c in _NON_HEBREW.sub('', text or '')]
+
+
+def latin_letters(text):
+    """Only the A-Z letters of text, upper-cased"""
+    return [c for c in (text or '').upper() if c in _ENGLISH_ORDINAL]
+
+
+def letter_for_name(name):
+    """Hebrew letter for a transliterated letter name ("Cheth", "Vav", "Heh (Tzaddi ...)")"""
+    if not name:
+        return None
+    first = name.split()[0].strip('(),').lower()
+    first = LETTER_ALIASES.get(first, first).lower()
+    return _LETTERS_BY_NAME.get(first)
+
+
+def calculate(text, methods=None):
+    """
+    Value of text under each method that applies to it
+
+    Hebrew methods apply when text has Hebrew letters, English ones when it
+    has Latin letters. Returns {method: value}.
+    """
+    hebrew = hebrew_letters(text)
+    latin = latin_letters(text)
+    values = {}
+    for method in methods or METHODS:
+        script, table, _ = METHODS[method]
+        letters = hebrew if script == 'hebrew' else latin
+        if letters:
+            values[method] = sum(table[c] for c in letters)
+    return values
+
+
+class GematriaIndex:
+    """Reverse index: method -> value -> entities with that value"""
+
+    def __init__(self, sephiroth, paths, cards):
+        """
+        Args:
+            sephiroth: Rows with number, name, name_hebrew, divine_name, archangel
+            paths: Rows with number, hebrew_letter
+            cards: Rows with number, name, hebrew_letter
+        """
+        self.entities = []  # (entity, {method: value})
+
+        for s in sephiroth:
+            ref = f'sephirah:{s["number"]}'
+            self._add('sephirah', s['name'], s['name_hebrew'], ref)
+            if s['divine_name']:
+                self._add('divine_name', s['divine_name'], HEBREW_NAMES.get(s['divine_name']), ref)
+            if s['archangel']:
+                self._add('archangel', s['archangel'], HEBREW_NAMES.get(s['archangel']), ref)
+
+        path_refs = {}
+        for p in paths:
+            letter = letter_for_name(p['hebrew_letter'])
+            if letter:
+                path_refs[letter] = f'path:{p["number"]}'
+                self._add('path_letter', p['hebrew_letter'], letter, path_refs[letter], latin=False)
+
+        # Letter names spelled in full, referring to the path of their letter
+        for letter, name, _ in HEBREW_LETTERS:
+            self._add('letter_name', name, HEBREW_LETTER_SPELLINGS[name], path_refs.get(letter), latin=False)
+
+        for c in cards:
+            self._add('card', c['name'], letter_for_name(c['hebrew_letter']), f'card:{c["number"]}')
+
+        self.by_value = {method: {} for method in METHODS}
+        for entity, values in self.entities:
+            for method, value in values.items():
+                self.by_value[method].setdefault(value, []).append(entity)
+
+    def _add(self, entity_type, name, hebrew, ref, latin=True):
+        values = calculate(hebrew) if hebrew else {}
+        if latin:
+            values.update(calculate(name, LATIN_METHODS))
+        entity = {'type': entity_type, 'name': name, 'hebrew': hebrew, 'ref': ref}
+        self.entities.append((entity, values))
+
+    def lookup(self, method, value):
+        """Entities whose value under method equals value"""
+        return self.by_value.get(method, {}).get(value, [])
+
+    def matches(self, values):
+        """For each method in a calculate() result, the entities sharing that value"""
+        return {method: self.lookup(method, value) for method, value in values.items()}
@@ -0,0 +1,121 @@
+"""
+Database Generations
+Switch to a republished database without restarting the server
+
+scripts/migrate_to_sqlite.py publishes a rebuild by renaming a finished file
+over esoteric_knowledge.db, so the path always names a complete database:
+the old file until the rename, the new one after. Connections opened before
+the rename keep reading the old file (immutable connections never look at
+the path again), so requests in flight are unaffected.
+
+A before_request hook stats the path at most once every
+DATABASE_CHECK_INTERVAL seconds. When its inode, size or mtime changes, the
+request that noticed builds the new state off to the side: a fresh
+connection pool on the new file and, from it, the snapshot, Tree of Life
+graph and gematria index. Only once all of them are built are they swapped
+into the app together, and the generation number (which the response cache
+keys on) is bumped. If any of them fails to build, nothing is swapped and
+the previous generation keeps serving. Other threads keep serving the
+previous state while the build runs; the old pool's connections are closed
+once the requests still using it have finished.
+"""
+
+import threading
+import time
+
+from flask import Flask, current_app
+
+from database import POOL_EXTENSION, init_connection_pool, database_signature, release_db
+
+
+GENERATION_EXTENSION = 'database_generation'
+
+# Seconds between checks of the database file (override with app.config['DATABASE_CHECK_INTERVAL'])
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+class GenerationWatch:
+    """Tracks which build of the database file the app is serving"""
+
+    def __init__(self, db_path, reloaders=(), interval=DEFAULT_CHECK_INTERVAL):
+        self.db_path = db_path
+        self.reloaders = tuple(reloaders)
+        self.interval = interval
+        self.generation = 1
+        self.signature = database_signature(db_path)
+        self._next_check = time.monotonic() + interval
+        self._lock = threading.Lock()
+
+    def check(self, app):
+        """Reload app's database state if the file was replaced; True when it was"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+
+        with self._lock:
+            if now < self._next_check:
+                return False
+            self._next_check = now + self.interval
+
+            signature = database_signature(self.db_path)
+            if signature is None or signature == self.signature:
+                return False
+            self.signature = signature
+            self.reload(app)
+            return True
+
+    def reload(self, app):
+        """Build state from the new file off to the side, then publish it with the next generation"""
+        # A bare app with the same config; the reloaders build into its extensions
+        staging = Flask(app.import_name)
+        staging.config.update(app.config)
+        staging.teardown_appcontext(release_db)
+        pool = init_connection_pool(staging)
+
+        try:
+            for reloader in self.reloaders:
+                reloader(staging)
+        except Exception:
+            # A broken file is reported but doesn't take the API down: the
+            # previous generation keeps serving until the next publish
+            pool.close_all()
+            app.logger.exception('Reloading %s failed', self.db_path)
+            return
+
+        retired = app.extensions.get(POOL_EXTENSION)
+        app.extensions.update(staging.extensions)
+        self.generation += 1
+        if retired is not None:
+            retired.retire()
+        app.logger.info('Serving database generation %d from %s', self.generation, self.db_path)
+
+
+def init_database_watch(app, reloaders=()):
+    """
+    Watch app.config['DATABASE'] for republished builds unless DATABASE_WATCH is False
+
+    Args:
+        app: The Flask app
+        reloaders: Functions taking an app that build its in-memory state
+            from the database into app.extensions (e.g. init_snapshot), run
+            in order against a staging app on each switch
+    """
+    if not app.config.get('DATABASE_WATCH', True):
+        return None
+
+    watch = app.extensions[GENERATION_EXTENSION] = GenerationWatch(
+        app.config['DATABASE'],
+        reloaders,
+        interval=app.config.get('DATABASE_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL)
+    )
+
+    @app.before_request
+    def check_database_generation():
+        watch.check(app)
+
+    return watch
+
+
+def get_database_watch():
+    """The current app's GenerationWatch, or None when watching is disabled"""
+    return current_app.extensions.get(GENERATION_EXTENSION)
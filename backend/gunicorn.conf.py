@@ -0,0 +1,32 @@
+"""
+Gunicorn configuration for the production API
+
+Usage (from backend/):
+    gunicorn -c gunicorn.conf.py
+
+Override with EMERALD_BIND, EMERALD_WORKERS and EMERALD_THREADS.
+"""
+
+import os
+
+from runtime import available_cpus
+
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('EMERALD_BIND', '0.0.0.0:5000')
+
+# Build the app, its in-memory indexes and warm caches in the master before forking
+preload_app = True
+
+# Handlers are CPU-bound Python, so one process per CPU sidesteps the GIL;
+# a few threads per process overlap SQLite reads and slow clients
+workers = int(os.environ.get('EMERALD_WORKERS', max(2, available_cpus())))
+worker_class = 'gthread'
+threads = int(os.environ.get('EMERALD_THREADS', 4))
+
+# Keep idle connections from the reverse proxy open between requests
+keepalive = 5
+
+timeout = 30
+graceful_timeout = 30
+accesslog = '-'
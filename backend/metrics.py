@@ -0,0 +1,156 @@
+"""
+Metrics
+Per-route latency, response size and SQL histograms in Prometheus text format
+
+A before_request hook starts a timer and gives the request a QueryLog, so
+every statement run through get_db() is counted and timed. An after_request
+hook folds the request into the histograms, labelled by the route's URL rule
+(e.g. /cards/<int:number>) rather than the raw path to keep label counts
+bounded. GET /metrics renders everything in the Prometheus exposition
+format. Counts are per process: with several workers, scrape each one.
+"""
+
+from bisect import bisect_left
+import threading
+import time
+
+from flask import g, request
+
+from database import QUERY_LOG_ATTR, request_query_log
+
+
+METRICS_EXTENSION = 'metrics'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+# Label used for requests that matched no route (404s), so unknown paths
+# cannot create unbounded label sets
+UNMATCHED_ROUTE = 'unmatched'
+
+# WSGI environ key marking internal requests (cache warm-up) that are not recorded
+WARM_UP_ENVIRON = 'emerald.warm_up'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bound(bound):
+    return repr(float(bound)) if isinstance(bound, float) else str(bound)
+
+
+class Histogram:
+    """A labelled histogram with fixed upper bounds"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., +Inf count], sum
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        """Exposition-format lines (cumulative buckets, _sum and _count)"""
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+
+        for labels, counts, total in series:
+            label_text = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + ',' if label_text else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                le = bound if bound == '+Inf' else _format_bound(bound)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total!r}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return lines
+
+
+class Metrics:
+    """The histograms recorded for every request"""
+
+    def __init__(self):
+        self.latency = Histogram(
+            'emerald_http_request_duration_seconds',
+            'Time spent handling a request, until the response headers are ready',
+            ('method', 'route', 'status'), LATENCY_BUCKETS
+        )
+        self.size = Histogram(
+            'emerald_http_response_size_bytes',
+            'Response body size as sent, after compression (responses with a known length)',
+            ('method', 'route'), SIZE_BUCKETS
+        )
+        self.statements = Histogram(
+            'emerald_sql_statements_per_request',
+            'SQL statements executed per request',
+            ('route',), STATEMENT_BUCKETS
+        )
+        self.sql_seconds = Histogram(
+            'emerald_sql_seconds_per_request',
+            'Time spent executing SQL and fetching rows per request',
+            ('route',), LATENCY_BUCKETS
+        )
+
+    def record(self, method, route, status, seconds, size, log):
+        self.latency.observe((method, route, str(status)), seconds)
+        if size is not None:
+            self.size.observe((method, route), size)
+        self.statements.observe((route,), log.count)
+        self.sql_seconds.observe((route,), log.seconds)
+
+    def render(self):
+        lines = []
+        for histogram in (self.latency, self.size, self.statements, self.sql_seconds):
+            lines.extend(histogram.render())
+        return '\n'.join(lines) + '\n'
+
+
+def init_metrics(app):
+    """Record request metrics for app and serve them at /metrics, unless METRICS is False"""
+    if not app.config.get('METRICS', True):
+        return None
+
+    metrics = app.extensions[METRICS_EXTENSION] = Metrics()
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        request_query_log()
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.get('metrics_start')
+        if start is not None and not request.environ.get(WARM_UP_ENVIRON):
+            rule = request.url_rule
+            metrics.record(
+                request.method,
+                rule.rule if rule is not None else UNMATCHED_ROUTE,
+                response.status_code,
+                time.perf_counter() - start,
+                None if response.is_streamed else response.content_length,
+                g.get(QUERY_LOG_ATTR)
+            )
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def get_metrics():
+        """Request metrics in Prometheus text format"""
+        return app.response_class(metrics.render(), mimetype=None, content_type=CONTENT_TYPE)
+
+    return metrics
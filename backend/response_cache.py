@@ -0,0 +1,151 @@
+"""
+Response Cache
+Pre-serialized JSON responses with ETag / If-None-Match support
+
+Most collection endpoints return byte-identical payloads until the database
+is re-migrated. Views decorated with @cached_response are rendered once per
+path + normalized query string; later requests reuse the encoded bytes and
+answer If-None-Match with 304 Not Modified. The whole cache is dropped as
+soon as the app switches to a republished database (see generations.py), or,
+when the database isn't watched, as soon as the file changes on disk.
+"""
+
+from collections import OrderedDict
+from functools import wraps
+import hashlib
+import threading
+
+from flask import current_app, request
+
+from compression import get_compression_cache
+from database import database_signature
+from generations import GENERATION_EXTENSION
+from serialization import MSGPACK_AVAILABLE, response_format
+
+
+CACHE_EXTENSION = 'response_cache'
+
+
+class CachedBody:
+    """An encoded response body and its content hash"""
+
+    __slots__ = ('body', 'etag', 'mimetype')
+
+    def __init__(self, body, mimetype):
+        self.body = body
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.mimetype = mimetype
+
+
+class ResponseCache:
+    """LRU cache of encoded responses, invalidated when the database file changes"""
+
+    def __init__(self, db_path, max_entries=256, watch=None):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.watch = watch
+        self._entries = OrderedDict()
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def database_signature(self):
+        """The served database generation, or the file's inode, size and mtime when unwatched"""
+        if self.watch is not None:
+            return self.watch.generation
+        return database_signature(self.db_path)
+
+    @staticmethod
+    def key_for(req):
+        """Cache key: path, query arguments in a stable order and response format"""
+        return (req.path, tuple(sorted(req.args.items(multi=True))), response_format())
+
+    def get(self, key, signature=None):
+        if signature is None:
+            signature = self.database_signature()
+        with self._lock:
+            if signature != self._signature:
+                self._entries.clear()
+                self._signature = signature
+                return None
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key, body, mimetype, signature=None):
+        """Cache a body; one rendered before the database changed (signature) is not kept"""
+        entry = CachedBody(body, mimetype)
+        with self._lock:
+            if signature is not None and signature != self._signature:
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._signature = None
+
+
+def init_response_cache(app):
+    """Attach a ResponseCache to app if RESPONSE_CACHE is enabled"""
+    if app.config.get('RESPONSE_CACHE', True):
+        app.extensions[CACHE_EXTENSION] = ResponseCache(
+            app.config['DATABASE'],
+            max_entries=app.config.get('RESPONSE_CACHE_SIZE', 256),
+            watch=app.extensions.get(GENERATION_EXTENSION)
+        )
+
+
+def get_response_cache():
+    """Return the active response cache, or None when caching is disabled"""
+    return current_app.extensions.get(CACHE_EXTENSION)
+
+
+def cached_response(view=None, *, uncached_args=()):
+    """
+    Cache a view's successful JSON response and serve it with an ETag
+
+    Only 200 responses are stored; errors, and responses the view marks
+    Cache-Control: no-store (e.g. ones that depend on the current time), are
+    always rendered fresh. Requests carrying any of uncached_args (query
+    arguments whose values are effectively unbounded, such as an arbitrary
+    list of ids) bypass the cache, so one-off variants don't evict the
+    shared collection payloads. Use as @cached_response or
+    @cached_response(uncached_args=('numbers',)).
+    """
+    if view is None:
+        return lambda view: cached_response(view, uncached_args=uncached_args)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = get_response_cache()
+        if cache is None or any(arg in request.args for arg in uncached_args):
+            return view(*args, **kwargs)
+
+        key = cache.key_for(request)
+        signature = cache.database_signature()
+        entry = cache.get(key, signature)
+
+        if entry is None:
+            response = current_app.make_response(view(*args, **kwargs))
+            if (response.status_code != 200 or response.direct_passthrough
+                    or response.cache_control.no_store):
+                return response
+            entry = cache.store(key, response.get_data(), response.mimetype, signature)
+
+        response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+        response.set_etag(entry.etag)
+        if MSGPACK_AVAILABLE:
+            response.vary.add('Accept')
+        # With compression on, its hook settles the ETag and answers If-None-Match
+        if get_compression_cache() is not None:
+            return response
+        return response.make_conditional(request)
+
+    wrapper.cached_response = True
+    return wrapper
@@ -3,20 +3,37 @@ Astrology Routes Blueprint
 Endpoints for Planets and Zodiac Signs
 """
 
-from flask import Blueprint, jsonify, request, current_app, g
-import sqlite3
+from flask import Blueprint, jsonify, request
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import json
+import re
+import sqlite3
 
-astrology_bp = Blueprint('astrology', __name__, url_prefix='/api/astrology')
+import numpy as np
+
+from database import get_db
+from snapshot import get_snapshot
+from response_cache import cached_response
+from ephemeris import (
+    CHALDEAN_ORDER, DAY_RULERS, MAX_RANGE_DAYS, SECONDS_PER_DAY,
+    FIRST_DATE, LAST_DATE, EARLIEST_TIMESTAMP, LATEST_TIMESTAMP,
+    epoch_days, planetary_hours, moon_longitude, mansion_index, mansion_ingresses,
+    format_timestamp, day_date
+)
 
+astrology_bp = Blueprint('astrology', __name__, url_prefix='/api/astrology')
 
-def get_db():
-    """Get database connection from Flask g object"""
-    db = getattr(g, '_database', None)
-    if db is None:
-        db = g._database = sqlite3.connect(current_app.config.get('DATABASE', 'esoteric_knowledge.db'))
-        db.row_factory = sqlite3.Row
-    return db
+# Order of the planetary days, starting with Sunday
+WEEKDAY_ORDER = {
+    'Sun': 1,
+    'Moon': 2,
+    'Mars': 3,
+    'Mercury': 4,
+    'Jupiter': 5,
+    'Venus': 6,
+    'Saturn': 7
+}
 
 
 def dict_from_row(row):
@@ -42,16 +59,20 @@ def dict_from_row(row):
 
 
 @astrology_bp.route('/planets', methods=['GET'])
+@cached_response
 def get_all_planets():
     """Get all planets (7 classical + Sun/Moon)"""
-    db = get_db()
-
-    planets = db.execute("""
-        SELECT p.*, s.name as sephiroth_name
-        FROM planets p
-        LEFT JOIN sephiroth s ON p.sephiroth_number = s.number
-        ORDER BY p.id
-    """).fetchall()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        planets = [snapshot.planet_with_sephirah(p) for p in snapshot.planets]
+    else:
+        db = get_db()
+        planets = db.execute("""
+            SELECT p.*, s.name as sephiroth_name
+            FROM planets p
+            LEFT JOIN sephiroth s ON p.sephiroth_number = s.number
+            ORDER BY p.id
+        """).fetchall()
 
     return jsonify({
         'count': len(planets),
@@ -62,14 +83,19 @@ def get_all_planets():
 @astrology_bp.route('/planets/<name>', methods=['GET'])
 def get_planet_by_name(name):
     """Get a specific planet by name (case-insensitive)"""
-    db = get_db()
-
-    planet = db.execute("""
-        SELECT p.*, s.name as sephiroth_name
-        FROM planets p
-        LEFT JOIN sephiroth s ON p.sephiroth_number = s.number
-        WHERE LOWER(p.name) = LOWER(?)
-    """, (name,)).fetchone()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        planet = snapshot.planets_by_name.get(name.lower())
+        if planet:
+            planet = snapshot.planet_with_sephirah(planet)
+    else:
+        db = get_db()
+        planet = db.execute("""
+            SELECT p.*, s.name as sephiroth_name
+            FROM planets p
+            LEFT JOIN sephiroth s ON p.sephiroth_number = s.number
+            WHERE LOWER(p.name) = LOWER(?)
+        """, (name,)).fetchone()
 
     if not planet:
         return jsonify({
@@ -80,20 +106,29 @@ def get_planet_by_name(name):
     result = dict_from_row(planet)
 
     # Get zodiac signs ruled by this planet
-    ruled_signs = db.execute("""
-        SELECT * FROM zodiac_signs
-        WHERE LOWER(ruling_planet) = LOWER(?)
-        ORDER BY house_number
-    """, (name,)).fetchall()
+    if snapshot is not None:
+        ruled_signs = snapshot.signs_by_ruler.get(name.lower(), ())
+    else:
+        ruled_signs = db.execute("""
+            SELECT * FROM zodiac_signs
+            WHERE LOWER(ruling_planet) = LOWER(?)
+            ORDER BY house_number
+        """, (name,)).fetchall()
 
     if ruled_signs:
         result['rules_zodiac_signs'] = [dict_from_row(s) for s in ruled_signs]
 
     # Get signs where this planet is exalted
-    exalted_signs = db.execute("""
-        SELECT name, symbol FROM zodiac_signs
-        WHERE LOWER(exalted_planet) = LOWER(?)
-    """, (name,)).fetchall()
+    if snapshot is not None:
+        exalted_signs = [
+            s.project(('name', 'symbol'))
+            for s in sorted(snapshot.signs_by_exalted.get(name.lower(), ()), key=lambda s: s['id'])
+        ]
+    else:
+        exalted_signs = db.execute("""
+            SELECT name, symbol FROM zodiac_signs
+            WHERE LOWER(exalted_planet) = LOWER(?)
+        """, (name,)).fetchall()
 
     if exalted_signs:
         result['exalted_in_signs'] = [dict_from_row(s) for s in exalted_signs]
@@ -102,14 +137,27 @@ def get_planet_by_name(name):
 
 
 @astrology_bp.route('/signs', methods=['GET'])
+@cached_response
 def get_all_signs():
     """Get all 12 zodiac signs"""
-    db = get_db()
-
     # Optional filtering
     element = request.args.get('element')
     modality = request.args.get('modality')
 
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        signs = [
+            snapshot.sign_with_ruler(s) for s in snapshot.signs
+            if (not element or s['element'].lower() == element.lower())
+            and (not modality or s['modality'].lower() == modality.lower())
+        ]
+        return jsonify({
+            'count': len(signs),
+            'signs': [dict_from_row(s) for s in signs]
+        })
+
+    db = get_db()
+
     where_conditions = []
     params = []
 
@@ -142,14 +190,19 @@ def get_all_signs():
 @astrology_bp.route('/signs/<name>', methods=['GET'])
 def get_sign_by_name(name):
     """Get a specific zodiac sign by name (case-insensitive)"""
-    db = get_db()
-
-    sign = db.execute("""
-        SELECT z.*, p.symbol as ruling_planet_symbol, p.day_of_week as ruling_day
-        FROM zodiac_signs z
-        LEFT JOIN planets p ON z.ruling_planet = p.name
-        WHERE LOWER(z.name) = LOWER(?)
-    """, (name,)).fetchone()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        sign = snapshot.signs_by_name.get(name.lower())
+        if sign:
+            sign = snapshot.sign_with_ruler(sign)
+    else:
+        db = get_db()
+        sign = db.execute("""
+            SELECT z.*, p.symbol as ruling_planet_symbol, p.day_of_week as ruling_day
+            FROM zodiac_signs z
+            LEFT JOIN planets p ON z.ruling_planet = p.name
+            WHERE LOWER(z.name) = LOWER(?)
+        """, (name,)).fetchone()
 
     if not sign:
         return jsonify({
@@ -161,47 +214,80 @@ def get_sign_by_name(name):
 
     # Get ruling planet details
     if result.get('ruling_planet'):
-        planet = db.execute("""
-            SELECT * FROM planets WHERE name = ?
-        """, (result['ruling_planet'],)).fetchone()
+        if snapshot is not None:
+            planet = snapshot.planets_by_exact_name.get(result['ruling_planet'])
+        else:
+            planet = db.execute("""
+                SELECT * FROM planets WHERE name = ?
+            """, (result['ruling_planet'],)).fetchone()
 
         if planet:
             result['ruling_planet_details'] = dict_from_row(planet)
 
-    # Get tarot card association
+    # Get tarot card association (resolved at migration time)
     if result.get('tarot_association'):
-        # Try to extract card number from tarot_association string
-        # e.g., "The Emperor (IV)" -> 4
-        import re
-        match = re.search(r'The ([A-Za-z\s]+)\s*\(([IVX]+)\)', result['tarot_association'])
-        if match:
-            card_name = match.group(1).strip()
-            card = db.execute("""
-                SELECT number, name FROM cards
-                WHERE LOWER(name) LIKE LOWER(?)
-            """, (f"%{card_name}%",)).fetchone()
-
-            if card:
-                result['tarot_card'] = dict_from_row(card)
+        if snapshot is not None:
+            card = snapshot.tarot_card_by_sign.get(sign['id'])
+        else:
+            card = get_sign_tarot_card(db, sign['id'], result['tarot_association'])
+
+        if card:
+            result['tarot_card'] = dict_from_row(card)
 
     return jsonify(result)
 
 
+def get_sign_tarot_card(db, sign_id, tarot_association):
+    """Look up the (number, name) of the card associated with a zodiac sign"""
+    try:
+        return db.execute("""
+            SELECT c.number, c.name
+            FROM card_correspondences e
+            JOIN cards c ON c.id = e.card_id
+            WHERE e.relation = 'sign_tarot_association' AND e.target_id = ?
+            ORDER BY c.id
+        """, (sign_id,)).fetchone()
+    except sqlite3.OperationalError:
+        pass
+
+    # Databases without card_correspondences: extract the card name from the
+    # tarot_association string, e.g. "The Emperor (IV)" -> "Emperor"
+    match = re.search(r'The ([A-Za-z\s]+)\s*\(([IVX]+)\)', tarot_association)
+    if not match:
+        return None
+
+    card_name = match.group(1).strip()
+    return db.execute("""
+        SELECT number, name FROM cards
+        WHERE LOWER(name) LIKE LOWER(?)
+    """, (f"%{card_name}%",)).fetchone()
+
+
 @astrology_bp.route('/elements', methods=['GET'])
+@cached_response
 def get_elements():
     """Get information about the four elements with associated signs and planets"""
-    db = get_db()
+    snapshot = get_snapshot()
+    if snapshot is None:
+        db = get_db()
 
     elements = ['Fire', 'Earth', 'Air', 'Water']
     result = []
 
     for element in elements:
         # Get zodiac signs for this element
-        signs = db.execute("""
-            SELECT name, symbol, modality FROM zodiac_signs
-            WHERE element = ?
-            ORDER BY house_number
-        """, (element,)).fetchall()
+        if snapshot is not None:
+            signs = [
+                s.project(('name', 'symbol', 'modality'))
+                for s in snapshot.signs_by_element.get(element.lower(), ())
+                if s['element'] == element
+            ]
+        else:
+            signs = db.execute("""
+                SELECT name, symbol, modality FROM zodiac_signs
+                WHERE element = ?
+                ORDER BY house_number
+            """, (element,)).fetchall()
 
         element_data = {
             'element': element,
@@ -229,19 +315,29 @@ def get_elements():
 
 
 @astrology_bp.route('/modalities', methods=['GET'])
+@cached_response
 def get_modalities():
     """Get information about the three modalities (Cardinal, Fixed, Mutable)"""
-    db = get_db()
+    snapshot = get_snapshot()
+    if snapshot is None:
+        db = get_db()
 
     modalities = ['Cardinal', 'Fixed', 'Mutable']
     result = []
 
     for modality in modalities:
-        signs = db.execute("""
-            SELECT name, symbol, element FROM zodiac_signs
-            WHERE modality = ?
-            ORDER BY house_number
-        """, (modality,)).fetchall()
+        if snapshot is not None:
+            signs = [
+                s.project(('name', 'symbol', 'element'))
+                for s in snapshot.signs_by_modality.get(modality.lower(), ())
+                if s['modality'] == modality
+            ]
+        else:
+            signs = db.execute("""
+                SELECT name, symbol, element FROM zodiac_signs
+                WHERE modality = ?
+                ORDER BY house_number
+            """, (modality,)).fetchall()
 
         modality_data = {
             'modality': modality,
@@ -263,22 +359,36 @@ def get_modalities():
 
 @astrology_bp.route('/planetary-hours', methods=['GET'])
 def get_planetary_hours():
-    """Get information about planetary hours and days"""
-    db = get_db()
+    """
+    Get information about planetary hours and days
 
-    planets = db.execute("""
-        SELECT name, symbol, day_of_week, metal, color, magical_powers
-        FROM planets
-        ORDER BY CASE name
-            WHEN 'Sun' THEN 1
-            WHEN 'Moon' THEN 2
-            WHEN 'Mars' THEN 3
-            WHEN 'Mercury' THEN 4
-            WHEN 'Jupiter' THEN 5
-            WHEN 'Venus' THEN 6
-            WHEN 'Saturn' THEN 7
-        END
-    """).fetchall()
+    With ?lat=&lon= the 24 planetary hours are computed for ?date= (default
+    today) or for every day from ?start= to ?end=; see planetary_hours_for_location.
+    """
+    if 'lat' in request.args or 'lon' in request.args:
+        return planetary_hours_for_location()
+
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        planets = [
+            p.project(('name', 'symbol', 'day_of_week', 'metal', 'color', 'magical_powers'))
+            for p in sorted(snapshot.planets, key=lambda p: WEEKDAY_ORDER.get(p['name'], 0))
+        ]
+    else:
+        db = get_db()
+        planets = db.execute("""
+            SELECT name, symbol, day_of_week, metal, color, magical_powers
+            FROM planets
+            ORDER BY CASE name
+                WHEN 'Sun' THEN 1
+                WHEN 'Moon' THEN 2
+                WHEN 'Mars' THEN 3
+                WHEN 'Mercury' THEN 4
+                WHEN 'Jupiter' THEN 5
+                WHEN 'Venus' THEN 6
+                WHEN 'Saturn' THEN 7
+            END
+        """).fetchall()
 
     return jsonify({
         'description': 'Each day is ruled by a planet, and each hour of the day/night cycles through the planetary rulers',
@@ -288,26 +398,324 @@ def get_planetary_hours():
     })
 
 
-@astrology_bp.route('/correspondences', methods=['GET'])
-def get_astrological_correspondences():
-    """Get a summary of all astrological correspondences"""
-    db = get_db()
+def parse_timezone(args):
+    """ZoneInfo for ?tz= (None for UTC); raises ValueError if unknown"""
+    if not args.get('tz'):
+        return None
+    try:
+        return ZoneInfo(args['tz'])
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f'Unknown time zone "{args["tz"]}"')
 
-    # Get planets with sephiroth
-    planets = db.execute("""
-        SELECT p.name, p.symbol, p.day_of_week, s.name as sephiroth
-        FROM planets p
-        LEFT JOIN sephiroth s ON p.sephiroth_number = s.number
-        ORDER BY p.id
-    """).fetchall()
 
-    # Get signs with elements and modalities
-    signs = db.execute("""
-        SELECT name, symbol, element, modality, ruling_planet
-        FROM zodiac_signs
-        ORDER BY house_number
+def parse_timestamp(value, tz=None):
+    """
+    Unix timestamp for an ISO 8601 date or date-time
+
+    Values without an offset are read in tz (UTC if None). Raises ValueError
+    on bad input.
+    """
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=tz or timezone.utc)
+    return moment.timestamp()
+
+
+def parse_location_args(args):
+    """
+    Read lat/lon/tz and the date or start/end range of a location query
+
+    Returns (latitude, longitude, tz, first_date, day_count); tz is None
+    for UTC. Raises ValueError with a client-facing message on bad input.
+    """
+    try:
+        latitude = float(args['lat'])
+        longitude = float(args['lon'])
+    except (KeyError, ValueError):
+        raise ValueError('lat and lon must both be given as decimal degrees')
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError('lat must be between -90 and 90 and lon between -180 and 180')
+
+    tz = parse_timezone(args)
+
+    try:
+        if args.get('start') or args.get('end'):
+            first = date.fromisoformat(args['start'])
+            last = date.fromisoformat(args['end'])
+        elif args.get('date'):
+            first = last = date.fromisoformat(args['date'])
+        else:
+            first = last = datetime.now(tz or timezone.utc).date()
+    except (KeyError, ValueError):
+        raise ValueError('Dates must be YYYY-MM-DD, and start and end must be given together')
+    if first < FIRST_DATE or last > LAST_DATE:
+        raise ValueError(f'Dates must fall between {FIRST_DATE} and {LAST_DATE}')
+
+    day_count = (last - first).days + 1
+    if day_count < 1 or day_count > MAX_RANGE_DAYS:
+        raise ValueError(f'end must be on or after start and the range at most {MAX_RANGE_DAYS} days')
+
+    return latitude, longitude, tz, first, day_count
+
+
+def planetary_hours_for_location():
+    """
+    Compute the 24 unequal planetary hours for a date (or date range) and place
+
+    Sunrise and sunset for every requested day are computed in one vectorized
+    pass. Timestamps are UTC unless ?tz= names an IANA time zone.
+    """
+    try:
+        latitude, longitude, tz, first, day_count = parse_location_args(request.args)
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        symbols = {p['name']: p['symbol'] for p in snapshot.planets}
+    else:
+        symbols = {p['name']: p['symbol'] for p in get_db().execute("SELECT name, symbol FROM planets")}
+
+    days = epoch_days(first, day_count)
+    hours = planetary_hours(days, latitude, longitude)
+
+    results = []
+    for i, day in enumerate(days):
+        day_ruler = DAY_RULERS[hours['day_rulers'][i]]
+        result = {
+            'date': day_date(day),
+            'day_ruler': day_ruler,
+            'sunrise': format_timestamp(hours['sunrise'][i], tz),
+            'sunset': format_timestamp(hours['sunset'][i], tz),
+            'next_sunrise': format_timestamp(hours['next_sunrise'][i], tz),
+            'hours': []
+        }
+        if result['sunrise'] is None or result['sunset'] is None or result['next_sunrise'] is None:
+            result['note'] = 'The Sun does not both rise and set on this date at this latitude'
+        else:
+            for hour in range(24):
+                planet = CHALDEAN_ORDER[hours['rulers'][i][hour]]
+                result['hours'].append({
+                    'hour': hour + 1,
+                    'period': 'day' if hour < 12 else 'night',
+                    'planet': planet,
+                    'symbol': symbols.get(planet),
+                    'start': format_timestamp(hours['starts'][i][hour], tz),
+                    'end': format_timestamp(hours['ends'][i][hour], tz)
+                })
+        results.append(result)
+
+    response = jsonify({
+        'latitude': latitude,
+        'longitude': longitude,
+        'timezone': tz.key if tz else 'UTC',
+        'count': len(results),
+        'days': results
+    })
+
+    # "Today" changes at midnight, so clients and proxies may only keep explicit dates
+    if not any(request.args.get(key) for key in ('date', 'start', 'end')):
+        response.cache_control.no_store = True
+    return response
+
+
+# Days of ingresses returned by /lunar-mansions/ingresses unless ?days= is given
+DEFAULT_INGRESS_DAYS = 30
+
+
+def get_lunar_mansion_rows():
+    """All 28 mansion rows ordered by number (= by starting degree)"""
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return snapshot.lunar_mansions
+
+    db = get_db()
+    return db.execute("""
+        SELECT * FROM lunar_mansions
+        ORDER BY number
     """).fetchall()
 
+
+def mansion_boundaries(mansions):
+    """Sorted starting degrees of the mansions: the interval index for lookups"""
+    return np.array([m['degrees_start'] for m in mansions], dtype=float)
+
+
+@astrology_bp.route('/lunar-mansions', methods=['GET'])
+@cached_response
+def get_lunar_mansions():
+    """Get all 28 Mansions of the Moon"""
+    mansions = get_lunar_mansion_rows()
+
+    return jsonify({
+        'count': len(mansions),
+        'lunar_mansions': [dict_from_row(m) for m in mansions]
+    })
+
+
+@astrology_bp.route('/lunar-mansions/<int:number>', methods=['GET'])
+def get_lunar_mansion(number):
+    """Get a lunar mansion by number (1-28)"""
+    mansions = {m['number']: m for m in get_lunar_mansion_rows()}
+    mansion = mansions.get(number)
+
+    if not mansion:
+        return jsonify({
+            'error': 'Lunar mansion number must be between 1 and 28'
+        }), 404
+
+    return jsonify(dict_from_row(mansion))
+
+
+@astrology_bp.route('/lunar-mansions/current', methods=['GET'])
+def get_current_lunar_mansion():
+    """
+    Get the mansion the Moon occupies at ?time= (ISO 8601, default now)
+
+    Returns the Moon's ecliptic longitude and the mansion it falls in.
+    """
+    try:
+        tz = parse_timezone(request.args)
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+
+    try:
+        if request.args.get('time'):
+            timestamp = parse_timestamp(request.args['time'], tz)
+        else:
+            timestamp = datetime.now(timezone.utc).timestamp()
+    except (ValueError, OverflowError):
+        return jsonify({
+            'error': 'time must be an ISO 8601 date or date-time'
+        }), 400
+
+    if not EARLIEST_TIMESTAMP <= timestamp <= LATEST_TIMESTAMP:
+        return jsonify({
+            'error': 'time must fall between 0001-01-02 and 9999-12-30'
+        }), 400
+
+    mansions = get_lunar_mansion_rows()
+    if not mansions:
+        return jsonify({
+            'error': 'Lunar mansions have not been loaded; re-run the migration'
+        }), 404
+
+    longitude = float(moon_longitude(timestamp))
+    mansion = mansions[int(mansion_index(longitude, mansion_boundaries(mansions)))]
+
+    return jsonify({
+        'time': format_timestamp(timestamp, tz),
+        'moon_longitude': round(longitude, 4),
+        'mansion': dict_from_row(mansion)
+    })
+
+
+@astrology_bp.route('/lunar-mansions/ingresses', methods=['GET'])
+def get_lunar_mansion_ingresses():
+    """
+    Get every mansion ingress from ?start= (default now) over ?days= (default 30)
+
+    The whole range is computed in one vectorized pass.
+    """
+    try:
+        tz = parse_timezone(request.args)
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+
+    try:
+        if request.args.get('start'):
+            start = parse_timestamp(request.args['start'], tz)
+        else:
+            start = datetime.now(timezone.utc).timestamp()
+    except (ValueError, OverflowError):
+        return jsonify({
+            'error': 'start must be an ISO 8601 date or date-time'
+        }), 400
+
+    try:
+        days = int(request.args.get('days', DEFAULT_INGRESS_DAYS))
+    except ValueError:
+        days = 0
+    if days < 1 or days > MAX_RANGE_DAYS:
+        return jsonify({
+            'error': f'days must be between 1 and {MAX_RANGE_DAYS}'
+        }), 400
+
+    end = start + days * SECONDS_PER_DAY
+    if start < EARLIEST_TIMESTAMP or end > LATEST_TIMESTAMP:
+        return jsonify({
+            'error': 'start and start + days must fall between 0001-01-02 and 9999-12-30'
+        }), 400
+
+    mansions = get_lunar_mansion_rows()
+    if not mansions:
+        return jsonify({
+            'error': 'Lunar mansions have not been loaded; re-run the migration'
+        }), 404
+
+    boundaries = mansion_boundaries(mansions)
+    times, indexes = mansion_ingresses(start, end, boundaries)
+    current = mansions[int(mansion_index(float(moon_longitude(start)), boundaries))]
+
+    ingresses = [
+        {
+            'time': format_timestamp(time, tz),
+            'mansion_number': mansions[index]['number'],
+            'name_arabic': mansions[index]['name_arabic'],
+            'zodiac_sign': mansions[index]['zodiac_sign'],
+            'nature': mansions[index]['nature']
+        }
+        for time, index in zip(times.tolist(), indexes.tolist())
+    ]
+
+    return jsonify({
+        'start': format_timestamp(start, tz),
+        'end': format_timestamp(end, tz),
+        'current_mansion': dict_from_row(current),
+        'count': len(ingresses),
+        'ingresses': ingresses
+    })
+
+
+@astrology_bp.route('/correspondences', methods=['GET'])
+@cached_response
+def get_astrological_correspondences():
+    """Get a summary of all astrological correspondences"""
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        planets = [
+            snapshot.planet_with_sephirah(p, column='sephiroth',
+                                          projection=('name', 'symbol', 'day_of_week'))
+            for p in snapshot.planets
+        ]
+        signs = [
+            s.project(('name', 'symbol', 'element', 'modality', 'ruling_planet'))
+            for s in snapshot.signs
+        ]
+    else:
+        db = get_db()
+
+        # Get planets with sephiroth
+        planets = db.execute("""
+            SELECT p.name, p.symbol, p.day_of_week, s.name as sephiroth
+            FROM planets p
+            LEFT JOIN sephiroth s ON p.sephiroth_number = s.number
+            ORDER BY p.id
+        """).fetchall()
+
+        # Get signs with elements and modalities
+        signs = db.execute("""
+            SELECT name, symbol, element, modality, ruling_planet
+            FROM zodiac_signs
+            ORDER BY house_number
+        """).fetchall()
+
     return jsonify({
         'planets': {
             'count': len(planets),
@@ -1,21 +1,16 @@
 """
 Qabalah Routes Blueprint
-Endpoints for the Tree of Life: Sephiroth and Paths
+Endpoints for the Tree of Life: Sephiroth, Paths and path-finding over the Tree
 """
 
-from flask import Blueprint, jsonify, request, current_app, g
-import sqlite3
-
-qabalah_bp = Blueprint('qabalah', __name__, url_prefix='/api/qabalah')
+from flask import Blueprint, current_app, jsonify, request
 
+from database import get_db
+from snapshot import get_snapshot
+from response_cache import cached_response
+from gematria import METHODS as GEMATRIA_METHODS, GematriaIndex, calculate
 
-def get_db():
-    """Get database connection from Flask g object"""
-    db = getattr(g, '_database', None)
-    if db is None:
-        db = g._database = sqlite3.connect(current_app.config.get('DATABASE', 'esoteric_knowledge.db'))
-        db.row_factory = sqlite3.Row
-    return db
+qabalah_bp = Blueprint('qabalah', __name__, url_prefix='/api/qabalah')
 
 
 def dict_from_row(row):
@@ -25,105 +20,326 @@ def dict_from_row(row):
     return dict(zip(row.keys(), row))
 
 
+GRAPH_EXTENSION = 'tree_graph'
+GEMATRIA_EXTENSION = 'gematria_index'
+
+# Most words a single POST /gematria may value
+MAX_GEMATRIA_WORDS = 10000
+
+# Longest route (in paths) /graph/routes will enumerate; a simple route
+# visits each of the 10 Sephiroth at most once, so none is longer than 9
+MAX_ROUTE_LENGTH = 9
+
+# Named traversals of the Tree
+TRAVERSALS = {
+    'lightning-flash': {
+        'name': 'Lightning Flash',
+        'description': 'The descent of creative force from Kether to Malkuth through the Sephiroth in numerical order, leaping the Abyss between Binah and Chesed where no path exists'
+    },
+    'serpent': {
+        'name': 'Path of the Serpent',
+        'description': 'The ascent of the initiate up all 22 paths in reverse order, from the 32nd path (Tav) to the 11th (Aleph)'
+    }
+}
+
+
+class TreeGraph:
+    """
+    Precomputed graph of the Tree of Life: 10 Sephiroth joined by 22 Paths
+
+    Every simple route between every pair of Sephiroth (about 22,000 in all)
+    is enumerated once when the graph is built, so shortest-path and
+    bounded-route queries are dictionary lookups.
+    """
+
+    def __init__(self, sephiroth, paths):
+        """
+        Args:
+            sephiroth: Sephirah rows
+            paths: Path rows (p.* plus card_number and card_name)
+        """
+        self.sephiroth = {s['number']: dict_from_row(s) for s in sephiroth}
+        self.numbers_by_name = {s['name'].lower(): s['number'] for s in sephiroth}
+
+        paths = sorted(paths, key=lambda p: p['number'])
+        self.paths = {p['number']: dict_from_row(p) for p in paths}
+        self.paths_from = {number: [] for number in self.sephiroth}
+        self.paths_to = {number: [] for number in self.sephiroth}
+        self.adjacency = {number: [] for number in self.sephiroth}
+        for path in self.paths.values():
+            upper, lower = path['connects_from'], path['connects_to']
+            self.paths_from.setdefault(upper, []).append(path)
+            self.paths_to.setdefault(lower, []).append(path)
+            self.adjacency.setdefault(upper, []).append((lower, path['number']))
+            self.adjacency.setdefault(lower, []).append((upper, path['number']))
+
+        # All simple routes between every ordered pair, shortest first
+        self.routes = {}
+        for start in self.adjacency:
+            self._collect_routes(start, [start], [])
+        for key, routes in self.routes.items():
+            routes.sort(key=lambda route: (len(route[1]), route[0]))
+
+    def _collect_routes(self, start, nodes, edges):
+        for neighbour, path_number in self.adjacency[nodes[-1]]:
+            if neighbour in nodes:
+                continue
+            nodes.append(neighbour)
+            edges.append(path_number)
+            self.routes.setdefault((start, neighbour), []).append((tuple(nodes), tuple(edges)))
+            self._collect_routes(start, nodes, edges)
+            nodes.pop()
+            edges.pop()
+
+    @classmethod
+    def load(cls):
+        """Build the graph from the snapshot or the database"""
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            columns = [key for key in snapshot.paths[0].keys()
+                       if key not in ('from_sephirah_name', 'to_sephirah_name')] if snapshot.paths else []
+            return cls(snapshot.sephiroth, [p.project(columns) for p in snapshot.paths])
+
+        db = get_db()
+        sephiroth = db.execute("""
+            SELECT * FROM sephiroth ORDER BY number
+        """).fetchall()
+        paths = db.execute("""
+            SELECT p.*, c.number as card_number, c.name as card_name
+            FROM paths p
+            LEFT JOIN cards c ON p.tarot_card_id = c.id
+            ORDER BY p.number
+        """).fetchall()
+        return cls(sephiroth, paths)
+
+    def resolve(self, value):
+        """Sephirah number for a number or (case-insensitive) name, or None"""
+        if value is None:
+            return None
+        if value.isascii() and value.isdigit():
+            return int(value) if int(value) in self.sephiroth else None
+        return self.numbers_by_name.get(value.lower())
+
+    def routes_between(self, start, end, max_length=MAX_ROUTE_LENGTH):
+        """Simple routes from start to end of at most max_length paths, shortest first"""
+        return [route for route in self.routes.get((start, end), ()) if len(route[1]) <= max_length]
+
+    def shortest_routes(self, start, end):
+        """Every route of minimal length from start to end"""
+        routes = self.routes.get((start, end), [])
+        if not routes:
+            return []
+        shortest = len(routes[0][1])
+        return [route for route in routes if len(route[1]) == shortest]
+
+    def path_between(self, a, b):
+        """The path joining two Sephiroth directly, or None"""
+        for neighbour, path_number in self.adjacency.get(a, ()):
+            if neighbour == b:
+                return self.paths[path_number]
+        return None
+
+    def step(self, a, b, path):
+        """One move from Sephirah a to b along path (None where no path joins them)"""
+        return {
+            'from': a,
+            'from_name': self.sephiroth[a]['name'],
+            'to': b,
+            'to_name': self.sephiroth[b]['name'],
+            'path': {
+                'number': path['number'],
+                'hebrew_letter': path['hebrew_letter'],
+                'card_number': path['card_number'],
+                'card_name': path['card_name']
+            } if path else None
+        }
+
+    def lightning_flash(self):
+        """Kether to Malkuth in numerical order"""
+        numbers = sorted(self.sephiroth)
+        steps = []
+        for a, b in zip(numbers, numbers[1:]):
+            step = self.step(a, b, self.path_between(a, b))
+            if step['path'] is None:
+                step['note'] = f'No path joins {step["from_name"]} and {step["to_name"]}: the flash crosses the Abyss through Daath'
+            steps.append(step)
+        return steps
+
+    def serpent(self):
+        """All 22 paths climbed in reverse order, each from its lower to its upper Sephirah"""
+        return [
+            self.step(path['connects_to'], path['connects_from'], path)
+            for _, path in sorted(self.paths.items(), reverse=True)
+        ]
+
+    def route_dict(self, route):
+        nodes, edges = route
+        return {
+            'length': len(edges),
+            'sephiroth': list(nodes),
+            'paths': list(edges)
+        }
+
+
+def init_tree_graph(app):
+    """Build the Tree of Life graph once for app (after the snapshot, if any, is loaded)"""
+    with app.app_context():
+        app.extensions[GRAPH_EXTENSION] = TreeGraph.load()
+
+
+def get_tree_graph():
+    """The current app's Tree of Life graph, built on first use if needed"""
+    graph = current_app.extensions.get(GRAPH_EXTENSION)
+    if graph is None:
+        graph = current_app.extensions[GRAPH_EXTENSION] = TreeGraph.load()
+    return graph
+
+
+def load_gematria_index():
+    """Build the gematria value index from the Tree of Life graph and the cards"""
+    graph = get_tree_graph()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        cards = snapshot.cards
+    else:
+        cards = get_db().execute("""
+            SELECT number, name, hebrew_letter FROM cards ORDER BY number
+        """).fetchall()
+    return GematriaIndex(graph.sephiroth.values(), graph.paths.values(), cards)
+
+
+def init_gematria_index(app):
+    """Build the gematria value index once for app (after the Tree of Life graph)"""
+    with app.app_context():
+        app.extensions[GEMATRIA_EXTENSION] = load_gematria_index()
+
+
+def get_gematria_index():
+    """The current app's gematria value index, built on first use if needed"""
+    index = current_app.extensions.get(GEMATRIA_EXTENSION)
+    if index is None:
+        index = current_app.extensions[GEMATRIA_EXTENSION] = load_gematria_index()
+    return index
+
+
+def parse_gematria_methods(value):
+    """
+    Parse a list (or comma-separated string) of gematria method names
+
+    Returns None (every method) when value is empty. Raises ValueError with
+    a client-facing message on unknown methods.
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    methods = [m.strip() for m in value if isinstance(m, str) and m.strip()] if isinstance(value, list) else []
+    if not methods or any(m not in GEMATRIA_METHODS for m in methods):
+        raise ValueError(f'methods must be drawn from: {", ".join(GEMATRIA_METHODS)}')
+    return methods
+
+
+def sephirah_payload(sephirah):
+    """A Sephirah row with its emanating and receiving paths from the graph"""
+    graph = get_tree_graph()
+    result = dict_from_row(sephirah)
+    result['paths_emanating'] = [dict(p) for p in graph.paths_from.get(result['number'], ())]
+    result['paths_receiving'] = [dict(p) for p in graph.paths_to.get(result['number'], ())]
+    return result
+
+
 @qabalah_bp.route('/sephiroth', methods=['GET'])
+@cached_response
 def get_all_sephiroth():
     """Get all 10 Sephiroth on the Tree of Life"""
-    db = get_db()
-
-    sephiroth = db.execute("""
-        SELECT * FROM sephiroth
-        ORDER BY number
-    """).fetchall()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        sephiroth = snapshot.sephiroth
+    else:
+        db = get_db()
+        sephiroth = db.execute("""
+            SELECT * FROM sephiroth
+            ORDER BY number
+        """).fetchall()
 
     return jsonify({
         'count': len(sephiroth),
-        'sephiroth': [dict_from_row(s) for s in sephiroth]
+        'sephiroth': sephiroth
     })
 
 
 @qabalah_bp.route('/sephiroth/<int:number>', methods=['GET'])
 def get_sephirah_by_number(number):
     """Get a specific Sephirah by its number (1-10)"""
-    db = get_db()
-
     if number < 1 or number > 10:
         return jsonify({
             'error': 'Sephirah number must be between 1 and 10'
         }), 400
 
-    sephirah = db.execute("""
-        SELECT * FROM sephiroth WHERE number = ?
-    """, (number,)).fetchone()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        sephirah = snapshot.sephiroth_by_number.get(number)
+    else:
+        db = get_db()
+        sephirah = db.execute("""
+            SELECT * FROM sephiroth WHERE number = ?
+        """, (number,)).fetchone()
 
     if not sephirah:
         return jsonify({
             'error': f'Sephirah {number} not found'
         }), 404
 
-    # Get paths connected to this sephirah
-    paths_from = db.execute("""
-        SELECT p.*, c.number as card_number, c.name as card_name
-        FROM paths p
-        LEFT JOIN cards c ON p.tarot_card_id = c.id
-        WHERE p.connects_from = ?
-        ORDER BY p.number
-    """, (number,)).fetchall()
-
-    paths_to = db.execute("""
-        SELECT p.*, c.number as card_number, c.name as card_name
-        FROM paths p
-        LEFT JOIN cards c ON p.tarot_card_id = c.id
-        WHERE p.connects_to = ?
-        ORDER BY p.number
-    """, (number,)).fetchall()
-
-    result = dict_from_row(sephirah)
-    result['paths_emanating'] = [dict_from_row(p) for p in paths_from]
-    result['paths_receiving'] = [dict_from_row(p) for p in paths_to]
-
-    return jsonify(result)
+    return jsonify(sephirah_payload(sephirah))
 
 
 @qabalah_bp.route('/paths', methods=['GET'])
+@cached_response
 def get_all_paths():
     """Get all 22 Paths connecting the Sephiroth"""
-    db = get_db()
-
-    paths = db.execute("""
-        SELECT p.*, c.number as card_number, c.name as card_name,
-               s1.name as from_sephirah_name, s2.name as to_sephirah_name
-        FROM paths p
-        LEFT JOIN cards c ON p.tarot_card_id = c.id
-        LEFT JOIN sephiroth s1 ON p.connects_from = s1.number
-        LEFT JOIN sephiroth s2 ON p.connects_to = s2.number
-        ORDER BY p.number
-    """).fetchall()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        paths = snapshot.paths
+    else:
+        db = get_db()
+        paths = db.execute("""
+            SELECT p.*, c.number as card_number, c.name as card_name,
+                   s1.name as from_sephirah_name, s2.name as to_sephirah_name
+            FROM paths p
+            LEFT JOIN cards c ON p.tarot_card_id = c.id
+            LEFT JOIN sephiroth s1 ON p.connects_from = s1.number
+            LEFT JOIN sephiroth s2 ON p.connects_to = s2.number
+            ORDER BY p.number
+        """).fetchall()
 
     return jsonify({
         'count': len(paths),
-        'paths': [dict_from_row(p) for p in paths]
+        'paths': paths
     })
 
 
 @qabalah_bp.route('/paths/<int:number>', methods=['GET'])
 def get_path_by_number(number):
     """Get a specific Path by its number (11-32)"""
-    db = get_db()
-
     if number < 11 or number > 32:
         return jsonify({
             'error': 'Path number must be between 11 and 32'
         }), 400
 
-    path = db.execute("""
-        SELECT p.*, c.number as card_number, c.name as card_name,
-               s1.name as from_sephirah_name, s2.name as to_sephirah_name
-        FROM paths p
-        LEFT JOIN cards c ON p.tarot_card_id = c.id
-        LEFT JOIN sephiroth s1 ON p.connects_from = s1.number
-        LEFT JOIN sephiroth s2 ON p.connects_to = s2.number
-        WHERE p.number = ?
-    """, (number,)).fetchone()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        path = snapshot.paths_by_number.get(number)
+    else:
+        db = get_db()
+        path = db.execute("""
+            SELECT p.*, c.number as card_number, c.name as card_name,
+                   s1.name as from_sephirah_name, s2.name as to_sephirah_name
+            FROM paths p
+            LEFT JOIN cards c ON p.tarot_card_id = c.id
+            LEFT JOIN sephiroth s1 ON p.connects_from = s1.number
+            LEFT JOIN sephiroth s2 ON p.connects_to = s2.number
+            WHERE p.number = ?
+        """, (number,)).fetchone()
 
     if not path:
         return jsonify({
@@ -136,20 +352,23 @@ def get_path_by_number(number):
 @qabalah_bp.route('/paths/<int:number>/card', methods=['GET'])
 def get_path_with_card(number):
     """Get a Path with full tarot card details"""
-    db = get_db()
-
     if number < 11 or number > 32:
         return jsonify({
             'error': 'Path number must be between 11 and 32'
         }), 400
 
-    path = db.execute("""
-        SELECT p.*, s1.name as from_sephirah_name, s2.name as to_sephirah_name
-        FROM paths p
-        LEFT JOIN sephiroth s1 ON p.connects_from = s1.number
-        LEFT JOIN sephiroth s2 ON p.connects_to = s2.number
-        WHERE p.number = ?
-    """, (number,)).fetchone()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        path = snapshot.paths_by_number.get(number)
+    else:
+        db = get_db()
+        path = db.execute("""
+            SELECT p.*, s1.name as from_sephirah_name, s2.name as to_sephirah_name
+            FROM paths p
+            LEFT JOIN sephiroth s1 ON p.connects_from = s1.number
+            LEFT JOIN sephiroth s2 ON p.connects_to = s2.number
+            WHERE p.number = ?
+        """, (number,)).fetchone()
 
     if not path:
         return jsonify({
@@ -157,21 +376,30 @@ def get_path_with_card(number):
         }), 404
 
     result = dict_from_row(path)
+    if snapshot is not None:
+        del result['card_number']
+        del result['card_name']
 
     # Get full tarot card details if available
     if path['tarot_card_id']:
-        card = db.execute("""
-            SELECT * FROM cards WHERE id = ?
-        """, (path['tarot_card_id'],)).fetchone()
+        if snapshot is not None:
+            card = snapshot.cards_by_id.get(path['tarot_card_id'])
+        else:
+            card = db.execute("""
+                SELECT * FROM cards WHERE id = ?
+            """, (path['tarot_card_id'],)).fetchone()
 
         if card:
             card_dict = dict_from_row(card)
 
             # Get keywords
-            keywords = db.execute("""
-                SELECT keyword FROM keywords WHERE card_id = ?
-            """, (path['tarot_card_id'],)).fetchall()
-            card_dict['keywords'] = [k['keyword'] for k in keywords]
+            if snapshot is not None:
+                card_dict['keywords'] = list(snapshot.keywords_by_card.get(path['tarot_card_id'], ()))
+            else:
+                keywords = db.execute("""
+                    SELECT keyword FROM keywords WHERE card_id = ?
+                """, (path['tarot_card_id'],)).fetchall()
+                card_dict['keywords'] = [k['keyword'] for k in keywords]
 
             # Remove internal fields
             del card_dict['id']
@@ -192,48 +420,272 @@ def get_path_with_card(number):
 
 
 @qabalah_bp.route('/tree', methods=['GET'])
+@cached_response
 def get_tree_of_life():
     """Get the complete Tree of Life structure with all Sephiroth and Paths"""
-    db = get_db()
-
-    # Get all sephiroth
-    sephiroth = db.execute("""
-        SELECT * FROM sephiroth ORDER BY number
-    """).fetchall()
-
-    # Get all paths with connections
-    paths = db.execute("""
-        SELECT p.*, c.number as card_number, c.name as card_name,
-               s1.name as from_sephirah_name, s2.name as to_sephirah_name
-        FROM paths p
-        LEFT JOIN cards c ON p.tarot_card_id = c.id
-        LEFT JOIN sephiroth s1 ON p.connects_from = s1.number
-        LEFT JOIN sephiroth s2 ON p.connects_to = s2.number
-        ORDER BY p.number
-    """).fetchall()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        sephiroth = snapshot.sephiroth
+        paths = snapshot.paths
+    else:
+        db = get_db()
+
+        # Get all sephiroth
+        sephiroth = db.execute("""
+            SELECT * FROM sephiroth ORDER BY number
+        """).fetchall()
+
+        # Get all paths with connections
+        paths = db.execute("""
+            SELECT p.*, c.number as card_number, c.name as card_name,
+                   s1.name as from_sephirah_name, s2.name as to_sephirah_name
+            FROM paths p
+            LEFT JOIN cards c ON p.tarot_card_id = c.id
+            LEFT JOIN sephiroth s1 ON p.connects_from = s1.number
+            LEFT JOIN sephiroth s2 ON p.connects_to = s2.number
+            ORDER BY p.number
+        """).fetchall()
 
     return jsonify({
         'name': 'Tree of Life',
         'description': 'The Qabalistic Tree of Life: 10 Sephiroth connected by 22 Paths corresponding to the Major Arcana',
         'sephiroth': {
             'count': len(sephiroth),
-            'spheres': [dict_from_row(s) for s in sephiroth]
+            'spheres': sephiroth
         },
         'paths': {
             'count': len(paths),
-            'connections': [dict_from_row(p) for p in paths]
+            'connections': paths
+        }
+    })
+
+
+def parse_route_args(graph, args):
+    """
+    Resolve ?from= and ?to= (Sephirah numbers or names) for graph queries
+
+    Raises ValueError with a client-facing message on bad input.
+    """
+    start = graph.resolve(args.get('from'))
+    end = graph.resolve(args.get('to'))
+    if start is None or end is None:
+        raise ValueError('from and to must be Sephirah numbers (1-10) or names, e.g. ?from=Malkuth&to=Kether')
+    if start == end:
+        raise ValueError('from and to must be different Sephiroth')
+    return start, end
+
+
+@qabalah_bp.route('/graph', methods=['GET'])
+@cached_response
+def get_tree_graph_adjacency():
+    """Get the Tree of Life as an adjacency list: each Sephirah's neighbours and the paths joining them"""
+    graph = get_tree_graph()
+
+    return jsonify({
+        'nodes': [
+            {'number': number, 'name': sephirah['name']}
+            for number, sephirah in sorted(graph.sephiroth.items())
+        ],
+        'adjacency': {
+            str(number): [
+                {'sephirah': neighbour, 'path': path_number}
+                for neighbour, path_number in sorted(graph.adjacency[number])
+            ]
+            for number in sorted(graph.adjacency)
         }
     })
 
 
+@qabalah_bp.route('/graph/shortest', methods=['GET'])
+def get_shortest_routes():
+    """Get every shortest route between two Sephiroth (?from=&to=)"""
+    graph = get_tree_graph()
+    try:
+        start, end = parse_route_args(graph, request.args)
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+
+    routes = graph.shortest_routes(start, end)
+
+    return jsonify({
+        'from': {'number': start, 'name': graph.sephiroth[start]['name']},
+        'to': {'number': end, 'name': graph.sephiroth[end]['name']},
+        'distance': len(routes[0][1]) if routes else None,
+        'count': len(routes),
+        'routes': [graph.route_dict(route) for route in routes]
+    })
+
+
+@qabalah_bp.route('/graph/routes', methods=['GET'])
+def get_routes():
+    """Get every route between two Sephiroth of at most ?max_length= paths, shortest first"""
+    graph = get_tree_graph()
+    try:
+        start, end = parse_route_args(graph, request.args)
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+
+    try:
+        max_length = int(request.args.get('max_length', 3))
+    except ValueError:
+        max_length = 0
+    if max_length < 1 or max_length > MAX_ROUTE_LENGTH:
+        return jsonify({
+            'error': f'max_length must be between 1 and {MAX_ROUTE_LENGTH}'
+        }), 400
+
+    routes = graph.routes_between(start, end, max_length)
+
+    return jsonify({
+        'from': {'number': start, 'name': graph.sephiroth[start]['name']},
+        'to': {'number': end, 'name': graph.sephiroth[end]['name']},
+        'max_length': max_length,
+        'count': len(routes),
+        'routes': [graph.route_dict(route) for route in routes]
+    })
+
+
+@qabalah_bp.route('/traversals', methods=['GET'])
+def get_traversals():
+    """List the named traversals of the Tree"""
+    return jsonify({
+        'count': len(TRAVERSALS),
+        'traversals': [dict(traversal, id=traversal_id) for traversal_id, traversal in TRAVERSALS.items()]
+    })
+
+
+@qabalah_bp.route('/traversals/<traversal_id>', methods=['GET'])
+def get_traversal(traversal_id):
+    """Get a named traversal (lightning-flash or serpent) step by step"""
+    traversal = TRAVERSALS.get(traversal_id)
+    if traversal is None:
+        return jsonify({
+            'error': f'Traversal "{traversal_id}" not found',
+            'available_traversals': list(TRAVERSALS)
+        }), 404
+
+    graph = get_tree_graph()
+    steps = graph.lightning_flash() if traversal_id == 'lightning-flash' else graph.serpent()
+
+    return jsonify(dict(traversal, id=traversal_id, count=len(steps), steps=steps))
+
+
+@qabalah_bp.route('/gematria/methods', methods=['GET'])
+def get_gematria_methods():
+    """List the gematria methods and the script each applies to"""
+    return jsonify({
+        'count': len(GEMATRIA_METHODS),
+        'methods': [
+            {'id': method, 'script': script, 'description': description}
+            for method, (script, _, description) in GEMATRIA_METHODS.items()
+        ]
+    })
+
+
+@qabalah_bp.route('/gematria', methods=['GET'])
+def get_gematria():
+    """Value a word (?q=) by every gematria method and list the entities sharing each value"""
+    word = request.args.get('q', '')
+    if not word.strip():
+        return jsonify({
+            'error': 'Query parameter "q" is required'
+        }), 400
+
+    try:
+        methods = parse_gematria_methods(request.args.get('methods'))
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+
+    values = calculate(word, methods)
+
+    return jsonify({
+        'word': word,
+        'values': values,
+        'matches': get_gematria_index().matches(values)
+    })
+
+
+@qabalah_bp.route('/gematria', methods=['POST'])
+def post_gematria():
+    """
+    Value many words in one request
+
+    Body: {"words": ["Kether", "חית"], "methods": ["standard"], "matches": true}.
+    Results come back in request order; repeated words are valued once.
+    Set "matches" to false to skip the reverse lookup for large batches.
+    """
+    body = request.get_json(silent=True)
+    words = body.get('words') if isinstance(body, dict) else None
+    if not isinstance(words, list) or not all(isinstance(w, str) for w in words):
+        return jsonify({
+            'error': 'Request body must be a JSON object with a "words" list of strings'
+        }), 400
+    if len(words) > MAX_GEMATRIA_WORDS:
+        return jsonify({
+            'error': f'At most {MAX_GEMATRIA_WORDS} words can be valued at once'
+        }), 400
+
+    try:
+        methods = parse_gematria_methods(body.get('methods'))
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+
+    index = get_gematria_index()
+    include_matches = body.get('matches', True) is not False
+
+    computed = {}
+    for word in words:
+        if word not in computed:
+            values = calculate(word, methods)
+            computed[word] = {'word': word, 'values': values}
+            if include_matches:
+                computed[word]['matches'] = index.matches(values)
+
+    return jsonify({
+        'count': len(words),
+        'results': [computed[word] for word in words]
+    })
+
+
+@qabalah_bp.route('/gematria/value/<int:value>', methods=['GET'])
+def get_gematria_value(value):
+    """Get every entity whose gematria equals value (?methods= to narrow, default all)"""
+    try:
+        methods = parse_gematria_methods(request.args.get('methods'))
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+
+    index = get_gematria_index()
+    matches = {method: index.lookup(method, value) for method in methods or GEMATRIA_METHODS}
+
+    return jsonify({
+        'value': value,
+        'count': sum(len(entities) for entities in matches.values()),
+        'matches': {method: entities for method, entities in matches.items() if entities}
+    })
+
+
 @qabalah_bp.route('/sephiroth/name/<name>', methods=['GET'])
 def get_sephirah_by_name(name):
     """Get a Sephirah by its name (case-insensitive)"""
-    db = get_db()
-
-    sephirah = db.execute("""
-        SELECT * FROM sephiroth WHERE LOWER(name) = LOWER(?)
-    """, (name,)).fetchone()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        sephirah = snapshot.sephiroth_by_name.get(name.lower())
+    else:
+        db = get_db()
+        sephirah = db.execute("""
+            SELECT * FROM sephiroth WHERE LOWER(name) = LOWER(?)
+        """, (name,)).fetchone()
 
     if not sephirah:
         return jsonify({
@@ -241,25 +693,59 @@ def get_sephirah_by_name(name):
             'suggestion': 'Valid names: Kether, Chokmah, Binah, Chesed, Geburah, Tiphareth, Netzach, Hod, Yesod, Malkuth'
         }), 404
 
-    result = dict_from_row(sephirah)
-    seph_number = result['number']
-
-    # Get connected paths
-    paths_from = db.execute("""
-        SELECT p.*, c.number as card_number, c.name as card_name
-        FROM paths p
-        LEFT JOIN cards c ON p.tarot_card_id = c.id
-        WHERE p.connects_from = ?
-    """, (seph_number,)).fetchall()
-
-    paths_to = db.execute("""
-        SELECT p.*, c.number as card_number, c.name as card_name
-        FROM paths p
-        LEFT JOIN cards c ON p.tarot_card_id = c.id
-        WHERE p.connects_to = ?
-    """, (seph_number,)).fetchall()
-
-    result['paths_emanating'] = [dict_from_row(p) for p in paths_from]
-    result['paths_receiving'] = [dict_from_row(p) for p in paths_to]
-
-    return jsonify(result)
+    return jsonify(sephirah_payload(sephirah))
+
+
+def get_sephiroth_by_numbers(numbers):
+    """
+    Resolve several Sephiroth (with connected paths) at once for /batch
+
+    Returns {number: payload} in the same shape as /sephiroth/<number>;
+    numbers that do not exist are left out.
+    """
+    numbers = sorted(set(numbers))
+    if not numbers:
+        return {}
+
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        rows = [snapshot.sephiroth_by_number[n] for n in numbers if n in snapshot.sephiroth_by_number]
+    else:
+        db = get_db()
+        placeholders = ', '.join('?' for _ in numbers)
+        rows = db.execute(f"""
+            SELECT * FROM sephiroth WHERE number IN ({placeholders})
+        """, numbers).fetchall()
+
+    # Connected paths come from the precomputed Tree graph
+    return {row['number']: sephirah_payload(row) for row in rows}
+
+
+def get_paths_by_numbers(numbers):
+    """
+    Resolve several Paths at once for /batch
+
+    Returns {number: payload} in the same shape as /paths/<number>;
+    numbers that do not exist are left out.
+    """
+    numbers = sorted(set(numbers))
+    if not numbers:
+        return {}
+
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        rows = [snapshot.paths_by_number[n] for n in numbers if n in snapshot.paths_by_number]
+    else:
+        db = get_db()
+        placeholders = ', '.join('?' for _ in numbers)
+        rows = db.execute(f"""
+            SELECT p.*, c.number as card_number, c.name as card_name,
+                   s1.name as from_sephirah_name, s2.name as to_sephirah_name
+            FROM paths p
+            LEFT JOIN cards c ON p.tarot_card_id = c.id
+            LEFT JOIN sephiroth s1 ON p.connects_from = s1.number
+            LEFT JOIN sephiroth s2 ON p.connects_to = s2.number
+            WHERE p.number IN ({placeholders})
+        """, numbers).fetchall()
+
+    return {row['number']: dict_from_row(row) for row in rows}
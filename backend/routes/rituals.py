@@ -3,20 +3,30 @@ Rituals Routes Blueprint
 Endpoints for Esoteric Rituals and Practices
 """
 
-from flask import Blueprint, jsonify, request, current_app, g
-import sqlite3
+from flask import Blueprint, jsonify, request
 import json
 
+from database import get_db
+from snapshot import get_snapshot
+from response_cache import cached_response
+from search import rank_rituals
+
 rituals_bp = Blueprint('rituals', __name__, url_prefix='/api/rituals')
 
+# Columns returned when full instructions are not requested
+SUMMARY_FIELDS = (
+    'id', 'name', 'abbreviation', 'tradition', 'category', 'purpose',
+    'difficulty', 'duration_minutes', 'elemental_focus', 'sephiroth_focus',
+    'planetary_focus', 'timing_notes', 'benefits', 'warnings', 'source', 'description'
+)
+
+# Columns returned in the practice guide stages
+GUIDE_FIELDS = ('id', 'name', 'abbreviation', 'difficulty', 'duration_minutes', 'purpose')
+
 
-def get_db():
-    """Get database connection from Flask g object"""
-    db = getattr(g, '_database', None)
-    if db is None:
-        db = g._database = sqlite3.connect(current_app.config.get('DATABASE', 'esoteric_knowledge.db'))
-        db.row_factory = sqlite3.Row
-    return db
+def _nulls_first(value):
+    """Sort key matching SQLite's ORDER BY, where NULL sorts before any value"""
+    return (value is not None, value if value is not None else 0)
 
 
 def dict_from_row(row):
@@ -36,16 +46,27 @@ def dict_from_row(row):
 
 
 @rituals_bp.route('', methods=['GET'])
+@cached_response
 def get_all_rituals():
     """Get all rituals with optional filtering"""
-    db = get_db()
-
     # Optional filtering
     tradition = request.args.get('tradition')
     category = request.args.get('category')
     difficulty = request.args.get('difficulty')
     include_instructions = request.args.get('instructions', 'true').lower() == 'true'
 
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        rituals = snapshot.filter_rituals(tradition=tradition, category=category, difficulty=difficulty)
+        if not include_instructions:
+            rituals = [r.project(SUMMARY_FIELDS) for r in rituals]
+        return jsonify({
+            'count': len(rituals),
+            'rituals': [dict_from_row(r) for r in rituals]
+        })
+
+    db = get_db()
+
     where_conditions = []
     params = []
 
@@ -67,9 +88,7 @@ def get_all_rituals():
     if include_instructions:
         fields = "*"
     else:
-        fields = """id, name, abbreviation, tradition, category, purpose,
-                    difficulty, duration_minutes, elemental_focus, sephiroth_focus,
-                    planetary_focus, timing_notes, benefits, warnings, source, description"""
+        fields = ', '.join(SUMMARY_FIELDS)
 
     query = f"""
         SELECT {fields} FROM rituals
@@ -95,11 +114,14 @@ def get_all_rituals():
 @rituals_bp.route('/<int:ritual_id>', methods=['GET'])
 def get_ritual_by_id(ritual_id):
     """Get a specific ritual by ID with full details"""
-    db = get_db()
-
-    ritual = db.execute("""
-        SELECT * FROM rituals WHERE id = ?
-    """, (ritual_id,)).fetchone()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        ritual = snapshot.rituals_by_id.get(ritual_id)
+    else:
+        db = get_db()
+        ritual = db.execute("""
+            SELECT * FROM rituals WHERE id = ?
+        """, (ritual_id,)).fetchone()
 
     if not ritual:
         return jsonify({
@@ -112,12 +134,20 @@ def get_ritual_by_id(ritual_id):
 @rituals_bp.route('/name/<name>', methods=['GET'])
 def get_ritual_by_name(name):
     """Get a ritual by name or abbreviation (case-insensitive)"""
-    db = get_db()
-
-    ritual = db.execute("""
-        SELECT * FROM rituals
-        WHERE LOWER(name) = LOWER(?) OR LOWER(abbreviation) = LOWER(?)
-    """, (name, name)).fetchone()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        matches = [
+            r for r in (snapshot.rituals_by_name.get(name.lower()),
+                        snapshot.rituals_by_abbreviation.get(name.lower()))
+            if r is not None
+        ]
+        ritual = min(matches, key=lambda r: r['id']) if matches else None
+    else:
+        db = get_db()
+        ritual = db.execute("""
+            SELECT * FROM rituals
+            WHERE LOWER(name) = LOWER(?) OR LOWER(abbreviation) = LOWER(?)
+        """, (name, name)).fetchone()
 
     if not ritual:
         return jsonify({
@@ -129,16 +159,20 @@ def get_ritual_by_name(name):
 
 
 @rituals_bp.route('/traditions', methods=['GET'])
+@cached_response
 def get_traditions():
     """Get list of all ritual traditions"""
-    db = get_db()
-
-    traditions = db.execute("""
-        SELECT DISTINCT tradition, COUNT(*) as ritual_count
-        FROM rituals
-        GROUP BY tradition
-        ORDER BY tradition
-    """).fetchall()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        traditions = snapshot.ritual_counts('tradition')
+    else:
+        db = get_db()
+        traditions = db.execute("""
+            SELECT DISTINCT tradition, COUNT(*) as ritual_count
+            FROM rituals
+            GROUP BY tradition
+            ORDER BY tradition
+        """).fetchall()
 
     return jsonify({
         'count': len(traditions),
@@ -147,16 +181,20 @@ def get_traditions():
 
 
 @rituals_bp.route('/categories', methods=['GET'])
+@cached_response
 def get_categories():
     """Get list of all ritual categories"""
-    db = get_db()
-
-    categories = db.execute("""
-        SELECT DISTINCT category, COUNT(*) as ritual_count
-        FROM rituals
-        GROUP BY category
-        ORDER BY category
-    """).fetchall()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        categories = snapshot.ritual_counts('category')
+    else:
+        db = get_db()
+        categories = db.execute("""
+            SELECT DISTINCT category, COUNT(*) as ritual_count
+            FROM rituals
+            GROUP BY category
+            ORDER BY category
+        """).fetchall()
 
     return jsonify({
         'count': len(categories),
@@ -165,15 +203,22 @@ def get_categories():
 
 
 @rituals_bp.route('/beginner', methods=['GET'])
+@cached_response
 def get_beginner_rituals():
     """Get all beginner-friendly rituals"""
-    db = get_db()
-
-    rituals = db.execute("""
-        SELECT * FROM rituals
-        WHERE difficulty = 'Beginner'
-        ORDER BY duration_minutes
-    """).fetchall()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        rituals = sorted(
+            (r for r in snapshot.rituals if r['difficulty'] == 'Beginner'),
+            key=lambda r: _nulls_first(r['duration_minutes'])
+        )
+    else:
+        db = get_db()
+        rituals = db.execute("""
+            SELECT * FROM rituals
+            WHERE difficulty = 'Beginner'
+            ORDER BY duration_minutes
+        """).fetchall()
 
     return jsonify({
         'count': len(rituals),
@@ -183,16 +228,25 @@ def get_beginner_rituals():
 
 
 @rituals_bp.route('/daily', methods=['GET'])
+@cached_response
 def get_daily_practices():
     """Get rituals suitable for daily practice"""
-    db = get_db()
-
-    rituals = db.execute("""
-        SELECT * FROM rituals
-        WHERE difficulty IN ('Beginner', 'Intermediate')
-        AND duration_minutes <= 25
-        ORDER BY difficulty, duration_minutes
-    """).fetchall()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        rituals = sorted(
+            (r for r in snapshot.rituals
+             if r['difficulty'] in ('Beginner', 'Intermediate')
+             and r['duration_minutes'] is not None and r['duration_minutes'] <= 25),
+            key=lambda r: (r['difficulty'], r['duration_minutes'])
+        )
+    else:
+        db = get_db()
+        rituals = db.execute("""
+            SELECT * FROM rituals
+            WHERE difficulty IN ('Beginner', 'Intermediate')
+            AND duration_minutes <= 25
+            ORDER BY difficulty, duration_minutes
+        """).fetchall()
 
     return jsonify({
         'count': len(rituals),
@@ -205,8 +259,6 @@ def get_daily_practices():
 @rituals_bp.route('/search', methods=['GET'])
 def search_rituals():
     """Search rituals by keyword in name, purpose, or description"""
-    db = get_db()
-
     query = request.args.get('q', '').lower()
 
     if not query:
@@ -214,6 +266,27 @@ def search_rituals():
             'error': 'Please provide a search query using ?q=<query>'
         }), 400
 
+    # Rank matches with the FTS5 index (BM25, prefix matching, snippets)
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        with snapshot.search_db() as search_db:
+            rituals = rank_rituals(search_db, query)
+    else:
+        rituals = rank_rituals(get_db(), query)
+
+    # Fall back to substring matching on databases built without the index
+    if rituals is None and snapshot is not None:
+        rituals = snapshot.search_rituals(query)
+
+    if rituals is not None:
+        return jsonify({
+            'query': query,
+            'count': len(rituals),
+            'rituals': [dict_from_row(r) for r in rituals]
+        })
+
+    db = get_db()
+
     search_pattern = f"%{query}%"
 
     rituals = db.execute("""
@@ -244,13 +317,20 @@ def search_rituals():
 @rituals_bp.route('/by-planet/<planet>', methods=['GET'])
 def get_rituals_by_planet(planet):
     """Get rituals associated with a specific planet"""
-    db = get_db()
-
-    rituals = db.execute("""
-        SELECT * FROM rituals
-        WHERE LOWER(planetary_focus) LIKE LOWER(?)
-        ORDER BY difficulty
-    """, (f"%{planet}%",)).fetchall()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        rituals = sorted(
+            (r for r in snapshot.rituals
+             if r['planetary_focus'] and planet.lower() in r['planetary_focus'].lower()),
+            key=lambda r: _nulls_first(r['difficulty'])
+        )
+    else:
+        db = get_db()
+        rituals = db.execute("""
+            SELECT * FROM rituals
+            WHERE LOWER(planetary_focus) LIKE LOWER(?)
+            ORDER BY difficulty
+        """, (f"%{planet}%",)).fetchall()
 
     if not rituals:
         return jsonify({
@@ -270,13 +350,19 @@ def get_rituals_by_planet(planet):
 @rituals_bp.route('/by-element/<element>', methods=['GET'])
 def get_rituals_by_element(element):
     """Get rituals associated with a specific element"""
-    db = get_db()
-
-    rituals = db.execute("""
-        SELECT * FROM rituals
-        WHERE LOWER(elemental_focus) = LOWER(?)
-        ORDER BY difficulty
-    """, (element,)).fetchall()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        rituals = sorted(
+            snapshot.rituals_by_element.get(element.lower(), ()),
+            key=lambda r: _nulls_first(r['difficulty'])
+        )
+    else:
+        db = get_db()
+        rituals = db.execute("""
+            SELECT * FROM rituals
+            WHERE LOWER(elemental_focus) = LOWER(?)
+            ORDER BY difficulty
+        """, (element,)).fetchall()
 
     if not rituals:
         return jsonify({
@@ -294,31 +380,48 @@ def get_rituals_by_element(element):
 
 
 @rituals_bp.route('/practice-guide', methods=['GET'])
+@cached_response
 def get_practice_guide():
     """Get a suggested practice progression guide"""
-    db = get_db()
-
-    # Get foundational rituals
-    foundation = db.execute("""
-        SELECT id, name, abbreviation, difficulty, duration_minutes, purpose
-        FROM rituals
-        WHERE abbreviation IN ('LBRP', 'LIRP')
-        ORDER BY name
-    """).fetchall()
-
-    intermediate = db.execute("""
-        SELECT id, name, abbreviation, difficulty, duration_minutes, purpose
-        FROM rituals
-        WHERE difficulty = 'Intermediate'
-        ORDER BY name
-    """).fetchall()
-
-    advanced = db.execute("""
-        SELECT id, name, abbreviation, difficulty, duration_minutes, purpose
-        FROM rituals
-        WHERE difficulty IN ('Advanced', 'Expert')
-        ORDER BY difficulty, name
-    """).fetchall()
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        rituals = [r.project(GUIDE_FIELDS) for r in snapshot.rituals]
+        foundation = sorted(
+            (r for r in rituals if r['abbreviation'] in ('LBRP', 'LIRP')),
+            key=lambda r: r['name']
+        )
+        intermediate = sorted(
+            (r for r in rituals if r['difficulty'] == 'Intermediate'),
+            key=lambda r: r['name']
+        )
+        advanced = sorted(
+            (r for r in rituals if r['difficulty'] in ('Advanced', 'Expert')),
+            key=lambda r: (r['difficulty'], r['name'])
+        )
+    else:
+        db = get_db()
+
+        # Get foundational rituals
+        foundation = db.execute("""
+            SELECT id, name, abbreviation, difficulty, duration_minutes, purpose
+            FROM rituals
+            WHERE abbreviation IN ('LBRP', 'LIRP')
+            ORDER BY name
+        """).fetchall()
+
+        intermediate = db.execute("""
+            SELECT id, name, abbreviation, difficulty, duration_minutes, purpose
+            FROM rituals
+            WHERE difficulty = 'Intermediate'
+            ORDER BY name
+        """).fetchall()
+
+        advanced = db.execute("""
+            SELECT id, name, abbreviation, difficulty, duration_minutes, purpose
+            FROM rituals
+            WHERE difficulty IN ('Advanced', 'Expert')
+            ORDER BY difficulty, name
+        """).fetchall()
 
     return jsonify({
         'title': 'Suggested Practice Progression',
@@ -346,3 +449,27 @@ def get_practice_guide():
             'Consistency is more important than complexity'
         ]
     })
+
+
+def get_rituals_by_ids(ritual_ids):
+    """
+    Resolve several rituals at once for /batch
+
+    Returns {id: payload} in the same shape as /<ritual_id>; ids that do
+    not exist are left out.
+    """
+    ritual_ids = sorted(set(ritual_ids))
+    if not ritual_ids:
+        return {}
+
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        rows = [snapshot.rituals_by_id[i] for i in ritual_ids if i in snapshot.rituals_by_id]
+    else:
+        db = get_db()
+        placeholders = ', '.join('?' for _ in ritual_ids)
+        rows = db.execute(f"""
+            SELECT * FROM rituals WHERE id IN ({placeholders})
+        """, ritual_ids).fetchall()
+
+    return {row['id']: dict_from_row(row) for row in rows}
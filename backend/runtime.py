@@ -0,0 +1,13 @@
+"""
+Runtime
+Host details shared by the production server entry points
+"""
+
+import os
+
+
+def available_cpus():
+    """CPUs this process may run on (respects container CPU affinity)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
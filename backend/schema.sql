@@ -258,3 +258,63 @@ CREATE INDEX IF NOT EXISTS idx_lunar_mansions_sign ON lunar_mansions(zodiac_sign
 CREATE INDEX IF NOT EXISTS idx_rituals_tradition ON rituals(tradition);
 CREATE INDEX IF NOT EXISTS idx_rituals_category ON rituals(category);
 CREATE INDEX IF NOT EXISTS idx_rituals_difficulty ON rituals(difficulty);
+
+-- ============================================================================
+-- CROSS-REFERENCES
+-- ============================================================================
+
+-- Card correspondences resolved once at migration time, so routes join on
+-- integer keys instead of matching names at request time.
+-- relation / target_table:
+--   path                   -> paths          (Major Arcana path on the Tree)
+--   sephirah_from          -> sephiroth      (path's upper sephirah)
+--   sephirah_to            -> sephiroth      (path's lower sephirah)
+--   planet                 -> planets        (card's planetary attribution)
+--   zodiac_sign            -> zodiac_signs   (card's zodiacal attribution)
+--   ruling_planet          -> planets        (ruler of that sign)
+--   elemental_sign         -> zodiac_signs   (signs sharing the card's element)
+--   sign_tarot_association -> zodiac_signs   (sign whose tarot_association names the card)
+--   ritual                 -> rituals        (rituals focused on the card's element, planet or sephiroth)
+CREATE TABLE IF NOT EXISTS card_correspondences (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    card_id INTEGER NOT NULL,
+    relation TEXT NOT NULL,
+    target_table TEXT NOT NULL CHECK(target_table IN ('paths', 'sephiroth', 'planets', 'zodiac_signs', 'rituals')),
+    target_id INTEGER NOT NULL,
+    FOREIGN KEY (card_id) REFERENCES cards(id) ON DELETE CASCADE,
+    UNIQUE(card_id, relation, target_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_card_correspondences_card ON card_correspondences(card_id, relation);
+CREATE INDEX IF NOT EXISTS idx_card_correspondences_target ON card_correspondences(relation, target_id);
+
+-- ============================================================================
+-- FULL-TEXT SEARCH INDEXES (FTS5)
+-- ============================================================================
+
+-- Cards: rowid = cards.id, populated by the migration from cards, keywords
+-- and system_descriptions
+CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5(
+    name,
+    keywords,
+    meanings, -- upright + reversed meaning
+    description,
+    correspondences, -- element, astrology, hebrew letter, colors, gemstone, herb...
+    systems, -- all system-specific descriptions
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+-- Rituals: rowid = rituals.id
+CREATE VIRTUAL TABLE IF NOT EXISTS rituals_fts USING fts5(
+    name,
+    abbreviation,
+    purpose,
+    description,
+    category,
+    benefits,
+    instructions,
+    words_of_power,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
@@ -0,0 +1,165 @@
+"""
+Full-Text Search
+BM25-ranked queries against the FTS5 indexes built by the migration
+
+cards_fts indexes each card's name, keywords, meanings, description,
+correspondences and system descriptions; rituals_fts indexes the ritual text
+columns including instructions and words of power. Both use the card/ritual
+id as rowid. Every helper returns None when the index tables are missing
+(a database built before the indexes existed) so callers can fall back to
+LIKE matching.
+"""
+
+import re
+import sqlite3
+
+
+# Snippets are HTML: corpus text is escaped and matches are wrapped in
+# <mark>. FTS5 marks matches with private-use characters that can't occur in
+# the corpus; they become tags only after the text around them is escaped.
+SNIPPET_START = '<mark>'
+SNIPPET_END = '</mark>'
+SNIPPET_ELLIPSIS = '…'
+SNIPPET_TOKENS = 16
+MATCH_START = '\ue000'
+MATCH_END = '\ue001'
+
+# Replacements applied to raw snippet text, in order (& first)
+HTML_ESCAPES = (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;'), ("'", '&#x27;'),
+                (MATCH_START, SNIPPET_START), (MATCH_END, SNIPPET_END))
+
+# Column weights for bm25(), in index column order
+CARD_WEIGHTS = (10.0, 5.0, 2.0, 1.0, 3.0, 0.5)
+RITUAL_WEIGHTS = (10.0, 10.0, 3.0, 2.0, 3.0, 1.0, 0.5, 1.0)
+
+CARD_INDEX_COLUMNS = ('name', 'keywords', 'meanings', 'description', 'correspondences', 'systems')
+RITUAL_INDEX_COLUMNS = ('name', 'abbreviation', 'purpose', 'description', 'category',
+                        'benefits', 'instructions', 'words_of_power')
+
+# Card columns folded into the "correspondences" index column
+CARD_CORRESPONDENCE_FIELDS = ('element', 'astrology', 'astrological_decan', 'hebrew_letter',
+                              'tree_of_life_path', 'sephiroth', 'color_primary',
+                              'color_secondary', 'gemstone', 'herb')
+
+# System description columns folded into the "systems" index column
+SYSTEM_TEXT_FIELDS = ('description', 'upright_meaning', 'reversed_meaning', 'key_imagery',
+                      'divinatory_meaning', 'esoteric_meaning')
+
+
+def build_match_query(query):
+    """
+    Turn free text into an FTS5 MATCH expression
+
+    Every word becomes a quoted prefix term ("lov"* matches love, lovers),
+    and all terms must match. Returns None if the text has no searchable words.
+    """
+    terms = re.findall(r'\w+', query.lower())
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _join_text(*values):
+    return ' '.join(str(v) for v in values if v)
+
+
+def card_index_rows(db):
+    """Yield (rowid, *CARD_INDEX_COLUMNS) tuples for every card"""
+    keywords = {}
+    for row in db.execute("SELECT card_id, keyword FROM keywords ORDER BY id"):
+        keywords.setdefault(row[0], []).append(row[1])
+
+    systems = {}
+    fields = ', '.join(SYSTEM_TEXT_FIELDS)
+    for row in db.execute(f"SELECT card_id, {fields} FROM system_descriptions ORDER BY id"):
+        systems.setdefault(row[0], []).append(_join_text(*row[1:]))
+
+    fields = ', '.join(CARD_CORRESPONDENCE_FIELDS)
+    cards = db.execute(f"""
+        SELECT id, name, upright_meaning, reversed_meaning, description, {fields}
+        FROM cards ORDER BY id
+    """).fetchall()
+    for row in cards:
+        card_id = row[0]
+        yield (
+            card_id,
+            row[1],
+            ' '.join(keywords.get(card_id, [])),
+            _join_text(row[2], row[3]),
+            row[4],
+            _join_text(*row[5:]),
+            ' '.join(systems.get(card_id, []))
+        )
+
+
+def ritual_index_rows(db):
+    """Yield (rowid, *RITUAL_INDEX_COLUMNS) tuples for every ritual"""
+    fields = ', '.join(RITUAL_INDEX_COLUMNS)
+    return db.execute(f"SELECT id, {fields} FROM rituals ORDER BY id")
+
+
+def snippet_sql(table):
+    """SQL expression for an HTML-escaped, <mark>-highlighted snippet of table's best column"""
+    expression = f"snippet({table}, -1, ?, ?, ?, ?)"
+    for _ in HTML_ESCAPES:
+        expression = f"replace({expression}, ?, ?)"
+    return expression
+
+
+def snippet_params():
+    """Parameters for snippet_sql(), in placeholder order"""
+    params = [MATCH_START, MATCH_END, SNIPPET_ELLIPSIS, SNIPPET_TOKENS]
+    for old, new in HTML_ESCAPES:
+        params.extend((old, new))
+    return params
+
+
+def rank_cards(db, query):
+    """
+    Rank cards matching query
+
+    Returns a list of (card_id, snippet) pairs, best match first, or None if
+    the cards_fts index is not available.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+
+    weights = ', '.join(str(w) for w in CARD_WEIGHTS)
+    try:
+        rows = db.execute(f"""
+            SELECT rowid,
+                   {snippet_sql('cards_fts')} AS snippet
+            FROM cards_fts
+            WHERE cards_fts MATCH ?
+            ORDER BY bm25(cards_fts, {weights})
+        """, (*snippet_params(), match)).fetchall()
+    except sqlite3.OperationalError:
+        return None
+
+    return [(row[0], row[1]) for row in rows]
+
+
+def rank_rituals(db, query):
+    """
+    Rank rituals matching query
+
+    Returns full ritual rows with an extra "snippet" column, best match
+    first, or None if the rituals_fts index is not available.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+
+    weights = ', '.join(str(w) for w in RITUAL_WEIGHTS)
+    try:
+        return db.execute(f"""
+            SELECT r.*,
+                   {snippet_sql('rituals_fts')} AS snippet
+            FROM rituals_fts
+            JOIN rituals r ON r.id = rituals_fts.rowid
+            WHERE rituals_fts MATCH ?
+            ORDER BY bm25(rituals_fts, {weights})
+        """, (*snippet_params(), match)).fetchall()
+    except sqlite3.OperationalError:
+        return None
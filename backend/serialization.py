@@ -0,0 +1,103 @@
+"""
+Serialization
+The app's JSON provider: a fast encoder that takes rows directly, and msgpack
+
+FastJSONProvider is installed as app.json, so every jsonify() goes through
+it. It encodes with orjson when installed (falling back to the standard
+library otherwise) and understands sqlite3.Row and snapshot FrozenRow
+objects, so views can return rows without building a dict per row first.
+A sqlite3.Row is fresh for every query and becomes a dict as it is encoded;
+a FrozenRow keeps the dict it is converted to, so a snapshot row is
+converted once per process.
+Output is the same JSON the stock provider produces: sorted keys, compact
+separators, a trailing newline and indentation only in debug mode, though
+non-ASCII text is written as UTF-8 rather than \\u escapes.
+
+Clients that send Accept: application/msgpack (and prefer it to JSON) get
+the same payload as MessagePack when the msgpack package is installed.
+"""
+
+from collections.abc import Mapping
+import sqlite3
+
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+from snapshot import FrozenRow
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library encoder is used instead
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; Accept: application/msgpack then gets JSON
+    msgpack = None
+
+MSGPACK_AVAILABLE = msgpack is not None
+
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def encode_default(obj):
+    """Convert values the encoders don't support natively (rows and other mappings)"""
+    if isinstance(obj, FrozenRow):
+        return obj.as_dict()
+    if isinstance(obj, sqlite3.Row):
+        return dict(zip(obj.keys(), obj))
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    return DefaultJSONProvider.default(obj)
+
+
+def response_format():
+    """'msgpack' when the current request prefers MessagePack (and it is available), else 'json'"""
+    if not MSGPACK_AVAILABLE or not has_request_context():
+        return 'json'
+    best = request.accept_mimetypes.best_match((JSON_MIMETYPE, MSGPACK_MIMETYPE), default=JSON_MIMETYPE)
+    return 'msgpack' if best == MSGPACK_MIMETYPE else 'json'
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider using orjson, row-aware, with msgpack content negotiation"""
+
+    default = staticmethod(encode_default)
+
+    def _indent(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        option = ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if self._indent() else 0)
+        return orjson.dumps(obj, default=encode_default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+
+        if response_format() == 'msgpack':
+            body = msgpack.packb(obj, default=encode_default, use_bin_type=True)
+            mimetype = MSGPACK_MIMETYPE
+        elif orjson is not None:
+            option = ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE | (orjson.OPT_INDENT_2 if self._indent() else 0)
+            body = orjson.dumps(obj, default=encode_default, option=option)
+            mimetype = self.mimetype
+        else:
+            body = f'{super().dumps(obj)}\n'
+            mimetype = self.mimetype
+
+        response = self._app.response_class(body, mimetype=mimetype)
+        if MSGPACK_AVAILABLE:
+            response.vary.add('Accept')
+        return response
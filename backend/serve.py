@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Production server using waitress (for platforms without gunicorn, e.g. Windows)
+
+Usage (from backend/):
+    python serve.py [--host 0.0.0.0] [--port 5000] [--threads N]
+
+Waitress runs a single process; the thread count defaults to four per CPU.
+"""
+
+import argparse
+import os
+
+from waitress import serve
+
+from runtime import available_cpus
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Serve the API with waitress')
+    parser.add_argument('--host', default=os.environ.get('EMERALD_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('EMERALD_PORT', 5000)))
+    parser.add_argument('--threads', type=int,
+                        default=int(os.environ.get('EMERALD_THREADS', 4 * available_cpus())))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    from wsgi import app
+
+    serve(app, host=args.host, port=args.port, threads=args.threads)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+"""
+Corpus Snapshot
+Immutable, indexed in-memory copy of the esoteric knowledge database
+
+The corpus is read-only at runtime, so in snapshot mode the whole database is
+read once at startup and every route serves from these structures instead of
+opening SQLite per request. Enable it with EMERALD_SNAPSHOT_MODE=1.
+
+Full-text search still needs the FTS5 ranking functions, so the snapshot also
+keeps a private in-memory SQLite copy of the database for the search routes;
+nothing is read from disk after startup.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from types import MappingProxyType
+import re
+import sqlite3
+import threading
+
+from flask import current_app
+
+
+SNAPSHOT_EXTENSION = 'corpus_snapshot'
+
+DIFFICULTY_ORDER = {
+    'Beginner': 1,
+    'Intermediate': 2,
+    'Advanced': 3,
+    'Expert': 4
+}
+
+
+class FrozenRow:
+    """
+    Read-only row that behaves like sqlite3.Row
+
+    Supports row['column'], row[index], row.keys() and iteration over values,
+    so the existing dict_from_row helpers work unchanged on snapshot data.
+    """
+
+    __slots__ = ('_keys', '_values', '_index', '_dict')
+
+    def __init__(self, keys, values):
+        object.__setattr__(self, '_keys', tuple(keys))
+        object.__setattr__(self, '_values', tuple(values))
+        object.__setattr__(self, '_index', {key: i for i, key in enumerate(self._keys)})
+        object.__setattr__(self, '_dict', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('FrozenRow is immutable')
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, slice)):
+            return self._values[key]
+        return self._values[self._index[key]]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f"FrozenRow({dict(zip(self._keys, self._values))!r})"
+
+    def keys(self):
+        return list(self._keys)
+
+    def get(self, key, default=None):
+        if key in self._index:
+            return self._values[self._index[key]]
+        return default
+
+    def as_dict(self):
+        """
+        The row as a dict, built on first use and shared afterwards
+
+        For the JSON/msgpack encoders, so a snapshot row is converted once
+        per process rather than on every response. Callers must not modify it.
+        """
+        if self._dict is None:
+            object.__setattr__(self, '_dict', dict(zip(self._keys, self._values)))
+        return self._dict
+
+    def project(self, keys, renames=None):
+        """Return a new row with only the given columns (optionally renamed)"""
+        renames = renames or {}
+        return FrozenRow(
+            [renames.get(key, key) for key in keys],
+            [self[key] for key in keys]
+        )
+
+    def extend(self, **extra):
+        """Return a new row with extra columns appended (like a JOIN)"""
+        return FrozenRow(self._keys + tuple(extra.keys()), self._values + tuple(extra.values()))
+
+
+def _lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def _group(rows, key):
+    """Build a frozen index of rows grouped by key(row)"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(key(row), []).append(row)
+    return MappingProxyType({k: tuple(v) for k, v in groups.items()})
+
+
+def _unique(rows, key):
+    """Build a frozen index of rows by a unique key(row); first row wins"""
+    index = {}
+    for row in rows:
+        index.setdefault(key(row), row)
+    return MappingProxyType(index)
+
+
+def _like(value, pattern):
+    """Python equivalent of LOWER(value) LIKE '%pattern%' (pattern already lowercase)"""
+    return value is not None and pattern in str(value).lower()
+
+
+class CorpusSnapshot:
+    """Frozen, indexed in-memory model of every table in the corpus"""
+
+    def __init__(self, tables, search_db=None):
+        cards = tables['cards']
+        keywords = tables['keywords']
+        system_descriptions = tables['system_descriptions']
+        sephiroth = tables['sephiroth']
+        paths = tables['paths']
+        planets = tables['planets']
+        signs = tables['zodiac_signs']
+        rituals = tables['rituals']
+        mansions = tables['lunar_mansions']
+
+        # Tarot
+        self.cards = tuple(sorted(cards, key=lambda c: c['number']))
+        self.cards_by_id = _unique(cards, lambda c: c['id'])
+        self.cards_by_number = _unique(cards, lambda c: c['number'])
+        self.cards_by_name = _unique(cards, lambda c: _lower(c['name']))
+        self.cards_by_arcana = _group(self.cards, lambda c: c['arcana'])
+        self.cards_by_suit = _group(self.cards, lambda c: _lower(c['suit']))
+        self.cards_by_element = _group(self.cards, lambda c: _lower(c['element']))
+        self.keywords_by_card = MappingProxyType({
+            card_id: tuple(k['keyword'] for k in rows)
+            for card_id, rows in _group(keywords, lambda k: k['card_id']).items()
+        })
+        self.sorted_keywords_by_card = MappingProxyType({
+            card_id: tuple(sorted(words)) for card_id, words in self.keywords_by_card.items()
+        })
+        self.system_descriptions = tuple(system_descriptions)
+        self.system_descriptions_by_card = _group(system_descriptions, lambda sd: sd['card_id'])
+
+        # Qabalah
+        self.sephiroth = tuple(sorted(sephiroth, key=lambda s: s['number']))
+        self.sephiroth_by_number = _unique(sephiroth, lambda s: s['number'])
+        self.sephiroth_by_name = _unique(sephiroth, lambda s: _lower(s['name']))
+
+        joined_paths = []
+        for path in sorted(paths, key=lambda p: p['number']):
+            card = self.cards_by_id.get(path['tarot_card_id'])
+            seph_from = self.sephiroth_by_number.get(path['connects_from'])
+            seph_to = self.sephiroth_by_number.get(path['connects_to'])
+            joined_paths.append(path.extend(
+                card_number=card['number'] if card else None,
+                card_name=card['name'] if card else None,
+                from_sephirah_name=seph_from['name'] if seph_from else None,
+                to_sephirah_name=seph_to['name'] if seph_to else None
+            ))
+        self.paths = tuple(joined_paths)
+        self.paths_by_number = _unique(self.paths, lambda p: p['number'])
+        self.paths_by_card_number = _unique(self.paths, lambda p: p['card_number'])
+        self.paths_from = _group(self.paths, lambda p: p['connects_from'])
+        self.paths_to = _group(self.paths, lambda p: p['connects_to'])
+
+        # Astrology
+        self.planets = tuple(sorted(planets, key=lambda p: p['id']))
+        self.planets_by_name = _unique(planets, lambda p: _lower(p['name']))
+        self.planets_by_exact_name = _unique(planets, lambda p: p['name'])
+
+        self.signs = tuple(sorted(signs, key=lambda s: s['house_number']))
+        self.signs_by_name = _unique(signs, lambda s: _lower(s['name']))
+        self.signs_by_element = _group(self.signs, lambda s: _lower(s['element']))
+        self.signs_by_modality = _group(self.signs, lambda s: _lower(s['modality']))
+        self.signs_by_ruler = _group(self.signs, lambda s: _lower(s['ruling_planet']))
+        self.signs_by_exalted = _group(self.signs, lambda s: _lower(s['exalted_planet']))
+        self.tarot_card_by_sign = MappingProxyType({
+            sign['id']: self.card_for_tarot_association(sign['tarot_association'])
+            for sign in self.signs if sign['tarot_association']
+        })
+
+        self.lunar_mansions = tuple(sorted(mansions, key=lambda m: m['number']))
+        self.lunar_mansions_by_number = _unique(mansions, lambda m: m['number'])
+
+        # Rituals
+        self.rituals = tuple(sorted(rituals, key=lambda r: r['id']))
+        self.rituals_by_id = _unique(rituals, lambda r: r['id'])
+        self.rituals_by_name = _unique(rituals, lambda r: _lower(r['name']))
+        self.rituals_by_abbreviation = _unique(
+            [r for r in self.rituals if r['abbreviation']], lambda r: _lower(r['abbreviation'])
+        )
+        self.rituals_by_element = _group(self.rituals, lambda r: _lower(r['elemental_focus']))
+
+        # In-memory copy of the database used only for FTS5 queries
+        self._search_db = search_db
+        self._search_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, db_path):
+        """Read every table from the database file into a new snapshot"""
+        # Read-only: a wrong path fails here instead of creating an empty file
+        conn = sqlite3.connect(Path(db_path).resolve().as_uri() + '?mode=ro', uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            tables = {}
+            for table in ('cards', 'keywords', 'system_descriptions', 'sephiroth',
+                          'paths', 'planets', 'zodiac_signs', 'lunar_mansions', 'rituals'):
+                rows = conn.execute(f"SELECT * FROM {table} ORDER BY id").fetchall()
+                tables[table] = [FrozenRow(row.keys(), tuple(row)) for row in rows]
+
+            search_db = sqlite3.connect(':memory:', check_same_thread=False)
+            search_db.row_factory = sqlite3.Row
+            conn.backup(search_db)
+        finally:
+            conn.close()
+        return cls(tables, search_db=search_db)
+
+    @contextmanager
+    def search_db(self):
+        """Serialized access to the in-memory search database"""
+        with self._search_lock:
+            yield self._search_db
+
+    # ------------------------------------------------------------------
+    # Tarot
+    # ------------------------------------------------------------------
+
+    def filter_cards(self, arcana=None, suit=None, element=None):
+        """Cards matching the /cards filters, ordered by number"""
+        cards = self.cards
+        if arcana:
+            cards = self.cards_by_arcana.get(arcana, ())
+        if suit:
+            cards = [c for c in cards if _lower(c['suit']) == suit.lower()]
+        if element:
+            cards = [c for c in cards if _lower(c['element']) == element.lower()]
+        return list(cards)
+
+    def search_cards(self, pattern):
+        """Cards where any searchable field or keyword contains pattern"""
+        fields = ('name', 'upright_meaning', 'reversed_meaning', 'description',
+                  'element', 'hebrew_letter', 'color_primary', 'gemstone')
+        results = []
+        for card in self.cards:
+            if any(_like(card[field], pattern) for field in fields) or any(
+                    _like(k, pattern) for k in self.keywords_by_card.get(card['id'], ())):
+                results.append(card)
+        return results
+
+    def system_counts(self):
+        """(system_name, card_count) pairs ordered by system name"""
+        counts = {}
+        for sd in self.system_descriptions:
+            counts[sd['system_name']] = counts.get(sd['system_name'], 0) + 1
+        return [
+            FrozenRow(('system_name', 'card_count'), (name, counts[name]))
+            for name in sorted(counts)
+        ]
+
+    def system_description(self, card_id, system_name):
+        for sd in self.system_descriptions_by_card.get(card_id, ()):
+            if sd['system_name'] == system_name:
+                return sd
+        return None
+
+    # ------------------------------------------------------------------
+    # Astrology
+    # ------------------------------------------------------------------
+
+    def sign_with_ruler(self, sign):
+        """Sign row joined with its ruling planet's symbol and day"""
+        planet = self.planets_by_exact_name.get(sign['ruling_planet'])
+        return sign.extend(
+            ruling_planet_symbol=planet['symbol'] if planet else None,
+            ruling_day=planet['day_of_week'] if planet else None
+        )
+
+    def planet_with_sephirah(self, planet, column='sephiroth_name', projection=None):
+        """Planet row (optionally projected) joined with its sephirah name"""
+        sephirah = self.sephiroth_by_number.get(planet['sephiroth_number'])
+        row = planet.project(projection) if projection else planet
+        return row.extend(**{column: sephirah['name'] if sephirah else None})
+
+    def card_for_tarot_association(self, association):
+        """
+        Resolve strings like "The Emperor (IV)" to a (number, name) row
+
+        Only used while building tarot_card_by_sign at load time.
+        """
+        match = re.search(r'The ([A-Za-z\s]+)\s*\(([IVX]+)\)', association)
+        if not match:
+            return None
+        card_name = match.group(1).strip().lower()
+        for card in sorted(self.cards_by_id.values(), key=lambda c: c['id']):
+            if card_name in card['name'].lower():
+                return card.project(('number', 'name'))
+        return None
+
+    # ------------------------------------------------------------------
+    # Rituals
+    # ------------------------------------------------------------------
+
+    def filter_rituals(self, tradition=None, category=None, difficulty=None):
+        """Rituals matching the /api/rituals filters, ordered by difficulty then name"""
+        rituals = [
+            r for r in self.rituals
+            if (not tradition or _lower(r['tradition']) == tradition.lower())
+            and (not category or _lower(r['category']) == category.lower())
+            and (not difficulty or _lower(r['difficulty']) == difficulty.lower())
+        ]
+        return sorted(rituals, key=lambda r: (DIFFICULTY_ORDER.get(r['difficulty'], 5), r['name']))
+
+    def search_rituals(self, pattern):
+        """Rituals where any searchable field contains pattern"""
+        fields = ('name', 'abbreviation', 'purpose', 'description', 'category', 'benefits')
+        rituals = [r for r in self.rituals if any(_like(r[field], pattern) for field in fields)]
+        return sorted(rituals, key=lambda r: DIFFICULTY_ORDER.get(r['difficulty'], 5))
+
+    def ritual_counts(self, column):
+        """(value, ritual_count) pairs grouped by a ritual column"""
+        counts = {}
+        for ritual in self.rituals:
+            counts[ritual[column]] = counts.get(ritual[column], 0) + 1
+        return [
+            FrozenRow((column, 'ritual_count'), (value, counts[value]))
+            for value in sorted(counts, key=lambda v: (v is not None, v or ''))
+        ]
+
+
+def init_snapshot(app):
+    """Load the corpus snapshot for app if SNAPSHOT_MODE is enabled"""
+    if app.config.get('SNAPSHOT_MODE'):
+        app.extensions[SNAPSHOT_EXTENSION] = CorpusSnapshot.load(app.config['DATABASE'])
+
+
+def get_snapshot():
+    """Return the active corpus snapshot, or None when serving from SQLite"""
+    return current_app.extensions.get(SNAPSHOT_EXTENSION)
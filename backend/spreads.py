@@ -0,0 +1,126 @@
+"""
+Tarot Spreads
+Named spread layouts and reproducible draws for the /spreads endpoints
+
+A draw shuffles the deck once with a seeded random.Random, takes one card
+per position without replacement and decides reversals from the same
+generator, so the same seed always reproduces the same reading.
+"""
+
+import random
+
+
+# Cards are drawn by number (0-77)
+DECK_SIZE = 78
+
+# Largest seed accepted from clients (and generated when none is given)
+MAX_SEED = 2 ** 32 - 1
+
+SPREADS = {
+    'single': {
+        'name': 'Single Card',
+        'description': 'One card for a daily draw or a focused question',
+        'positions': [
+            {'name': 'Focus', 'meaning': 'The heart of the matter'}
+        ]
+    },
+    'three-card': {
+        'name': 'Three-Card Spread',
+        'description': 'Past, present and future of a situation',
+        'positions': [
+            {'name': 'Past', 'meaning': 'Influences that led to the situation'},
+            {'name': 'Present', 'meaning': 'The situation as it stands now'},
+            {'name': 'Future', 'meaning': 'Where the situation is heading'}
+        ]
+    },
+    'celtic-cross': {
+        'name': 'Celtic Cross',
+        'description': 'The classic ten-card layout published by A. E. Waite',
+        'positions': [
+            {'name': 'Present', 'meaning': 'The querent and the current situation'},
+            {'name': 'Challenge', 'meaning': 'What crosses the situation'},
+            {'name': 'Foundation', 'meaning': 'The root or distant past of the matter'},
+            {'name': 'Recent Past', 'meaning': 'What is passing away'},
+            {'name': 'Crown', 'meaning': 'The best that can be achieved'},
+            {'name': 'Near Future', 'meaning': 'What is coming into being'},
+            {'name': 'Self', 'meaning': 'The querent\'s attitude'},
+            {'name': 'Environment', 'meaning': 'Surrounding people and influences'},
+            {'name': 'Hopes and Fears', 'meaning': 'What the querent hopes for or dreads'},
+            {'name': 'Outcome', 'meaning': 'The likely result'}
+        ]
+    },
+    'tree-of-life': {
+        'name': 'Tree of Life',
+        'description': 'Ten cards laid on the Sephiroth, from Kether to Malkuth',
+        'positions': [
+            {'name': 'Kether', 'sephirah': 1, 'meaning': 'Spiritual aim and highest ideal'},
+            {'name': 'Chokmah', 'sephirah': 2, 'meaning': 'Creative force and initiative'},
+            {'name': 'Binah', 'sephirah': 3, 'meaning': 'Understanding, form and limitation'},
+            {'name': 'Chesed', 'sephirah': 4, 'meaning': 'Mercy, resources and what is given'},
+            {'name': 'Geburah', 'sephirah': 5, 'meaning': 'Severity, conflict and what must be cut away'},
+            {'name': 'Tiphareth', 'sephirah': 6, 'meaning': 'Harmony and the true self'},
+            {'name': 'Netzach', 'sephirah': 7, 'meaning': 'Emotions, desire and the arts'},
+            {'name': 'Hod', 'sephirah': 8, 'meaning': 'Intellect and communication'},
+            {'name': 'Yesod', 'sephirah': 9, 'meaning': 'The subconscious and foundations'},
+            {'name': 'Malkuth', 'sephirah': 10, 'meaning': 'The material outcome'}
+        ]
+    }
+}
+
+
+def spread_layout(spread_id):
+    """Public description of a spread (positions numbered from 1), or None"""
+    spread = SPREADS.get(spread_id)
+    if spread is None:
+        return None
+    return {
+        'id': spread_id,
+        'name': spread['name'],
+        'description': spread['description'],
+        'card_count': len(spread['positions']),
+        'positions': [
+            dict(position, position=index)
+            for index, position in enumerate(spread['positions'], start=1)
+        ]
+    }
+
+
+def parse_draw_args(args):
+    """
+    Read the seed/reversals parameters of a spread draw
+
+    Returns (seed, reversal_probability). A seed is generated when none is
+    given so every reading can be reproduced. Raises ValueError with a
+    client-facing message on bad input.
+    """
+    if args.get('seed') is not None:
+        try:
+            seed = int(args['seed'])
+        except ValueError:
+            seed = -1
+        if seed < 0 or seed > MAX_SEED:
+            raise ValueError(f'seed must be an integer between 0 and {MAX_SEED}')
+    else:
+        seed = random.SystemRandom().randint(0, MAX_SEED)
+
+    reversal_probability = 0.0
+    if args.get('reversals') is not None:
+        try:
+            reversal_probability = float(args['reversals'])
+        except ValueError:
+            reversal_probability = -1.0
+        if not 0.0 <= reversal_probability <= 1.0:
+            raise ValueError('reversals must be a probability between 0 and 1')
+
+    return seed, reversal_probability
+
+
+def draw_numbers(count, seed, reversal_probability=0.0, deck_size=DECK_SIZE):
+    """
+    Draw count distinct card numbers in one shuffle
+
+    Returns a list of (card_number, reversed) pairs in position order.
+    """
+    rng = random.Random(seed)
+    numbers = rng.sample(range(deck_size), count)
+    return [(number, rng.random() < reversal_probability) for number in numbers]
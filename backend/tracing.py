@@ -0,0 +1,70 @@
+"""
+SQL Tracing
+Opt-in per-request statement traces for tuning routes
+
+With SQL_TRACE enabled (EMERALD_SQL_TRACE=1), every request keeps a
+tracing QueryLog: get_db() connections record each statement with its
+parameters, execution plus fetch time and row count. Every response then
+carries a Server-Timing header (sql and app durations, shown in browser
+dev tools), and JSON object responses requested with ?_trace=1 get a
+"_trace" appendix listing the statements. When SQL_TRACE is off no hooks
+are installed at all.
+"""
+
+import time
+
+from flask import current_app, g, request
+
+from database import request_query_log
+
+
+TRACE_ARG = '_trace'
+
+
+def trace_summary(log, total_seconds):
+    """The _trace appendix for a request"""
+    return {
+        'total_ms': round(total_seconds * 1000, 3),
+        'sql_ms': round(log.seconds * 1000, 3),
+        'statement_count': log.count,
+        'statements': [
+            dict(entry, duration_ms=round(entry['duration_ms'], 3))
+            for entry in log.statements
+        ]
+    }
+
+
+def server_timing(log, total_seconds):
+    """Server-Timing header value for a request"""
+    return (f'sql;dur={log.seconds * 1000:.3f};desc="{log.count} statements", '
+            f'app;dur={total_seconds * 1000:.3f}')
+
+
+def init_tracing(app):
+    """Trace SQL for every request of app when SQL_TRACE is enabled"""
+    if not app.config.get('SQL_TRACE', False):
+        return
+
+    @app.before_request
+    def start_sql_trace():
+        g.trace_start = time.perf_counter()
+        request_query_log(trace=True)
+
+    @app.after_request
+    def finish_sql_trace(response):
+        start = g.get('trace_start')
+        if start is None:
+            return response
+        log = request_query_log()
+        total = time.perf_counter() - start
+        response.headers['Server-Timing'] = server_timing(log, total)
+
+        if (request.args.get(TRACE_ARG, '').lower() in ('1', 'true', 'yes')
+                and response.is_json and not response.is_streamed and response.status_code != 304):
+            data = response.get_json(silent=True)
+            if isinstance(data, dict):
+                data['_trace'] = trace_summary(log, total)
+                response.set_data(current_app.json.dumps(data) + '\n')
+                # The body no longer matches a cached ETag
+                response.headers.pop('ETag', None)
+        return response
@@ -0,0 +1,14 @@
+"""
+WSGI entry point for production servers
+
+Builds the app once and warms its response cache. Gunicorn loads this
+module in the master process (preload_app in gunicorn.conf.py), so the
+corpus snapshot, Tree of Life graph, gematria index and cached responses
+are shared copy-on-write by every forked worker.
+"""
+
+from app import create_app, warm_up
+
+
+app = create_app()
+warm_up(app)
@@ -350,25 +350,287 @@ ZODIAC_SIGNS = [
 ]
 
 
+# The 28 Mansions of the Moon (manazil al-qamar), each an equal 12 deg 51' 26" of the
+# tropical zodiac starting at 0 Aries. Uses follow Agrippa (Three Books of Occult
+# Philosophy, II.33). Sanskrit nakshatras and Chinese xiu are the traditional
+# counterparts, matched by their marker stars.
+LUNAR_MANSIONS = [
+    {
+        'number': 1,
+        'name_arabic': 'Al Sharatain',
+        'name_sanskrit': 'Ashvini',
+        'name_chinese': 'Lou',
+        'symbolism': 'The Two Signs: the horns of the Ram (Beta and Gamma Arietis)',
+        'nature': 'Mixed',
+        'activities': 'Causes discord and journeys'
+    },
+    {
+        'number': 2,
+        'name_arabic': 'Al Butain',
+        'name_sanskrit': 'Bharani',
+        'name_chinese': 'Wei (Stomach)',
+        'symbolism': 'The Little Belly: the belly of the Ram (Delta, Epsilon and Rho Arietis)',
+        'nature': 'Beneficial',
+        'activities': 'Finding treasure, retaining captives'
+    },
+    {
+        'number': 3,
+        'name_arabic': 'Al Thurayya',
+        'name_sanskrit': 'Krittika',
+        'name_chinese': 'Mao',
+        'symbolism': 'The Many Little Ones: the Pleiades',
+        'nature': 'Beneficial',
+        'activities': 'Prosperous for sailors, hunters and alchemists'
+    },
+    {
+        'number': 4,
+        'name_arabic': 'Al Dabaran',
+        'name_sanskrit': 'Rohini',
+        'name_chinese': 'Bi (Net)',
+        'symbolism': 'The Follower: Aldebaran, the eye of the Bull',
+        'nature': 'Malefic',
+        'activities': 'Hinders buildings, wells and mines, causes discord, drives away reptiles'
+    },
+    {
+        'number': 5,
+        'name_arabic': "Al Haq'ah",
+        'name_sanskrit': 'Mrigashira',
+        'name_chinese': 'Zi',
+        'symbolism': 'The White Spot: the head of Orion (Lambda and Phi Orionis)',
+        'nature': 'Beneficial',
+        'activities': 'Safe return from journeys, instruction of students, sound building, health and goodwill'
+    },
+    {
+        'number': 6,
+        'name_arabic': "Al Han'ah",
+        'name_sanskrit': 'Ardra',
+        'name_chinese': 'Shen',
+        'symbolism': 'The Brand: the feet of the Twins (Gamma and Xi Geminorum)',
+        'nature': 'Mixed',
+        'activities': 'Love between two people, hunting, besieging towns, revenge'
+    },
+    {
+        'number': 7,
+        'name_arabic': 'Al Dhira',
+        'name_sanskrit': 'Punarvasu',
+        'name_chinese': 'Jing',
+        'symbolism': 'The Forearm: Castor and Pollux',
+        'nature': 'Beneficial',
+        'activities': 'Gain and friendship, favours lovers, drives away flies'
+    },
+    {
+        'number': 8,
+        'name_arabic': 'Al Nathrah',
+        'name_sanskrit': 'Pushya',
+        'name_chinese': 'Gui',
+        'symbolism': 'The Gap: the Beehive cluster (Praesepe)',
+        'nature': 'Beneficial',
+        'activities': 'Victory, love and companionship, drives away mice'
+    },
+    {
+        'number': 9,
+        'name_arabic': 'Al Tarf',
+        'name_sanskrit': 'Ashlesha',
+        'name_chinese': 'Liu',
+        'symbolism': 'The Glance: the eye of the Lion (Kappa Cancri and Lambda Leonis)',
+        'nature': 'Malefic',
+        'activities': 'Spoils harvests, hinders travellers, sows discord'
+    },
+    {
+        'number': 10,
+        'name_arabic': 'Al Jabhah',
+        'name_sanskrit': 'Magha',
+        'name_chinese': 'Xing',
+        'symbolism': "The Forehead: the Lion's forehead and Regulus",
+        'nature': 'Beneficial',
+        'activities': 'Strengthens buildings, love and goodwill, help against enemies'
+    },
+    {
+        'number': 11,
+        'name_arabic': 'Al Zubrah',
+        'name_sanskrit': 'Purva Phalguni',
+        'name_chinese': 'Zhang',
+        'symbolism': "The Mane: the Lion's mane (Delta and Theta Leonis)",
+        'nature': 'Beneficial',
+        'activities': 'Journeys, profit in trade, redemption of captives'
+    },
+    {
+        'number': 12,
+        'name_arabic': 'Al Sarfah',
+        'name_sanskrit': 'Uttara Phalguni',
+        'name_chinese': 'Yi',
+        'symbolism': "The Changer: Denebola, the Lion's tail",
+        'nature': 'Mixed',
+        'activities': 'Good harvests and plantings, helps servants and captives, hinders sailors'
+    },
+    {
+        'number': 13,
+        'name_arabic': 'Al Awwa',
+        'name_sanskrit': 'Hasta',
+        'name_chinese': 'Zhen',
+        'symbolism': 'The Barker: the wing of Virgo (Beta, Eta, Gamma, Delta and Epsilon Virginis)',
+        'nature': 'Beneficial',
+        'activities': 'Goodwill, gain, journeys, harvests, freeing captives'
+    },
+    {
+        'number': 14,
+        'name_arabic': 'Al Simak',
+        'name_sanskrit': 'Chitra',
+        'name_chinese': 'Jiao',
+        'symbolism': 'The Unarmed: Spica',
+        'nature': 'Mixed',
+        'activities': 'Love between spouses, healing the sick, profitable to sailors, hinders journeys by land'
+    },
+    {
+        'number': 15,
+        'name_arabic': 'Al Ghafr',
+        'name_sanskrit': 'Swati',
+        'name_chinese': 'Kang',
+        'symbolism': 'The Covering: Iota, Kappa and Lambda Virginis',
+        'nature': 'Malefic',
+        'activities': 'Digging for treasure, divorce, discord, ruin of enemies, hinders travellers'
+    },
+    {
+        'number': 16,
+        'name_arabic': 'Al Zubana',
+        'name_sanskrit': 'Vishakha',
+        'name_chinese': 'Di',
+        'symbolism': "The Claws: the Scorpion's claws (Alpha and Beta Librae)",
+        'nature': 'Malefic',
+        'activities': 'Hinders journeys, marriage, harvests and trade, redemption of captives'
+    },
+    {
+        'number': 17,
+        'name_arabic': 'Al Iklil',
+        'name_sanskrit': 'Anuradha',
+        'name_chinese': 'Fang',
+        'symbolism': "The Crown: the Scorpion's brow (Beta, Delta and Pi Scorpii)",
+        'nature': 'Beneficial',
+        'activities': 'Improves bad fortune, makes love lasting, strengthens buildings, helps sailors'
+    },
+    {
+        'number': 18,
+        'name_arabic': 'Al Qalb',
+        'name_sanskrit': 'Jyeshtha',
+        'name_chinese': 'Xin',
+        'symbolism': 'The Heart: Antares, the heart of the Scorpion',
+        'nature': 'Malefic',
+        'activities': 'Discord, sedition and conspiracy, revenge on enemies, frees captives'
+    },
+    {
+        'number': 19,
+        'name_arabic': 'Al Shaulah',
+        'name_sanskrit': 'Mula',
+        'name_chinese': 'Wei (Tail)',
+        'symbolism': "The Sting: the Scorpion's sting (Lambda and Upsilon Scorpii)",
+        'nature': 'Malefic',
+        'activities': 'Besieging cities, expelling people, ruin of sailors and captives'
+    },
+    {
+        'number': 20,
+        'name_arabic': "Al Na'am",
+        'name_sanskrit': 'Purva Ashadha',
+        'name_chinese': 'Ji',
+        'symbolism': 'The Ostriches: stars of Sagittarius',
+        'nature': 'Mixed',
+        'activities': 'Taming wild beasts, strengthening prisons, compelling someone to come to a place'
+    },
+    {
+        'number': 21,
+        'name_arabic': 'Al Baldah',
+        'name_sanskrit': 'Uttara Ashadha',
+        'name_chinese': 'Dou',
+        'symbolism': 'The City: an empty patch of sky above Sagittarius',
+        'nature': 'Mixed',
+        'activities': 'Good for harvests, gain, buildings and travellers, causes divorce'
+    },
+    {
+        'number': 22,
+        'name_arabic': "Sa'd al-Dhabih",
+        'name_sanskrit': 'Abhijit',
+        'name_chinese': 'Niu',
+        'symbolism': 'Luck of the Slaughterer: Alpha and Beta Capricorni',
+        'nature': 'Mixed',
+        'activities': 'Flight of servants and captives, helps cure disease'
+    },
+    {
+        'number': 23,
+        'name_arabic': "Sa'd Bula",
+        'name_sanskrit': 'Shravana',
+        'name_chinese': 'Nu',
+        'symbolism': 'Luck of the Swallower: Mu and Epsilon Aquarii',
+        'nature': 'Mixed',
+        'activities': 'Divorce, freeing captives, health of the sick'
+    },
+    {
+        'number': 24,
+        'name_arabic': "Sa'd al-Su'ud",
+        'name_sanskrit': 'Dhanishta',
+        'name_chinese': 'Xu',
+        'symbolism': 'Luckiest of the Lucky: Beta and Xi Aquarii',
+        'nature': 'Beneficial',
+        'activities': 'Goodwill between spouses, victory of soldiers'
+    },
+    {
+        'number': 25,
+        'name_arabic': "Sa'd al-Akhbiyah",
+        'name_sanskrit': 'Shatabhisha',
+        'name_chinese': 'Wei (Rooftop)',
+        'symbolism': 'Luck of the Tents: Gamma, Zeta, Eta and Pi Aquarii',
+        'nature': 'Malefic',
+        'activities': 'Besieging and revenge, ruin of enemies, divorce, hastens messengers'
+    },
+    {
+        'number': 26,
+        'name_arabic': 'Al Fargh al-Muqaddam',
+        'name_sanskrit': 'Purva Bhadrapada',
+        'name_chinese': 'Shi',
+        'symbolism': 'The First Spout: Alpha and Beta Pegasi',
+        'nature': 'Mixed',
+        'activities': 'Union and love, health of captives, destroys prisons and buildings'
+    },
+    {
+        'number': 27,
+        'name_arabic': "Al Fargh al-Mu'akhkhar",
+        'name_sanskrit': 'Uttara Bhadrapada',
+        'name_chinese': 'Bi (Wall)',
+        'symbolism': 'The Second Spout: Gamma Pegasi and Alpha Andromedae',
+        'nature': 'Mixed',
+        'activities': 'Increases harvests, revenue and gain, heals illness, hinders buildings, danger to sailors'
+    },
+    {
+        'number': 28,
+        'name_arabic': 'Batn al-Hut',
+        'name_sanskrit': 'Revati',
+        'name_chinese': 'Kui',
+        'symbolism': 'The Belly of the Fish: Beta Andromedae',
+        'nature': 'Beneficial',
+        'activities': 'Increases harvests and trade, protects travellers, joy of married couples'
+    }
+]
+
+
 def seed_planets(cursor):
     """Insert all planets into the database"""
     print("\nSeeding Planets...")
 
-    for planet in PLANETS:
-        cursor.execute("""
-            INSERT INTO planets (
-                name, symbol, day_of_week, metal, color, gemstone,
-                sephiroth_number, rules_signs, exalted_in, detriment_in, fall_in,
-                quality, tarot_association, magical_powers, description
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    cursor.executemany("""
+        INSERT INTO planets (
+            name, symbol, day_of_week, metal, color, gemstone,
+            sephiroth_number, rules_signs, exalted_in, detriment_in, fall_in,
+            quality, tarot_association, magical_powers, description
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (
             planet['name'], planet['symbol'], planet['day_of_week'],
             planet['metal'], planet['color'], planet['gemstone'],
             planet['sephiroth_number'], planet['rules_signs'],
             planet['exalted_in'], planet['detriment_in'], planet['fall_in'],
             planet['quality'], planet['tarot_association'],
             planet['magical_powers'], planet['description']
-        ))
+        )
+        for planet in PLANETS
+    ])
 
     print(f"  ✓ Inserted {len(PLANETS)} planets")
 
@@ -377,25 +639,67 @@ def seed_zodiac_signs(cursor):
     """Insert all zodiac signs into the database"""
     print("\nSeeding Zodiac Signs...")
 
-    for sign in ZODIAC_SIGNS:
-        cursor.execute("""
-            INSERT INTO zodiac_signs (
-                name, symbol, element, modality, ruling_planet,
-                exalted_planet, detriment_planet, fall_planet, polarity,
-                house_number, body_part, tarot_association,
-                dates_start, dates_end, keywords, description
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    cursor.executemany("""
+        INSERT INTO zodiac_signs (
+            name, symbol, element, modality, ruling_planet,
+            exalted_planet, detriment_planet, fall_planet, polarity,
+            house_number, body_part, tarot_association,
+            dates_start, dates_end, keywords, description
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (
             sign['name'], sign['symbol'], sign['element'], sign['modality'],
             sign['ruling_planet'], sign['exalted_planet'], sign['detriment_planet'],
             sign['fall_planet'], sign['polarity'], sign['house_number'],
             sign['body_part'], sign['tarot_association'], sign['dates_start'],
             sign['dates_end'], sign['keywords'], sign['description']
-        ))
+        )
+        for sign in ZODIAC_SIGNS
+    ])
 
     print(f"  ✓ Inserted {len(ZODIAC_SIGNS)} zodiac signs")
 
 
+def _zodiac_position(longitude, signs):
+    """Format an ecliptic longitude as degrees and minutes of a sign, e.g. 12°51' Aries"""
+    minutes = round((longitude % 360) * 60)
+    sign, minutes = divmod(minutes, 30 * 60)
+    return f"{minutes // 60}°{minutes % 60:02d}' {signs[sign]}"
+
+
+def seed_lunar_mansions(cursor):
+    """Insert the 28 lunar mansions, deriving each one's span of the zodiac"""
+    print("\nSeeding Lunar Mansions...")
+
+    span = 360.0 / len(LUNAR_MANSIONS)
+    signs = [sign['name'] for sign in ZODIAC_SIGNS]
+
+    rows = []
+    for mansion in LUNAR_MANSIONS:
+        degrees_start = (mansion['number'] - 1) * span
+        degrees_end = mansion['number'] * span
+        zodiac_sign = signs[int(degrees_start // 30)]
+
+        rows.append((
+            mansion['number'], mansion['name_arabic'], mansion['name_sanskrit'],
+            mansion['name_chinese'], round(degrees_start, 6), round(degrees_end, 6),
+            zodiac_sign, None, mansion['symbolism'], mansion['nature'],
+            mansion['activities'],
+            f"Mansion {mansion['number']} of 28, from {_zodiac_position(degrees_start, signs)} "
+            f"to {_zodiac_position(degrees_end, signs)}"
+        ))
+
+    cursor.executemany("""
+        INSERT INTO lunar_mansions (
+            number, name_arabic, name_sanskrit, name_chinese,
+            degrees_start, degrees_end, zodiac_sign, ruling_planet,
+            symbolism, nature, activities, description
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+    print(f"  ✓ Inserted {len(LUNAR_MANSIONS)} lunar mansions")
+
+
 if __name__ == '__main__':
     import sqlite3
 
@@ -406,6 +710,7 @@ if __name__ == '__main__':
     try:
         seed_planets(cursor)
         seed_zodiac_signs(cursor)
+        seed_lunar_mansions(cursor)
         conn.commit()
         print("\n✓ Astrology data seeded successfully!")
     except Exception as e:
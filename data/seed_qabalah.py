@@ -527,53 +527,60 @@ def seed_sephiroth(cursor):
     """Insert all 10 Sephiroth into the database"""
     print("\nSeeding Sephiroth...")
 
-    for seph in SEPHIROTH:
-        cursor.execute("""
-            INSERT INTO sephiroth (
-                number, name, name_hebrew, meaning, divine_name,
-                archangel, angelic_order, planet, mundane_chakra,
-                spiritual_experience, virtue, vice,
-                color_atziluth, color_briah, color_yetzirah, color_assiah,
-                tarot_association, description
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    cursor.executemany("""
+        INSERT INTO sephiroth (
+            number, name, name_hebrew, meaning, divine_name,
+            archangel, angelic_order, planet, mundane_chakra,
+            spiritual_experience, virtue, vice,
+            color_atziluth, color_briah, color_yetzirah, color_assiah,
+            tarot_association, description
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (
             seph['number'], seph['name'], seph['name_hebrew'], seph['meaning'],
             seph['divine_name'], seph['archangel'], seph['angelic_order'],
             seph['planet'], seph['mundane_chakra'], seph['spiritual_experience'],
             seph['virtue'], seph['vice'], seph['color_atziluth'], seph['color_briah'],
             seph['color_yetzirah'], seph['color_assiah'], seph['tarot_association'],
             seph['description']
-        ))
+        )
+        for seph in SEPHIROTH
+    ])
 
     print(f"  ✓ Inserted {len(SEPHIROTH)} Sephiroth")
 
 
-def seed_paths(cursor):
-    """Insert all 22 Paths into the database, linking to tarot cards"""
+def seed_paths(cursor, card_ids=None):
+    """
+    Insert all 22 Paths into the database, linking to tarot cards
+
+    Args:
+        cursor: Database cursor (cards must already be inserted)
+        card_ids: Optional dict mapping card number to card id; read from
+            the cards table when not given
+    """
     print("\nSeeding Paths...")
 
-    for path in PATHS:
-        # Get the tarot card ID from the card number
-        cursor.execute(
-            "SELECT id FROM cards WHERE number = ?",
-            (path['tarot_card_number'],)
-        )
-        card_result = cursor.fetchone()
-        tarot_card_id = card_result[0] if card_result else None
+    if card_ids is None:
+        cursor.execute("SELECT number, id FROM cards")
+        card_ids = dict(cursor.fetchall())
 
-        cursor.execute("""
-            INSERT INTO paths (
-                number, name, hebrew_letter, hebrew_letter_meaning,
-                tarot_card_id, connects_from, connects_to,
-                element, planet, sign, color, description
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    cursor.executemany("""
+        INSERT INTO paths (
+            number, name, hebrew_letter, hebrew_letter_meaning,
+            tarot_card_id, connects_from, connects_to,
+            element, planet, sign, color, description
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (
             path['number'], path['name'], path['hebrew_letter'],
-            path['hebrew_letter_meaning'], tarot_card_id,
+            path['hebrew_letter_meaning'], card_ids.get(path['tarot_card_number']),
             path['connects_from'], path['connects_to'],
             path['element'], path['planet'], path['sign'],
             path['color'], path['description']
-        ))
+        )
+        for path in PATHS
+    ])
 
     print(f"  ✓ Inserted {len(PATHS)} Paths")
 
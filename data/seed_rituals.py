@@ -269,16 +269,16 @@ def seed_rituals(cursor):
     """Insert rituals into the database"""
     print("\nSeeding Rituals...")
 
-    for ritual in RITUALS:
-        cursor.execute("""
-            INSERT INTO rituals (
-                name, abbreviation, tradition, category, purpose,
-                difficulty, duration_minutes, requires_tools,
-                elemental_focus, sephiroth_focus, planetary_focus,
-                timing_notes, instructions, visualization,
-                words_of_power, benefits, warnings, source, description
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    cursor.executemany("""
+        INSERT INTO rituals (
+            name, abbreviation, tradition, category, purpose,
+            difficulty, duration_minutes, requires_tools,
+            elemental_focus, sephiroth_focus, planetary_focus,
+            timing_notes, instructions, visualization,
+            words_of_power, benefits, warnings, source, description
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (
             ritual['name'], ritual['abbreviation'], ritual['tradition'],
             ritual['category'], ritual['purpose'], ritual['difficulty'],
             ritual['duration_minutes'], ritual['requires_tools'],
@@ -287,7 +287,9 @@ def seed_rituals(cursor):
             ritual['instructions'], ritual['visualization'],
             ritual['words_of_power'], ritual['benefits'],
             ritual['warnings'], ritual['source'], ritual['description']
-        ))
+        )
+        for ritual in RITUALS
+    ])
 
     print(f"  ✓ Inserted {len(RITUALS)} rituals")
 
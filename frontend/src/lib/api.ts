@@ -4,7 +4,12 @@ import type {
 	CardsResponse,
 	CardQueryOptions,
 	CardDetailWithCorrespondences,
-	TreeOfLife
+	TreeOfLife,
+	BatchRef,
+	BatchResponse,
+	SpreadId,
+	SpreadReading,
+	SpreadDrawOptions
 } from './types';
 
 const API_BASE = 'http://localhost:5000';
@@ -67,6 +72,59 @@ export async function getCard(id: number): Promise<Card> {
 	}
 }
 
+/**
+ * Fetch several cards by number in a single request
+ * @param ids Card numbers (0-77); duplicates are allowed
+ * @returns Cards in the same order as ids (missing numbers are skipped)
+ */
+export async function getCardsByNumbers(ids: number[]): Promise<Card[]> {
+	if (ids.length === 0) return [];
+
+	const url = `${API_BASE}/cards?numbers=${[...new Set(ids)].join(',')}`;
+
+	try {
+		const response = await fetch(url);
+
+		if (!response.ok) {
+			throw new Error(`HTTP error! status: ${response.status}`);
+		}
+
+		const data: CardsResponse = await response.json();
+		const byNumber = new Map(data.cards.map((card) => [card.number, card]));
+		return ids.flatMap((id) => byNumber.get(id) ?? []);
+	} catch (error) {
+		console.error(`Error fetching cards ${ids.join(',')}:`, error);
+		throw error;
+	}
+}
+
+/**
+ * Resolve a mixed list of cards, paths, sephiroth and rituals in one request
+ * @param refs References such as 'card:17', 'path:11', 'sephirah:1', 'ritual:3'
+ * @param systems Include system descriptions for cards
+ * @returns Results keyed by reference, plus references that were not found
+ */
+export async function getBatch(refs: BatchRef[], systems = true): Promise<BatchResponse> {
+	const url = `${API_BASE}/batch`;
+
+	try {
+		const response = await fetch(url, {
+			method: 'POST',
+			headers: { 'Content-Type': 'application/json' },
+			body: JSON.stringify({ refs, systems })
+		});
+
+		if (!response.ok) {
+			throw new Error(`HTTP error! status: ${response.status}`);
+		}
+
+		return await response.json();
+	} catch (error) {
+		console.error('Error fetching batch:', error);
+		throw error;
+	}
+}
+
 /**
  * Fetch a single card with full correspondences (Qabalah, Astrology)
  * @param id Card number (0-77)
@@ -89,6 +147,38 @@ export async function getCardWithCorrespondences(id: number): Promise<CardDetail
 	}
 }
 
+/**
+ * Draw a tarot reading on the server
+ * @param spread Spread layout id
+ * @param options seed (reproducible draws), reversals (0-1 probability), systems
+ * @returns Reading with one card per position and the seed used
+ */
+export async function drawSpread(
+	spread: SpreadId,
+	options: SpreadDrawOptions = {}
+): Promise<SpreadReading> {
+	const params = new URLSearchParams();
+
+	if (options.seed !== undefined) params.append('seed', String(options.seed));
+	if (options.reversals !== undefined) params.append('reversals', String(options.reversals));
+	if (options.systems !== undefined) params.append('systems', String(options.systems));
+
+	const url = `${API_BASE}/spreads/${spread}/draw${params.toString() ? '?' + params.toString() : ''}`;
+
+	try {
+		const response = await fetch(url);
+
+		if (!response.ok) {
+			throw new Error(`HTTP error! status: ${response.status}`);
+		}
+
+		return await response.json();
+	} catch (error) {
+		console.error(`Error drawing ${spread} spread:`, error);
+		throw error;
+	}
+}
+
 /**
  * Get cards filtered by arcana type
  * @param arcana 'Major Arcana' or 'Minor Arcana'
@@ -45,6 +45,44 @@ export interface CardsResponse {
 
 export interface CardDetailResponse extends CardWithCorrespondences {}
 
+// Spread layouts and draws
+export type SpreadId = 'single' | 'three-card' | 'celtic-cross' | 'tree-of-life';
+
+export interface SpreadPosition {
+	position: number;
+	name: string;
+	meaning: string;
+	sephirah?: number;
+}
+
+export interface DrawnCard extends SpreadPosition {
+	card: Card;
+	reversed: boolean;
+}
+
+export interface SpreadReading {
+	spread: SpreadId;
+	name: string;
+	seed: number;
+	reversal_probability: number;
+	cards: DrawnCard[];
+}
+
+export interface SpreadDrawOptions {
+	seed?: number;
+	reversals?: number;
+	systems?: boolean;
+}
+
+// Batch multi-get: references look like "card:17", "path:11", "sephirah:1", "ritual:3"
+export type BatchRef = `${'card' | 'path' | 'sephirah' | 'ritual'}:${number}`;
+
+export interface BatchResponse {
+	count: number;
+	results: Record<string, unknown>;
+	not_found: string[];
+}
+
 // Filter/Query Options
 export interface CardQueryOptions {
 	systems?: boolean;
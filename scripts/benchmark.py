@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Project Emerald - Endpoint Benchmark
+Drives every route registered on the API and reports throughput and
+p50/p95/p99 latency, optionally comparing against a stored baseline
+
+Two modes:
+    client  Requests go through Flask's test client in this process, one at
+            a time: measures the cost of the view code itself.
+    http    Requests go over real sockets from a pool of threads, reusing
+            connections where the server keeps them alive, to a threaded
+            server started here (or to --url): measures behaviour under
+            concurrency.
+
+Usage:
+    python scripts/benchmark.py                              # client mode
+    python scripts/benchmark.py --mode http --concurrency 16
+    python scripts/benchmark.py --mode http --url http://127.0.0.1:8000
+    python scripts/benchmark.py --compare                    # exit 1 on regressions
+    python scripts/benchmark.py --save-baseline              # record a new baseline
+    python scripts/benchmark.py --compare --ignore-environment
+    python scripts/benchmark.py -k qabalah -k /cards         # only matching routes
+
+A comparison is only meaningful against a baseline recorded in the same
+environment (Python, platform, CPUs, optional accelerator packages, mode
+settings); --compare refuses to run across a mismatch unless given
+--ignore-environment. Re-record the baseline with --save-baseline whenever
+a change alters how responses are built, encoded or served.
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import http.client
+from importlib import metadata
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Add backend directory to path to benchmark the real application
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'baseline.json')
+
+# A route regresses when its p50 or p95 grows by more than the tolerance and
+# by at least this many milliseconds (smaller changes are scheduler noise)
+DEFAULT_TOLERANCE = 0.5
+MIN_REGRESSION_MS = 1.0
+COMPARED_PERCENTILES = ('p50_ms', 'p95_ms')
+
+# Run metadata that must match the baseline's for a comparison to mean anything
+ENVIRONMENT_KEYS = ('concurrency', 'snapshot_mode', 'python', 'platform', 'cpu_count', 'packages')
+
+# Optional packages that change how responses are encoded and compressed
+OPTIONAL_PACKAGES = ('numpy', 'orjson', 'msgpack', 'Brotli')
+
+# Concrete requests for routes that take URL arguments, need query
+# parameters or a body: (method, rule) -> (url, JSON body or None)
+SAMPLE_REQUESTS = {
+    ('GET', '/cards/<int:number>'): ('/cards/17', None),
+    ('GET', '/cards/<int:number>/correspondences'): ('/cards/17/correspondences', None),
+    ('GET', '/cards/<int:number>/system/<system_name>'): ('/cards/17/system/Thoth', None),
+    ('GET', '/cards/name/<card_name>'): ('/cards/name/The Star', None),
+    ('GET', '/cards/search'): ('/cards/search?q=love', None),
+    ('GET', '/spreads/<spread_id>'): ('/spreads/celtic-cross', None),
+    ('GET', '/spreads/<spread_id>/draw'): ('/spreads/celtic-cross/draw?seed=42&reversals=0.5', None),
+    ('GET', '/spreads/<spread_id>/stats'): ('/spreads/three-card/stats?iterations=10000&seed=42', None),
+    ('POST', '/batch'): ('/batch', {'refs': ['card:17', 'path:11', 'sephirah:1', 'ritual:1']}),
+    ('GET', '/api/qabalah/sephiroth/<int:number>'): ('/api/qabalah/sephiroth/6', None),
+    ('GET', '/api/qabalah/sephiroth/name/<name>'): ('/api/qabalah/sephiroth/name/Tiphareth', None),
+    ('GET', '/api/qabalah/paths/<int:number>'): ('/api/qabalah/paths/11', None),
+    ('GET', '/api/qabalah/paths/<int:number>/card'): ('/api/qabalah/paths/11/card', None),
+    ('GET', '/api/qabalah/graph/shortest'): ('/api/qabalah/graph/shortest?from=Malkuth&to=Kether', None),
+    ('GET', '/api/qabalah/graph/routes'): ('/api/qabalah/graph/routes?from=10&to=6&max_length=4', None),
+    ('GET', '/api/qabalah/traversals/<traversal_id>'): ('/api/qabalah/traversals/serpent', None),
+    ('GET', '/api/qabalah/gematria'): ('/api/qabalah/gematria?q=Kether', None),
+    ('POST', '/api/qabalah/gematria'): ('/api/qabalah/gematria', {'words': ['Kether', 'Chokmah', 'Binah', 'Abrahadabra']}),
+    ('GET', '/api/qabalah/gematria/value/<int:value>'): ('/api/qabalah/gematria/value/418', None),
+    ('GET', '/api/astrology/planets/<name>'): ('/api/astrology/planets/Venus', None),
+    ('GET', '/api/astrology/signs/<name>'): ('/api/astrology/signs/Leo', None),
+    ('GET', '/api/astrology/planetary-hours'): ('/api/astrology/planetary-hours?lat=51.5&lon=-0.13&date=2024-06-21', None),
+    ('GET', '/api/astrology/lunar-mansions/<int:number>'): ('/api/astrology/lunar-mansions/14', None),
+    ('GET', '/api/astrology/lunar-mansions/current'): ('/api/astrology/lunar-mansions/current?time=2024-03-20T12:00:00Z', None),
+    ('GET', '/api/astrology/lunar-mansions/ingresses'): ('/api/astrology/lunar-mansions/ingresses?start=2024-01-01&days=30', None),
+    ('GET', '/api/rituals/<int:ritual_id>'): ('/api/rituals/1', None),
+    ('GET', '/api/rituals/by-element/<element>'): ('/api/rituals/by-element/Fire', None),
+    ('GET', '/api/rituals/by-planet/<planet>'): ('/api/rituals/by-planet/Venus', None),
+    ('GET', '/api/rituals/name/<name>'): ('/api/rituals/name/LBRP', None),
+    ('GET', '/api/rituals/search'): ('/api/rituals/search?q=pentagram', None)
+}
+
+# Routes never benchmarked (static files and the metrics scrape itself)
+EXCLUDED_RULES = {'/static/<path:filename>', '/metrics'}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark every API route')
+    parser.add_argument('--mode', choices=('client', 'http'), default='client',
+                        help='In-process test client or threaded HTTP load (default: client)')
+    parser.add_argument('--url',
+                        help='Benchmark an already running server (http mode) instead of starting one')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Measured requests per route (default: 200)')
+    parser.add_argument('--warmup', type=int, default=20,
+                        help='Unmeasured requests per route before measuring (default: 20)')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Client threads in http mode (default: 8)')
+    parser.add_argument('-k', '--filter', action='append', default=[],
+                        help='Only routes containing this text (repeatable)')
+    parser.add_argument('-o', '--output',
+                        help='Write the results as JSON')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='Baseline file (default: benchmarks/baseline.json)')
+    parser.add_argument('--compare', action='store_true',
+                        help='Compare with the baseline and exit 1 if any route regressed')
+    parser.add_argument('--ignore-environment', action='store_true',
+                        help='Compare even if the baseline was recorded in a different environment')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Allowed p50/p95 slowdown as a fraction (default: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store these results as the baseline for this mode')
+    return parser.parse_args()
+
+
+def benchmark_targets(app, filters):
+    """(name, method, url, body) for every benchmarkable route, sorted by rule"""
+    targets = []
+    skipped = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if rule.rule in EXCLUDED_RULES:
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            name = f'{method} {rule.rule}'
+            if filters and not any(f in name for f in filters):
+                continue
+            sample = SAMPLE_REQUESTS.get((method, rule.rule))
+            if sample is None and (rule.arguments or method != 'GET'):
+                skipped.append(name)
+                continue
+            url, body = sample or (rule.rule, None)
+            targets.append((name, method, url, body))
+    return targets, skipped
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    """Route result: request count, errors, throughput and latency percentiles (ms)"""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3)
+    }
+
+
+def run_client(app, targets, count, warmup):
+    """Sequential requests through the Flask test client"""
+    client = app.test_client()
+    results = {}
+    for name, method, url, body in targets:
+        def call():
+            response = client.open(url, method=method, json=body)
+            response.get_data()
+            return response.status_code
+
+        for _ in range(warmup):
+            call()
+
+        latencies = []
+        errors = 0
+        started = time.perf_counter()
+        for _ in range(count):
+            start = time.perf_counter()
+            status = call()
+            latencies.append(time.perf_counter() - start)
+            errors += status >= 400
+        results[name] = summarize(latencies, errors, time.perf_counter() - started)
+    return results
+
+
+class KeepAliveClient:
+    """One HTTP/1.1 connection per thread, kept open unless the server closes it"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self._local = threading.local()
+
+    def request(self, method, url, body):
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload is not None else {}
+        for attempt in range(2):
+            conn = getattr(self._local, 'conn', None)
+            if conn is None:
+                conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                conn.request(method, self.prefix + url.replace(' ', '%20'), body=payload, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+                    self._local.conn = None
+                return response.status
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle connection; reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+
+def run_http(base_url, targets, count, warmup, concurrency):
+    """Concurrent keep-alive requests from a thread pool"""
+    client = KeepAliveClient(base_url)
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for name, method, url, body in targets:
+            def call(_):
+                start = time.perf_counter()
+                status = client.request(method, url, body)
+                return time.perf_counter() - start, status
+
+            list(pool.map(call, range(warmup)))
+
+            started = time.perf_counter()
+            outcomes = list(pool.map(call, range(count)))
+            elapsed = time.perf_counter() - started
+            results[name] = summarize(
+                [latency for latency, _ in outcomes],
+                sum(status >= 400 for _, status in outcomes),
+                elapsed
+            )
+    return results
+
+
+def start_server(app):
+    """
+    Serve app from Werkzeug's threaded server on a free local port
+
+    The development server closes the connection after every response, so
+    these numbers include a TCP connect per request; use --url to measure a
+    production server with keep-alive.
+    """
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def package_versions():
+    """Installed version of each optional package (None when missing)"""
+    versions = {}
+    for name in OPTIONAL_PACKAGES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def git_commit():
+    """Short hash of the checked-out commit, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_mismatches(meta, baseline_meta):
+    """Environment metadata that differs from the baseline's: (key, baseline, current)"""
+    return [
+        (key, baseline_meta.get(key), meta.get(key))
+        for key in ENVIRONMENT_KEYS
+        if baseline_meta.get(key) != meta.get(key)
+    ]
+
+
+def compare(results, baseline, tolerance):
+    """Regressions against the baseline: (name, percentile, baseline ms, current ms)"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for key in COMPARED_PERCENTILES:
+            limit = max(previous[key] * (1 + tolerance), previous[key] + MIN_REGRESSION_MS)
+            if result[key] > limit:
+                regressions.append((name, key[:3], previous[key], result[key]))
+    return regressions
+
+
+def print_table(results, baseline):
+    width = max(len(name) for name in results)
+    print(f"{'route':<{width}}  {'req/s':>9}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'vs base':>8}  errors")
+    for name, r in results.items():
+        previous = baseline.get(name)
+        change = f"{(r['p95_ms'] / previous['p95_ms'] - 1) * 100:+.0f}%" if previous and previous['p95_ms'] else '-'
+        print(f"{name:<{width}}  {r['throughput_rps']:>9}  {r['p50_ms']:>8}  {r['p95_ms']:>8}  "
+              f"{r['p99_ms']:>8}  {change:>8}  {r['errors']}")
+
+
+def main():
+    """Main benchmark function"""
+    args = parse_args()
+
+    from app import create_app
+    app = create_app()
+
+    targets, skipped = benchmark_targets(app, args.filter)
+    if not targets:
+        print('ERROR: no routes match the filters', file=sys.stderr)
+        return 1
+    for name in skipped:
+        print(f'WARNING: no sample request for {name}; add one to SAMPLE_REQUESTS', file=sys.stderr)
+
+    if args.mode == 'client':
+        results = run_client(app, targets, args.requests, args.warmup)
+    else:
+        server = None
+        base_url = args.url
+        if base_url is None:
+            server = start_server(app)
+            base_url = f'http://127.0.0.1:{server.server_port}'
+        try:
+            results = run_http(base_url, targets, args.requests, args.warmup, args.concurrency)
+        finally:
+            if server is not None:
+                server.shutdown()
+
+    run = {
+        'meta': {
+            'mode': args.mode,
+            'requests': args.requests,
+            'concurrency': args.concurrency if args.mode == 'http' else 1,
+            'snapshot_mode': app.config.get('SNAPSHOT_MODE', False),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'packages': package_versions(),
+            'commit': git_commit(),
+            'date': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        },
+        'routes': results
+    }
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baselines = json.load(f)
+    baseline = baselines.get(args.mode, {}).get('routes', {})
+    baseline_meta = baselines.get(args.mode, {}).get('meta', {})
+
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+            f.write('\n')
+
+    if args.save_baseline:
+        baselines[args.mode] = run
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.mode} baseline to {args.baseline}')
+
+    errors = [name for name, r in results.items() if r['errors']]
+    for name in errors:
+        print(f'ERROR: {name} returned error responses', file=sys.stderr)
+
+    if args.compare:
+        if not baseline:
+            print(f'ERROR: no {args.mode} baseline in {args.baseline}', file=sys.stderr)
+            return 1
+        mismatches = environment_mismatches(run['meta'], baseline_meta)
+        if mismatches and not args.ignore_environment:
+            for key, before, after in mismatches:
+                print(f'ERROR: baseline {key} was {before!r}, this run has {after!r}', file=sys.stderr)
+            print('Re-record the baseline here with --save-baseline, or pass --ignore-environment',
+                  file=sys.stderr)
+            return 1
+        regressions = compare(results, baseline, args.tolerance)
+        for name, key, before, after in regressions:
+            print(f'REGRESSION: {name} {key} {before} ms -> {after} ms', file=sys.stderr)
+        if regressions:
+            return 1
+        print(f'\nNo regressions beyond {args.tolerance:.0%} against the {args.mode} baseline')
+
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
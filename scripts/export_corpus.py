@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Project Emerald - Corpus Export Script
+Writes every entity in esoteric_knowledge.db as newline-delimited JSON,
+the same stream served by GET /export
+
+Usage:
+    python scripts/export_corpus.py                       # NDJSON to stdout
+    python scripts/export_corpus.py -o corpus.ndjson.gz   # gzip (from the .gz suffix)
+    python scripts/export_corpus.py --types cards,rituals --gzip -o cards.gz
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add backend directory to path to share the export format with the API
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from export import EXPORT_TYPES, parse_export_types, iter_records, iter_ndjson, iter_gzip
+
+
+DEFAULT_DATABASE = os.path.join(os.path.dirname(__file__), '..', 'esoteric_knowledge.db')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Export the corpus as newline-delimited JSON')
+    parser.add_argument('--db', default=DEFAULT_DATABASE,
+                        help='Path to the SQLite database (default: esoteric_knowledge.db)')
+    parser.add_argument('-o', '--output',
+                        help='Output file (default: stdout)')
+    parser.add_argument('--types', default='',
+                        help=f'Comma-separated entity types (default: all of {",".join(EXPORT_TYPES)})')
+    parser.add_argument('--gzip', action='store_true',
+                        help='Gzip the output (implied when --output ends in .gz)')
+    return parser.parse_args()
+
+
+def main():
+    """Main export function"""
+    args = parse_args()
+
+    try:
+        types = parse_export_types(args.types)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    if not os.path.exists(args.db):
+        print(f"ERROR: Database file '{args.db}' not found!", file=sys.stderr)
+        print("Please run 'python scripts/migrate_to_sqlite.py' first to create the database.",
+              file=sys.stderr)
+        return 1
+
+    conn = sqlite3.connect(Path(args.db).resolve().as_uri() + '?mode=ro', uri=True)
+    try:
+        chunks = iter_ndjson(iter_records(conn, types))
+        if args.gzip or (args.output or '').endswith('.gz'):
+            chunks = iter_gzip(chunks)
+
+        out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if args.output:
+                out.close()
+    finally:
+        conn.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,11 +9,17 @@ Qabalah, astrology, and ritual data from multiple traditional systems
 import json
 import sqlite3
 import os
+import re
+import shutil
 import sys
+import tempfile
+from contextlib import contextmanager, suppress
 from datetime import datetime
 
 # Add parent directory to path to import from data module
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Add backend directory to path to share the search index layout with the API
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from data.card_correspondences import (
     MAJOR_ARCANA_CORRESPONDENCES,
@@ -28,8 +34,51 @@ from data.system_descriptions import (
     MARSEILLE_DESCRIPTIONS
 )
 from data.seed_qabalah import seed_sephiroth, seed_paths
-from data.seed_astrology import seed_planets, seed_zodiac_signs
+from data.seed_astrology import seed_planets, seed_zodiac_signs, seed_lunar_mansions
 from data.seed_rituals import seed_rituals
+from search import (
+    CARD_INDEX_COLUMNS,
+    RITUAL_INDEX_COLUMNS,
+    card_index_rows,
+    ritual_index_rows
+)
+
+
+# Column order for the cards insert; columns a card doesn't set are NULL
+CARD_COLUMNS = (
+    'number', 'name', 'arcana', 'suit', 'element', 'astrology', 'astrological_decan',
+    'hebrew_letter', 'tree_of_life_path', 'sephiroth', 'musical_note',
+    'color_primary', 'color_secondary', 'gemstone', 'herb',
+    'upright_meaning', 'reversed_meaning', 'description', 'key_symbols'
+)
+
+SYSTEM_DESCRIPTIONS = {
+    'RWS': RWS_DESCRIPTIONS,
+    'Thoth': THOTH_DESCRIPTIONS,
+    'Golden Dawn': GOLDEN_DAWN_DESCRIPTIONS,
+    'Marseille': MARSEILLE_DESCRIPTIONS
+}
+
+# The database is built from scratch into a private temporary file that is
+# only published once complete, so no rollback journal or fsyncs are needed
+# while building
+BUILD_PRAGMAS = {
+    'journal_mode': 'OFF',
+    'synchronous': 'OFF',
+    'locking_mode': 'EXCLUSIVE',
+    'temp_store': 'MEMORY',
+    'cache_size': -64000
+}
+
+INDEX_STATEMENT = re.compile(r'^\s*(?:--[^\n]*\n\s*)*CREATE\s+(?:UNIQUE\s+)?INDEX\b', re.IGNORECASE)
+
+
+def split_schema(schema_sql):
+    """Split schema.sql into (table and view statements, index statements)"""
+    statements = [statement for statement in schema_sql.split(';') if statement.strip()]
+    tables = [statement for statement in statements if not INDEX_STATEMENT.match(statement)]
+    indexes = [statement for statement in statements if INDEX_STATEMENT.match(statement)]
+    return tables, indexes
 
 
 class TarotDatabaseMigration:
@@ -40,12 +89,32 @@ class TarotDatabaseMigration:
         self.db_file = db_file or os.path.join(project_root, 'esoteric_knowledge.db')
         self.conn = None
         self.cursor = None
+        self.index_statements = []
+        self.build_file = None
+        self.published = False
 
     def connect(self):
-        """Create database connection"""
-        self.conn = sqlite3.connect(self.db_file)
+        """Create a connection to the build file with build-time pragmas"""
+        # Autocommit mode: each build phase opens its own transaction
+        self.conn = sqlite3.connect(self.build_file or self.db_file, isolation_level=None)
         self.cursor = self.conn.cursor()
-        print(f"✓ Connected to database: {self.db_file}")
+        for name, value in BUILD_PRAGMAS.items():
+            self.cursor.execute(f"PRAGMA {name} = {value}")
+        print(f"✓ Connected to database: {self.build_file or self.db_file}")
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run one build phase in a single transaction
+
+        This batches the phase's writes; it is not a safety net. With
+        journal_mode OFF a failed phase can't be rolled back, so on an
+        exception nothing is committed and migrate() discards the whole
+        build file instead.
+        """
+        self.cursor.execute("BEGIN")
+        yield self.cursor
+        self.cursor.execute("COMMIT")
 
     def load_json_data(self):
         """Load existing JSON data"""
@@ -55,19 +124,26 @@ class TarotDatabaseMigration:
         return data['cards']
 
     def create_schema(self):
-        """Create database schema from schema.sql"""
+        """Create tables and views from schema.sql; indexes are created after loading"""
         schema_path = os.path.join(os.path.dirname(__file__), '..', 'backend', 'schema.sql')
         with open(schema_path, 'r') as f:
             schema_sql = f.read()
 
-        # Execute schema (split by semicolons for multiple statements)
-        for statement in schema_sql.split(';'):
-            if statement.strip():
-                self.cursor.execute(statement)
+        tables, self.index_statements = split_schema(schema_sql)
+        with self.transaction() as cursor:
+            for statement in tables:
+                cursor.execute(statement)
 
-        self.conn.commit()
         print("✓ Database schema created")
 
+    def create_indexes(self):
+        """Create the schema's indexes in one pass over the loaded tables"""
+        with self.transaction() as cursor:
+            for statement in self.index_statements:
+                cursor.execute(statement)
+
+        print(f"✓ Created {len(self.index_statements)} indexes")
+
     def get_minor_arcana_correspondences(self, card_name, suit):
         """Get correspondences for minor arcana cards"""
         correspondences = {}
@@ -102,13 +178,13 @@ class TarotDatabaseMigration:
 
         return correspondences
 
-    def insert_card(self, card_data):
-        """Insert a card into the database with all correspondences"""
+    def card_record(self, card_data):
+        """A card's column values with all correspondences"""
         card_name = card_data['name']
         is_major = card_data['arcana'] == 'Major Arcana'
 
         # Start with base data from JSON
-        insert_data = {
+        record = {
             'number': card_data['number'],
             'name': card_name,
             'arcana': card_data['arcana'],
@@ -123,7 +199,7 @@ class TarotDatabaseMigration:
         # Add correspondences based on card type
         if is_major and card_name in MAJOR_ARCANA_CORRESPONDENCES:
             corr = MAJOR_ARCANA_CORRESPONDENCES[card_name]
-            insert_data.update({
+            record.update({
                 'hebrew_letter': corr.get('hebrew_letter'),
                 'tree_of_life_path': corr.get('tree_of_life_path'),
                 'sephiroth': corr.get('sephiroth'),
@@ -135,74 +211,207 @@ class TarotDatabaseMigration:
                 'key_symbols': corr.get('key_symbols')
             })
         else:
-            # Minor arcana
-            minor_corr = self.get_minor_arcana_correspondences(
+            # Minor arcana (includes astrological_decan for pip cards)
+            record.update(self.get_minor_arcana_correspondences(
                 card_name,
                 card_data.get('suit')
+            ))
+
+        return record
+
+    def insert_cards(self, cards):
+        """
+        Insert all cards, their keywords and system descriptions
+
+        Returns:
+            Dict mapping card number to card id
+        """
+        placeholders = ', '.join('?' for _ in CARD_COLUMNS)
+        self.cursor.executemany(
+            f"INSERT INTO cards ({', '.join(CARD_COLUMNS)}) VALUES ({placeholders})",
+            [
+                tuple(record.get(column) for column in CARD_COLUMNS)
+                for record in map(self.card_record, cards)
+            ]
+        )
+
+        self.cursor.execute("SELECT number, id FROM cards")
+        card_ids = dict(self.cursor.fetchall())
+
+        self.cursor.executemany(
+            "INSERT INTO keywords (card_id, keyword) VALUES (?, ?)",
+            [
+                (card_ids[card_data['number']], keyword)
+                for card_data in cards
+                for keyword in card_data.get('keywords', [])
+            ]
+        )
+
+        self.cursor.executemany("""
+            INSERT INTO system_descriptions
+            (card_id, system_name, description, upright_meaning, reversed_meaning,
+             key_imagery, divinatory_meaning, esoteric_meaning)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                card_ids[card_data['number']],
+                system_name,
+                desc_data.get('description'),
+                desc_data.get('upright_meaning'),
+                desc_data.get('reversed_meaning'),
+                desc_data.get('key_imagery'),
+                desc_data.get('divinatory_meaning'),
+                desc_data.get('esoteric_meaning')
             )
-            insert_data.update(minor_corr)
-
-            # Set astrological_decan if available
-            if 'astrological_decan' in minor_corr:
-                insert_data['astrological_decan'] = minor_corr['astrological_decan']
-
-        # Insert card
-        columns = ', '.join(insert_data.keys())
-        placeholders = ', '.join(['?' for _ in insert_data])
-        sql = f"INSERT INTO cards ({columns}) VALUES ({placeholders})"
-
-        self.cursor.execute(sql, list(insert_data.values()))
-        card_id = self.cursor.lastrowid
-
-        # Insert keywords
-        for keyword in card_data.get('keywords', []):
-            self.cursor.execute(
-                "INSERT INTO keywords (card_id, keyword) VALUES (?, ?)",
-                (card_id, keyword)
-            )
-
-        return card_id
-
-    def insert_system_descriptions(self, card_id, card_name):
-        """Insert system-specific descriptions for a card"""
-        systems = {
-            'RWS': RWS_DESCRIPTIONS,
-            'Thoth': THOTH_DESCRIPTIONS,
-            'Golden Dawn': GOLDEN_DAWN_DESCRIPTIONS,
-            'Marseille': MARSEILLE_DESCRIPTIONS
-        }
-
-        for system_name, descriptions in systems.items():
-            if card_name in descriptions:
-                desc_data = descriptions[card_name]
-
-                self.cursor.execute("""
-                    INSERT INTO system_descriptions
-                    (card_id, system_name, description, upright_meaning, reversed_meaning,
-                     key_imagery, divinatory_meaning, esoteric_meaning)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    card_id,
-                    system_name,
-                    desc_data.get('description'),
-                    desc_data.get('upright_meaning'),
-                    desc_data.get('reversed_meaning'),
-                    desc_data.get('key_imagery'),
-                    desc_data.get('divinatory_meaning'),
-                    desc_data.get('esoteric_meaning')
-                ))
+            for card_data in cards
+            for system_name, descriptions in SYSTEM_DESCRIPTIONS.items()
+            for desc_data in [descriptions.get(card_data['name'])]
+            if desc_data is not None
+        ])
+
+        return card_ids
+
+    def build_card_correspondences(self):
+        """Resolve every card's cross-references into the card_correspondences table"""
+        def rows(query):
+            self.cursor.execute(query)
+            columns = [d[0] for d in self.cursor.description]
+            return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+
+        cards = rows("SELECT id, number, name, arcana, astrology, element FROM cards ORDER BY id")
+        paths = rows("SELECT id, tarot_card_id, connects_from, connects_to FROM paths ORDER BY id")
+        sephiroth = rows("SELECT id, number, name FROM sephiroth ORDER BY id")
+        planets = rows("SELECT id, name FROM planets ORDER BY id")
+        signs = rows("SELECT id, name, element, ruling_planet, tarot_association FROM zodiac_signs ORDER BY id")
+        rituals = rows("""
+            SELECT id, elemental_focus, planetary_focus, sephiroth_focus FROM rituals ORDER BY id
+        """)
+
+        path_by_card = {p['tarot_card_id']: p for p in paths if p['tarot_card_id']}
+        sephirah_by_number = {s['number']: s for s in sephiroth}
+        planet_by_name = {p['name'].lower(): p for p in planets}
+        sign_by_name = {s['name'].lower(): s for s in signs}
+
+        ritual_focuses = [
+            (ritual, ' '.join(
+                (ritual[key] or '').lower()
+                for key in ('planetary_focus', 'sephiroth_focus')
+            ))
+            for ritual in rituals
+        ]
+
+        edges = []
+
+        # Signs name their card as e.g. "The Emperor (IV)"; the first card
+        # (by id) whose name contains that title is the association
+        for sign in signs:
+            match = re.search(r'The ([A-Za-z\s]+)\s*\(([IVX]+)\)', sign['tarot_association'] or '')
+            if match:
+                title = match.group(1).strip().lower()
+                card = next((c for c in cards if title in c['name'].lower()), None)
+                if card:
+                    edges.append((card['id'], 'sign_tarot_association', 'zodiac_signs', sign['id']))
+
+        for card in cards:
+            card_id = card['id']
+            astrology = (card['astrology'] or '').lower()
+            element = (card['element'] or '').lower()
+            focus_names = set()
+
+            path = path_by_card.get(card_id) if card['arcana'] == 'Major Arcana' else None
+            if path:
+                edges.append((card_id, 'path', 'paths', path['id']))
+                for relation, number in (('sephirah_from', path['connects_from']),
+                                         ('sephirah_to', path['connects_to'])):
+                    sephirah = sephirah_by_number.get(number)
+                    if sephirah:
+                        edges.append((card_id, relation, 'sephiroth', sephirah['id']))
+                        focus_names.add(sephirah['name'].lower())
+
+            planet = planet_by_name.get(astrology)
+            if planet:
+                edges.append((card_id, 'planet', 'planets', planet['id']))
+                focus_names.add(planet['name'].lower())
+
+            sign = sign_by_name.get(astrology)
+            if sign:
+                edges.append((card_id, 'zodiac_sign', 'zodiac_signs', sign['id']))
+                ruling_planet = planet_by_name.get((sign['ruling_planet'] or '').lower())
+                if ruling_planet and ruling_planet['name'] == sign['ruling_planet']:
+                    edges.append((card_id, 'ruling_planet', 'planets', ruling_planet['id']))
+
+            if element:
+                for elemental_sign in signs:
+                    if elemental_sign['element'].lower() == element:
+                        edges.append((card_id, 'elemental_sign', 'zodiac_signs', elemental_sign['id']))
+
+            for ritual, ritual_focus in ritual_focuses:
+                if (element and (ritual['elemental_focus'] or '').lower() == element) or any(
+                        re.search(rf'\b{re.escape(name)}\b', ritual_focus) for name in focus_names):
+                    edges.append((card_id, 'ritual', 'rituals', ritual['id']))
+
+        with self.transaction() as cursor:
+            cursor.execute("DELETE FROM card_correspondences")
+            cursor.executemany("""
+                INSERT INTO card_correspondences (card_id, relation, target_table, target_id)
+                VALUES (?, ?, ?, ?)
+            """, edges)
+        print(f"✓ Resolved {len(edges)} card correspondences")
+
+    def build_search_index(self):
+        """Populate the FTS5 full-text indexes for cards and rituals"""
+        with self.transaction() as cursor:
+            for table, columns, rows in (
+                ('cards_fts', CARD_INDEX_COLUMNS, card_index_rows(self.conn)),
+                ('rituals_fts', RITUAL_INDEX_COLUMNS, ritual_index_rows(self.conn))
+            ):
+                placeholders = ', '.join('?' for _ in range(len(columns) + 1))
+                cursor.execute(f"DELETE FROM {table}")
+                cursor.executemany(
+                    f"INSERT INTO {table} (rowid, {', '.join(columns)}) VALUES ({placeholders})",
+                    list(rows)
+                )
+                cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+
+        print("✓ Full-text search indexes built")
 
     def migrate(self):
-        """Run the full migration"""
+        """Run the full migration, publishing the new database only once it is complete"""
         print("\n" + "="*60)
         print("Tarot Database Migration: JSON → SQLite")
         print("="*60 + "\n")
 
-        # Remove existing database if it exists
-        if os.path.exists(self.db_file):
-            os.remove(self.db_file)
-            print(f"✓ Removed existing database: {self.db_file}")
+        # Build next to the live database (same filesystem, so the final
+        # rename is atomic); the live file keeps serving until then
+        db_dir = os.path.dirname(os.path.abspath(self.db_file))
+        fd, self.build_file = tempfile.mkstemp(
+            dir=db_dir, prefix=f".{os.path.basename(self.db_file)}.", suffix='.build'
+        )
+        os.close(fd)
+
+        try:
+            self.build()
+            self.verify_and_optimize()
+            self.conn.close()
+            self.publish()
+        except BaseException:
+            if self.conn is not None:
+                self.conn.close()
+            if self.published:
+                # Only making the rename durable failed; the new build is live
+                print(f"\n✗ Migration failed after publishing {self.db_file}")
+            else:
+                with suppress(FileNotFoundError):
+                    os.remove(self.build_file)
+                print(f"\n✗ Migration failed, {self.db_file} left unchanged")
+            raise
 
+        print("\n✓ Database migration complete!")
+        print(f"\nDatabase file: {os.path.abspath(self.db_file)}")
+        print("="*60 + "\n")
+
+    def build(self):
+        """Create the schema and load every table into the build file"""
         # Connect and create schema
         self.connect()
         self.create_schema()
@@ -211,47 +420,92 @@ class TarotDatabaseMigration:
         cards = self.load_json_data()
 
         print("\nMigrating cards...")
-        for i, card_data in enumerate(cards, 1):
-            card_id = self.insert_card(card_data)
-            self.insert_system_descriptions(card_id, card_data['name'])
-
-            if i % 10 == 0:
-                print(f"  Processed {i}/{len(cards)} cards...")
-
-        self.conn.commit()
+        with self.transaction():
+            card_ids = self.insert_cards(cards)
         print(f"\n✓ Successfully migrated {len(cards)} cards")
 
         # Seed Qabalah data
         print("\n" + "-"*60)
         print("Seeding Qabalah data...")
         print("-"*60)
-        seed_sephiroth(self.cursor)
-        seed_paths(self.cursor)
-        self.conn.commit()
+        with self.transaction() as cursor:
+            seed_sephiroth(cursor)
+            seed_paths(cursor, card_ids)
 
         # Seed Astrology data
         print("\n" + "-"*60)
         print("Seeding Astrology data...")
         print("-"*60)
-        seed_planets(self.cursor)
-        seed_zodiac_signs(self.cursor)
-        self.conn.commit()
+        with self.transaction() as cursor:
+            seed_planets(cursor)
+            seed_zodiac_signs(cursor)
+            seed_lunar_mansions(cursor)
 
         # Seed Rituals data
         print("\n" + "-"*60)
         print("Seeding Rituals data...")
         print("-"*60)
-        seed_rituals(self.cursor)
-        self.conn.commit()
+        with self.transaction() as cursor:
+            seed_rituals(cursor)
+
+        # Index the loaded tables (faster than maintaining indexes row by row)
+        print("\n" + "-"*60)
+        print("Creating indexes...")
+        print("-"*60)
+        self.create_indexes()
+
+        # Resolve cross-references between all systems
+        print("\n" + "-"*60)
+        print("Resolving correspondences...")
+        print("-"*60)
+        self.build_card_correspondences()
+
+        # Build full-text search indexes
+        print("\n" + "-"*60)
+        print("Building search indexes...")
+        print("-"*60)
+        self.build_search_index()
 
         # Print statistics
         self.print_statistics()
 
-        # Close connection
-        self.conn.close()
-        print("\n✓ Database migration complete!")
-        print(f"\nDatabase file: {os.path.abspath(self.db_file)}")
-        print("="*60 + "\n")
+    def verify_and_optimize(self):
+        """Check the built database and gather statistics for the query planner"""
+        self.cursor.execute("PRAGMA integrity_check")
+        problems = [row[0] for row in self.cursor.fetchall() if row[0] != 'ok']
+        self.cursor.execute("PRAGMA foreign_key_check")
+        problems += [f"{table} row {rowid} references a missing {parent} row"
+                     for table, rowid, parent, _ in self.cursor.fetchall()]
+        if problems:
+            raise RuntimeError("Built database failed its integrity check:\n  " + "\n  ".join(problems[:10]))
+        print("\n✓ Integrity check passed")
+
+        self.cursor.execute("ANALYZE")
+        self.cursor.execute("PRAGMA optimize")
+        print("✓ Query planner statistics gathered")
+
+    def publish(self):
+        """Atomically replace the live database with the finished build"""
+        # Flush the build to disk first, so a crash can't publish a torn file
+        with open(self.build_file, 'r+b') as f:
+            os.fsync(f.fileno())
+
+        # mkstemp files are private; keep the live file's permissions
+        if os.path.exists(self.db_file):
+            shutil.copymode(self.db_file, self.build_file)
+        else:
+            os.chmod(self.build_file, 0o644)
+
+        os.replace(self.build_file, self.db_file)
+        self.published = True
+        if hasattr(os, 'O_DIRECTORY'):
+            # Make the rename itself durable
+            dir_fd = os.open(os.path.dirname(os.path.abspath(self.db_file)), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        print(f"✓ Published {self.db_file}")
 
     def print_statistics(self):
         """Print database statistics"""
@@ -312,6 +566,16 @@ class TarotDatabaseMigration:
         signs_count = self.cursor.fetchone()[0]
         print(f"  Zodiac signs: {signs_count}")
 
+        self.cursor.execute("SELECT COUNT(*) FROM lunar_mansions")
+        mansions_count = self.cursor.fetchone()[0]
+        print(f"  Lunar mansions: {mansions_count}")
+
+        # Correspondence count
+        self.cursor.execute("SELECT COUNT(*) FROM card_correspondences")
+        correspondence_count = self.cursor.fetchone()[0]
+        print(f"\nCross-references:")
+        print(f"  Card correspondences: {correspondence_count}")
+
         # Rituals count
         self.cursor.execute("SELECT COUNT(*) FROM rituals")
         rituals_count = self.cursor.fetchone()[0]